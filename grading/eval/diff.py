@@ -0,0 +1,108 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from eval.util import iter_grading_file, read_grading_files
+
+# the number of entries of the new grading file that are joined at once (bounds the memory of the new file)
+CHUNK_SIZE = 100_000
+# the kinds of differences, where "changed" means a changed grade and/or reason
+CHANGES = ["added", "removed", "changed"]
+DIFF_COLS = ["id", "skz", "change", "old_grade", "new_grade", "old_reason", "new_reason"]
+
+
+def _entries(df: pd.DataFrame, change: str, prefix: str) -> pd.DataFrame:
+    return pd.DataFrame({"id": df["id"].to_numpy(), "skz": df["skz"].to_numpy(), "change": change,
+                         f"{prefix}_grade": df["grade"].to_numpy(), f"{prefix}_reason": df["reason"].to_numpy()})
+
+
+def diff_grading_files(grading_files: list[str], chunksize: int = CHUNK_SIZE) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Compares the last of ``grading_files`` (the new grades, e.g., a regrade after a
+    correction) with the previous ones (the uploaded grades, merged with the file specified
+    last taking precedence, see ``read_grading_files``) with a hash join on (matriculation
+    ID, SKZ). The previous grades are the build side, i.e., they are indexed once in a hash
+    table, and the new grading file is streamed in chunks of ``chunksize`` entries that probe
+    this table (see ``iter_grading_file``). Only the differences are kept, so the memory is
+    bounded by the previous grades and the differences. The reason is the external info,
+    where a missing reason equals an empty reason.
+    
+    :param grading_files: The paths of at least two grading files (KUSSS grading CSV files or
+        audit files) in chronologically ascending order, i.e., the new grading file is
+        specified last.
+    :param chunksize: The maximum number of entries of the new grading file that are joined
+        at once. Default: ``CHUNK_SIZE``
+    :return: A tuple containing (as first entry) the differences with the columns ``DIFF_COLS``
+        ("added": only in the new file, "removed": only in the previous files, "changed":
+        different grade or reason), sorted by "change", "id" and "skz", and as second entry,
+        the transitions, i.e., the number of differences per ("change", "old_grade",
+        "new_grade"), e.g., 5 -> 4 (the missing grade of added and removed entries is <NA>).
+    """
+    if len(grading_files) < 2:
+        raise ValueError(f"at least two grading files are required (got {len(grading_files)})")
+    old = read_grading_files(grading_files[:-1])
+    old = pd.DataFrame({"id": old["id"], "skz": old["skz"], "grade": old["grade"],
+                        "reason": old["extInfo"].fillna("").astype(str)})
+    table = pd.MultiIndex.from_frame(old[["id", "skz"]])
+    seen = np.zeros(len(old), dtype=bool)
+    
+    diffs = []
+    for chunk in iter_grading_file(grading_files[-1], chunksize):
+        new = pd.DataFrame({"id": chunk["id"], "skz": chunk["skz"], "grade": chunk["grade"],
+                            "reason": chunk["extInfo"].fillna("").astype(str)})
+        # probe the hash table of the previous grades (-1 = not found)
+        pos = table.get_indexer(pd.MultiIndex.from_frame(new[["id", "skz"]]))
+        found = pos >= 0
+        seen[pos[found]] = True
+        diffs.append(_entries(new[~found], "added", "new"))
+        matched_old = old.iloc[pos[found]]
+        matched_new = new[found]
+        changed = ((matched_old["grade"].to_numpy() != matched_new["grade"].to_numpy()) |
+                   (matched_old["reason"].to_numpy() != matched_new["reason"].to_numpy()))
+        if changed.any():
+            changed_df = _entries(matched_new[changed], "changed", "new")
+            changed_df["old_grade"] = matched_old["grade"].to_numpy()[changed]
+            changed_df["old_reason"] = matched_old["reason"].to_numpy()[changed]
+            diffs.append(changed_df)
+    diffs.append(_entries(old[~seen], "removed", "old"))
+    
+    df = pd.concat(diffs, ignore_index=True).reindex(columns=DIFF_COLS)
+    df = df.astype({"old_grade": "Int64", "new_grade": "Int64"})
+    df["change"] = pd.Categorical(df["change"], categories=CHANGES)
+    df = df.sort_values(["change", "id", "skz"], ignore_index=True)
+    transitions = df.groupby(["change", "old_grade", "new_grade"], observed=True, dropna=False).size()
+    return df, transitions.rename("count").reset_index()
+
+
+def print_diff(df: pd.DataFrame, transitions: pd.DataFrame):
+    counts = df["change"].value_counts(sort=False)
+    print(f"===== Differences (total = {len(df)}): " + ", ".join(f"{c} = {n}" for c, n in counts.items()) + " =====")
+    for row in transitions.itertuples(index=False):
+        # "-" = no grade (added or removed entries)
+        old_grade, new_grade = ["-" if pd.isna(g) else g for g in [row.old_grade, row.new_grade]]
+        print(f"{row.change}: {old_grade} -> {new_grade}: {row.count}")
+    if len(df) > 0:
+        print()
+        print(df.to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("grading_files", nargs="+", type=str,
+                        help="The output CSV files where the grades are stored (or the binary audit files, "
+                             "i.e., '.parquet' or '.arrow') in chronologically ascending order. The file specified "
+                             "last (the new grades) is compared with all previous files (the uploaded grades, where "
+                             "the file specified last takes precedence in case of duplicate entries).")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE,
+                        help="The maximum number of entries of the new grading file that are compared at once.")
+    parser.add_argument("-o", "--output_file", type=str,
+                        help="If specified, the differences are additionally stored in this CSV file.")
+    args = parser.parse_args()
+    if len(args.grading_files) < 2:
+        parser.error("at least two grading files are required")
+    diff_df, transitions_df = diff_grading_files(args.grading_files, args.chunksize)
+    print_diff(diff_df, transitions_df)
+    if args.output_file is not None:
+        diff_df.to_csv(args.output_file, index=False)
+        print(f"differences written to: '{args.output_file}'")
@@ -1,10 +1,16 @@
 import argparse
+import functools
 import os
+from concurrent.futures import ProcessPoolExecutor
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import seaborn as sns
+
+from eval.util import read_grading_files
+from graders import loader
+
+# matplotlib and seaborn are only imported when actually plotting (in the worker processes when
+# running in batch mode), so that they are not a hard dependency of this module
 
 
 def chunks(seq, n):
@@ -13,39 +19,52 @@ def chunks(seq, n):
         yield seq[i:i + n]
 
 
-def line_breaking(s: str, line_len: int, max_len: int = None, max_line_breaks: int = None):
-    if line_len <= 0:
-        raise ValueError(f"'line_len' must be > 0 (was {line_len})")
-    if max_len is not None and max_len <= 0:
-        raise ValueError(f"'max_len' must be > 0 (was {max_len})")
-    if max_line_breaks is not None and max_line_breaks <= 0:
-        raise ValueError(f"'max_line_breaks' must be > 0 (was {max_line_breaks})")
-    
-    words = s.split(" ")
-    split_words = []
-    
+def _split_words(words: list[str], line_len: int):
+    """Yield the words, where words longer than ``line_len`` are split into dash-separated parts."""
     for word in words:
         if len(word) > line_len:
             splits = [c for c in chunks(word, line_len - 1)]  # -1 because of the additional splitting dash character
             for i, split in enumerate(splits):
                 if i == len(splits) - 1:
-                    split_words.append(split)
+                    yield split
                 else:
-                    split_words.append(split + "-")
+                    yield split + "-"
         else:
-            split_words.append(word)
+            yield word
+
+
+@functools.lru_cache(maxsize=4096)
+def line_breaking(s: str, line_len: int, max_len: int = None, max_line_breaks: int = None):
+    if line_len <= 0:
+        raise ValueError(f"'line_len' must be > 0 (was {line_len})")
+    if max_len is not None and max_len <= 0:
+        raise ValueError(f"'max_len' must be > 0 (was {max_len})")
+    if max_line_breaks is not None and max_line_breaks <= 0:
+        raise ValueError(f"'max_line_breaks' must be > 0 (was {max_line_breaks})")
     
+    skip_indicator = "..."
     line = ""
     lines = []
+    # length of "\n".join(lines), i.e., of all finished lines
+    lines_len = -1
     skipped_lines = False
     
-    for word in split_words:
+    words = s.split(" ")
+    if line_len == 1 and any(len(word) > 1 for word in words):
+        # checked upfront (like before the early stop), since the words are split lazily
+        raise ValueError("'line_len' must be > 1 to split words (there is no room for the splitting dash)")
+    for word in _split_words(words, line_len):
         if len(line) == 0:
             line += word
         elif len(line) + 1 + len(word) > line_len:  # +1 because of the separating space character
             if max_line_breaks is None or len(lines) < max_line_breaks:
                 lines.append(line)
+                lines_len += 1 + len(line)
                 line = word
+                if max_len is not None and lines_len >= max_len >= len(skip_indicator):
+                    # the finished lines alone already exceed max_len (together with the separating "\n" of the
+                    # current line), so the remaining words cannot change the result, which is sliced below anyway
+                    return "\n".join(lines)[:max_len - len(skip_indicator)] + skip_indicator
             else:
                 skipped_lines = True
                 break
@@ -53,7 +72,6 @@ def line_breaking(s: str, line_len: int, max_len: int = None, max_line_breaks: i
             line += " " + word
     lines.append(line)
     
-    skip_indicator = "..."
     if skipped_lines:
         # this means we left the loop early and skipped the remaining words
         last_line = lines[-1]
@@ -66,23 +84,49 @@ def line_breaking(s: str, line_len: int, max_len: int = None, max_line_breaks: i
     
     new_s = "\n".join(lines)
     if max_len is not None and len(new_s) > max_len:
-        # TODO: should leave loop early when max_len is reached instead of processing everything and then slicing
         return new_s[:max_len - len(skip_indicator)] + skip_indicator
     return new_s
 
 
-def plot_grade_hist(grading_files: list[str], skz: str = None):
+def load_grades(grading_files: list[str], skz: int = None) -> pd.DataFrame:
+    """
+    Reads and merges all ``grading_files`` (see ``eval.util.read_grading_files``) and adds
+    the "grade_detail" column (grade plus reason) used for plotting.
+    
+    :param grading_files: The paths of the grading files. In case of duplicate entries, the
+        file specified last takes precedence.
+    :param skz: If not None, only entries with this study ID (SKZ) are kept. Default: None
+    :return: The pd.DataFrame sorted by "grade_detail".
+    """
     # merge all files and keep last entry in case of duplicates = most recent entry if list is ordered
-    dfs = [pd.read_csv(gf, sep=";", names=["id", "skz", "grade", "extInfo", "intInfo"]) for gf in grading_files]
-    df = pd.concat(dfs, ignore_index=True).drop_duplicates(subset=["id", "skz"], keep="last")
+    df = read_grading_files(grading_files)
     if skz is not None:
         df = df[df["skz"] == skz]
         if len(df) == 0:
             raise ValueError(f"no entries found for specified SKZ = {skz}")
-    df["reason"] = ": " + df["extInfo"]  # only adds ": " for non-NaN values
-    df["reason"].fillna("", inplace=True)
-    df["grade_detail"] = (df["grade"].astype(str) + df["reason"]).apply(line_breaking, line_len=20, max_line_breaks=2)
+    # only adds ": " for non-NaN values (object dtype, since the column is float if there are no reasons at all)
+    df["reason"] = ": " + df["extInfo"].astype(object)
+    df["reason"] = df["reason"].fillna("")
+    # there are only a few distinct grade details, so only break the lines of each unique one once
+    codes, details = pd.factorize(df["grade"].astype(str) + df["reason"])
+    details = np.array([line_breaking(d, line_len=20, max_line_breaks=2) for d in details], dtype=object)
+    df["grade_detail"] = details[codes]
     df.sort_values("grade_detail", inplace=True)
+    return df
+
+
+def create_grade_hist_figure(df: pd.DataFrame, title: str):
+    """
+    Creates the grade histogram figure (plain grades on the left, grades including the
+    reasons on the right) based on ``df`` (see ``load_grades``). The caller is responsible
+    for showing/saving and closing the returned figure.
+    
+    :param df: The pd.DataFrame containing the "grade" and "grade_detail" columns.
+    :param title: The title of the figure (the grade statistics are appended).
+    :return: The matplotlib figure.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     
     def _plot_grade_hist(ax: plt.Axes, x: str, rotate: float = None):
         grade_is_str = df[x].dtype == object
@@ -90,14 +134,16 @@ def plot_grade_hist(grading_files: list[str], skz: str = None):
         sns.histplot(data=df, x=x, discrete=True, ax=ax, color="bisque")
         if not grade_is_str:
             ax.set_xticks(range(1, 6))
-        counts = [len(group_df) for _, group_df in df.groupby(x)]
+        # same (sorted) order as the bars, since df is sorted by "grade_detail"
+        counts = df[x].value_counts(sort=False).sort_index()
+        percentages = counts / len(df)
         # shift count labels by 1% of max (so there is some space between the bars and the labels)
-        y_offset = 0.01 * max(counts)
-        for i, (grade, group_df) in enumerate(df.groupby(x)):
+        y_offset = 0.01 * counts.max()
+        for i, (grade, count) in enumerate(counts.items()):
             x_pos = i if grade_is_str else grade
-            y_pos = len(group_df) + y_offset
-            ax.text(x_pos, y_pos, f"{len(group_df)} ({len(group_df) / len(df):.1%})", ha="center")
-        max_percent = max([100 * c / len(df) for c in counts])
+            y_pos = count + y_offset
+            ax.text(x_pos, y_pos, f"{count} ({percentages[grade]:.1%})", ha="center")
+        max_percent = 100 * percentages.max()
         # plot an invisible vertical line to automatically get the correct y-ticks
         x_pos = np.mean(ax.get_xticks())
         ax_twin.plot([x_pos, x_pos], [0, max_percent], alpha=0)
@@ -112,23 +158,120 @@ def plot_grade_hist(grading_files: list[str], skz: str = None):
     fig, (ax1, ax2) = plt.subplots(ncols=2, figsize=(14, 6))
     _plot_grade_hist(ax1, "grade")
     _plot_grade_hist(ax2, "grade_detail", rotate=45)
-    title = "\n".join([os.path.split(os.path.dirname(gf))[1] + "/" + os.path.basename(gf) for gf in grading_files])
     title += f"\nGrades (count = {len(df)}; median = {df['grade'].median():.1f}; mean = {df['grade'].mean():.2f})"
-    if skz is not None:
-        title += f" for SKZ = {skz}"
     fig.suptitle(title)
     fig.tight_layout()
+    return fig
+
+
+def _get_title(grading_files: list[str], skz: int = None) -> str:
+    title = "\n".join([os.path.split(os.path.dirname(gf))[1] + "/" + os.path.basename(gf) for gf in grading_files])
+    if skz is not None:
+        title += f"\nSKZ = {skz}"
+    return title
+
+
+def plot_grade_hist(grading_files: list[str], skz: int = None):
+    import matplotlib.pyplot as plt
     
+    df = load_grades(grading_files, skz)
+    fig = create_grade_hist_figure(df, _get_title(grading_files, skz))
     plt.show()
     plt.close(fig)
 
 
+def _init_batch_worker():
+    # select the non-interactive backend before pyplot is imported for the first time
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot  # noqa: F401 (import once per worker instead of once per task)
+    import seaborn  # noqa: F401
+
+
+def save_grade_hists(grading_files: list[str], output_dir: str, formats: list[str], per_skz: bool = True) -> list[str]:
+    """
+    Renders the grade histogram of the (merged) ``grading_files`` of a single course and,
+    if ``per_skz`` is True, additionally one grade histogram for each study ID (SKZ), and
+    saves all figures to ``output_dir`` in each of the specified ``formats``. The file name
+    is based on the last grading file, with the suffix "_skz<SKZ>" for the SKZ histograms.
+    
+    :param grading_files: The paths of the grading files of a single course. In case of
+        duplicate entries, the file specified last takes precedence.
+    :param output_dir: The directory where the figures are stored.
+    :param formats: The file formats (e.g., "png", "svg") to store each figure in.
+    :param per_skz: Whether to additionally render one histogram per SKZ. Default: True
+    :return: The list of paths of all stored figure files.
+    """
+    import matplotlib.pyplot as plt
+    
+    df = load_grades(grading_files)
+    parent_dir = os.path.split(os.path.dirname(os.path.abspath(grading_files[-1])))[1]
+    name = parent_dir + "_" + os.path.splitext(os.path.basename(loader.strip_compression(grading_files[-1])[0]))[0]
+    figures = [(name, df, _get_title(grading_files))]
+    if per_skz:
+        figures += [(f"{name}_skz{skz}", skz_df, _get_title(grading_files, skz))
+                    for skz, skz_df in df.groupby("skz")]
+    
+    files = []
+    for fig_name, fig_df, title in figures:
+        fig = create_grade_hist_figure(fig_df, title)
+        for fmt in formats:
+            file = os.path.join(output_dir, f"{fig_name}.{fmt}")
+            fig.savefig(file)
+            files.append(file)
+        plt.close(fig)
+    return files
+
+
+def save_grade_hists_batch(courses: list[list[str]], output_dir: str, formats: list[str] = None,
+                           per_skz: bool = True, max_workers: int = None) -> list[str]:
+    """
+    Headless batch mode of ``save_grade_hists``: Renders the grade histograms of all
+    ``courses`` with the non-interactive "Agg" backend, distributed across a process
+    pool (one task per course). The plotting libraries are only imported in the worker
+    processes.
+    
+    :param courses: A list of courses, where each course is a list of grading files (see
+        ``save_grade_hists``).
+    :param output_dir: The directory where the figures are stored (created if necessary).
+    :param formats: The file formats (e.g., "png", "svg") to store each figure in.
+        Default: None = ["png"]
+    :param per_skz: Whether to additionally render one histogram per SKZ. Default: True
+    :param max_workers: The maximum number of worker processes. Default: None, i.e., the
+        number of processors (see ``concurrent.futures.ProcessPoolExecutor``)
+    :return: The list of paths of all stored figure files.
+    """
+    if formats is None:
+        formats = ["png"]
+    os.makedirs(output_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_batch_worker) as executor:
+        futures = [executor.submit(save_grade_hists, gfs, output_dir, formats, per_skz) for gfs in courses]
+        return [file for future in futures for file in future.result()]
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("grading_files", nargs="+", type=str,
-                        help="The output CSV files where the grades are stored. In case of duplicate entries, "
-                             "the file specified last takes precedence, i.e., the order of this list matters.")
+                        help="The output CSV files where the grades are stored (or the binary audit files, "
+                             "i.e., '.parquet' or '.arrow'). In case of duplicate entries, the file specified last "
+                             "takes precedence, i.e., the order of this list matters. In batch mode (see "
+                             "'--output_dir'), each entry is a separate course, and multiple files of the same "
+                             "course can be joined with ',' (e.g., 'exam_grading.csv,retry_grading.csv').")
     parser.add_argument("--skz", type=int,
                         help="Restrict the output to only include students with this study identification (SKZ).")
+    parser.add_argument("-o", "--output_dir", type=str,
+                        help="If specified, run in headless batch mode and store the histograms of all courses "
+                             "(overall and per SKZ) in this directory instead of showing them.")
+    parser.add_argument("--formats", nargs="+", type=str, default=["png"],
+                        help="Batch mode only: The file formats of the stored histograms (e.g., 'png', 'svg').")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Batch mode only: The maximum number of worker processes. Default: number of CPUs.")
     args = parser.parse_args()
-    plot_grade_hist(args.grading_files, args.skz)
+    if args.output_dir is None:
+        plot_grade_hist(args.grading_files, args.skz)
+    else:
+        if args.skz is not None:
+            parser.error("'--skz' is not supported in batch mode (all SKZs are rendered separately)")
+        files = save_grade_hists_batch([gf.split(",") for gf in args.grading_files], args.output_dir,
+                                       args.formats, max_workers=args.workers)
+        print(f"{len(files)} figures written to: '{args.output_dir}'")
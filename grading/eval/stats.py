@@ -1,15 +1,201 @@
 import argparse
+import json
+import os
 
 import pandas as pd
 
+from eval.util import read_grading_file
+from graders import loader
 
-def print_counts_by_skz(participant_files: list[str], grading_files: list[str]):
-    dfs = [pd.read_csv(pf, sep=";", header=0, names=["id", "skz"]) for pf in participant_files]
-    pdf = pd.concat(dfs).drop_duplicates()
-    # merge all files and keep last entry in case of duplicates = most recent entry if list is ordered
-    dfs = [pd.read_csv(gf, sep=";", names=["id", "skz", "grade", "extInfo", "intInfo"]) for gf in grading_files]
-    gdf = pd.concat(dfs, ignore_index=True).drop_duplicates(subset=["id", "skz"], keep="last")
+# grades that count as passed (5 = "Nicht genügend"/"Not sufficient")
+PASSED_GRADES = [1, 2, 3, 4]
+
+# column types of all statistics tables (restored when loading cached aggregates)
+TABLE_DTYPES = {
+    # number of graded students per (course, SKZ, grade)
+    "grades": {"course": str, "skz": "int64", "grade": "int64", "count": "int64"},
+    # number of graded and passed students per course
+    "pass_rates": {"course": str, "n_graded": "int64", "n_passed": "int64", "pass_rate": "float64"},
+    # number of graded students per (course, grade reason), where "" means that there is no reason
+    "reasons": {"course": str, "reason": str, "count": "int64", "share": "float64"},
+    # number of registered and graded students per (course, SKZ)
+    "participation": {"course": str, "skz": "int64", "n_registered": "int64", "n_graded": "int64",
+                      "participation_rate": "float64"},
+}
+
+CACHE_VERSION = 1
+
+
+def read_participants_file(participant_file: str) -> pd.DataFrame:
+    return loader.read_csv(participant_file, sep=";", header=0, names=["id", "skz"])
+
+
+def _merge_participants(pdfs: list[pd.DataFrame]) -> pd.DataFrame:
+    return pd.concat(pdfs, ignore_index=True).drop_duplicates()
+
+
+def _merge_grades(gdfs: list[pd.DataFrame]) -> pd.DataFrame:
+    # keep last entry in case of duplicates = most recent entry if list is ordered
+    return pd.concat(gdfs, ignore_index=True).drop_duplicates(subset=["id", "skz"], keep="last")
+
+
+def load_courses(courses: dict[str, dict], max_workers: int = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Reads all participant and grading files of all ``courses`` concurrently and returns
+    them merged per course, i.e., duplicate participants are dropped and, for duplicate
+    grades of the same course, the entry of the file specified last is kept.
+    
+    :param courses: A dictionary mapping each course name to a dictionary with the two
+        entries "participant_files" and "grading_files" (lists of paths).
+    :param max_workers: The maximum number of reader threads. Default: None (see
+        ``loader.read_files``)
+    :return: A tuple containing (as first entry) all participants with the columns "course",
+        "id", "skz", and as second entry, all grades with the columns "course", "id", "skz",
+        "grade" and "reason" (the external info; "" if there is no reason).
+    """
+    # flatten the files of all courses, so that they are all read concurrently on a single pool
+    readers = dict(participant_files=read_participants_file, grading_files=read_grading_file)
+    tasks = [(course, kind, f) for course, c in courses.items() for kind in readers for f in c[kind]]
+    dfs = loader.read_files(tasks, lambda task: readers[task[1]](task[2]), max_workers)
+    # the results are in the order of "tasks", i.e., in the specified file order of each course
+    course_dfs = {course: {kind: [] for kind in readers} for course in courses}
+    for (course, kind, _), df in zip(tasks, dfs):
+        course_dfs[course][kind].append(df)
+    pdfs, gdfs = [], []
+    for course, c in course_dfs.items():
+        pdfs.append(_merge_participants(c["participant_files"]).assign(course=course))
+        gdfs.append(_merge_grades(c["grading_files"]).assign(course=course))
+    pdf = pd.concat(pdfs, ignore_index=True)[["course", "id", "skz"]]
+    gdf = pd.concat(gdfs, ignore_index=True)
+    gdf["reason"] = gdf["extInfo"].fillna("").astype(str)
+    return pdf, gdf[["course", "id", "skz", "grade", "reason"]]
+
+
+def aggregate(pdf: pd.DataFrame, gdf: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Aggregates the participants and grades of any number of courses (see ``load_courses``)
+    into the statistics tables ``TABLE_DTYPES``, where each table is computed with a single
+    groupby over all courses.
+    
+    :param pdf: All participants with the columns "course", "id" and "skz".
+    :param gdf: All grades with the columns "course", "id", "skz", "grade" and "reason".
+    :return: A dictionary mapping each table name to its pd.DataFrame.
+    """
+    grades = gdf.groupby(["course", "skz", "grade"]).size().rename("count").reset_index()
+    
+    passed = gdf["grade"].isin(PASSED_GRADES)
+    pass_rates = passed.groupby(gdf["course"]).agg(n_graded="size", n_passed="sum").reset_index()
+    pass_rates["pass_rate"] = pass_rates["n_passed"] / pass_rates["n_graded"]
+    
+    reasons = gdf.groupby(["course", "reason"]).size().rename("count").reset_index()
+    reasons["share"] = reasons["count"] / reasons.groupby("course")["count"].transform("sum")
+    
+    registered = pdf.groupby(["course", "skz"]).size().rename("n_registered")
+    graded = gdf.groupby(["course", "skz"]).size().rename("n_graded")
+    # outer join, since students might be graded with an SKZ that is missing in the participant files
+    participation = pd.concat([registered, graded], axis=1).fillna(0).sort_index().reset_index()
+    # NaN rate (instead of inf) if nobody is registered with this SKZ
+    participation["participation_rate"] = (participation["n_graded"] /
+                                           participation["n_registered"].where(participation["n_registered"] > 0))
+    
+    tables = dict(grades=grades, pass_rates=pass_rates, reasons=reasons, participation=participation)
+    return {name: _typed(tables[name], name) for name in TABLE_DTYPES}
 
+
+def _typed(df: pd.DataFrame, name: str) -> pd.DataFrame:
+    dtypes = TABLE_DTYPES[name]
+    return df[list(dtypes)].astype(dtypes).reset_index(drop=True)
+
+
+def _course_signature(course: dict) -> dict:
+    return {k: [loader.file_signature(f) for f in course[k]] for k in ["participant_files", "grading_files"]}
+
+
+def _read_cache(cache_file: str) -> dict:
+    if cache_file is None or not os.path.exists(cache_file):
+        return dict()
+    with open(cache_file, encoding="utf8") as f:
+        cache = json.load(f)
+    return cache["courses"] if cache.get("version") == CACHE_VERSION else dict()
+
+
+def _write_cache(cache_file: str, cached_courses: dict):
+    with open(cache_file, "w", encoding="utf8") as f:
+        json.dump(dict(version=CACHE_VERSION, courses=cached_courses), f)
+
+
+def compute_stats(courses: dict[str, dict], cache_file: str = None, max_workers: int = None,
+                  verbose: bool = True) -> dict[str, pd.DataFrame]:
+    """
+    Computes the statistics tables (see ``TABLE_DTYPES``) of all ``courses``. If a
+    ``cache_file`` is specified, the aggregates are cached per course, and only those
+    courses whose input files changed (path, size or modification time) or which are
+    new are loaded and aggregated again, e.g., if a new grading file is added to a course,
+    only this course is recomputed.
+    
+    :param courses: A dictionary mapping each course name to a dictionary with the two
+        entries "participant_files" and "grading_files" (lists of paths). In case of
+        duplicate grades within a course, the grading file specified last takes precedence.
+    :param cache_file: If not None, the path of the JSON file where the aggregates are
+        cached (created if it does not exist). Default: None
+    :param max_workers: The maximum number of reader threads (see ``load_courses``).
+        Default: None
+    :param verbose: Whether to print which courses are recomputed. Default: True
+    :return: A dictionary mapping each table name to its pd.DataFrame (sorted by course).
+    """
+    cached = _read_cache(cache_file)
+    signatures = {course: _course_signature(c) for course, c in courses.items()}
+    stale = [course for course in courses if course not in cached or cached[course]["signature"] != signatures[course]]
+    if verbose:
+        print(f"recomputing {len(stale)} of {len(courses)} courses: {stale}")
+    
+    tables = {name: [] for name in TABLE_DTYPES}
+    if len(stale) > 0:
+        new_tables = aggregate(*load_courses({course: courses[course] for course in stale}, max_workers))
+        # tables might not contain every course (e.g., if there are no grades at all), so reset all stale courses
+        for course in stale:
+            cached[course] = dict(signature=signatures[course], tables={name: [] for name in TABLE_DTYPES})
+        for name, df in new_tables.items():
+            tables[name].append(df)
+            for course, course_df in df.groupby("course"):
+                cached[course]["tables"][name] = course_df.to_dict("records")
+    for course in courses:
+        if course not in stale:
+            for name in TABLE_DTYPES:
+                tables[name].append(pd.DataFrame(cached[course]["tables"][name], columns=list(TABLE_DTYPES[name])))
+    
+    if cache_file is not None:
+        # only keep the requested courses, so that removed courses do not accumulate
+        _write_cache(cache_file, {course: cached[course] for course in courses})
+    return {name: _typed(pd.concat(dfs, ignore_index=True), name).sort_values("course", kind="stable",
+                                                                               ignore_index=True)
+            for name, dfs in tables.items()}
+
+
+def write_stats(tables: dict[str, pd.DataFrame], output_dir: str) -> list[str]:
+    """
+    Writes each statistics table as CSV file "<table name>.csv" and all tables together
+    as JSON file "stats.json" (table name -> list of records) to ``output_dir``.
+    
+    :param tables: The statistics tables (see ``compute_stats``).
+    :param output_dir: The output directory (created if necessary).
+    :return: The paths of all written files.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    files = []
+    for name, df in tables.items():
+        files.append(os.path.join(output_dir, f"{name}.csv"))
+        df.to_csv(files[-1], index=False)
+    files.append(os.path.join(output_dir, "stats.json"))
+    with open(files[-1], "w", encoding="utf8") as f:
+        json.dump({name: json.loads(df.to_json(orient="records")) for name, df in tables.items()}, f, indent=2)
+    return files
+
+
+def print_counts_by_skz(participant_files: list[str], grading_files: list[str]):
+    pdf, gdf = load_courses({"": dict(participant_files=participant_files, grading_files=grading_files)})
+    pdf = pdf[["id", "skz"]]
+    
     print(f"===== Number of registered students (total = {len(pdf)}) grouped by SKZ =====")
     p_counts = pdf.groupby("skz").count()
     p_counts.columns = ["count"]
@@ -27,10 +213,34 @@ def print_counts_by_skz(participant_files: list[str], grading_files: list[str]):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--participant_files", nargs="+", type=str, required=True,
+    parser.add_argument("--participant_files", nargs="+", type=str,
                         help="The KUSSS participant CSV files. Duplicate entries are removed automatically.")
-    parser.add_argument("--grading_files", nargs="+", type=str, required=True,
-                        help="The output CSV files where the grades are stored. In case of duplicate entries, "
-                             "the file specified last takes precedence, i.e., the order of this list matters.")
+    parser.add_argument("--grading_files", nargs="+", type=str,
+                        help="The output CSV files where the grades are stored (or the binary audit files, "
+                             "i.e., '.parquet' or '.arrow'). In case of duplicate entries, the file specified last "
+                             "takes precedence, i.e., the order of this list matters.")
+    parser.add_argument("--courses_file", type=str,
+                        help="Instead of '--participant_files' and '--grading_files' for a single course: JSON file "
+                             "that maps each course name to an object with the two lists 'participant_files' and "
+                             "'grading_files'. The statistics of all courses are written to '--output_dir'.")
+    parser.add_argument("--output_dir", type=str,
+                        help="The directory where the statistics tables are written to (CSV and JSON).")
+    parser.add_argument("--cache_file", type=str,
+                        help="JSON file where the aggregates of each course are cached, so that only courses with "
+                             "changed or added files are recomputed. Default: '<output_dir>/stats_cache.json'")
     args = parser.parse_args()
-    print_counts_by_skz(args.participant_files, args.grading_files)
+    if args.courses_file is None:
+        if args.participant_files is None or args.grading_files is None:
+            parser.error("either '--courses_file' or both '--participant_files' and '--grading_files' are required")
+        print_counts_by_skz(args.participant_files, args.grading_files)
+    else:
+        if args.output_dir is None:
+            parser.error("'--output_dir' is required when using '--courses_file'")
+        with open(args.courses_file, encoding="utf8") as f:
+            courses = json.load(f)
+        if args.cache_file is None:
+            args.cache_file = os.path.join(args.output_dir, "stats_cache.json")
+        os.makedirs(args.output_dir, exist_ok=True)
+        stats = compute_stats(courses, args.cache_file)
+        for file in write_stats(stats, args.output_dir):
+            print(f"written: '{file}'")
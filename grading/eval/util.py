@@ -0,0 +1,72 @@
+import os
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from graders import audit, loader
+
+# column names of the (header-less) KUSSS grading CSV files
+GRADING_FILE_COLS = ["id", "skz", "grade", "extInfo", "intInfo"]
+
+
+def read_grading_file(grading_file: str) -> pd.DataFrame:
+    """
+    Reads a single grading file and returns it as pd.DataFrame with the columns
+    ``GRADING_FILE_COLS``. The grading file can either be a KUSSS grading CSV file
+    (as created by ``Grader.create_grading_file``; can also be compressed or archived, see
+    ``loader.read_csv``) or a binary audit file (".parquet"
+    or ".arrow"; see ``audit_format`` of ``Grader.create_grading_file``), in which
+    case only the required columns are read, as given by the audit run metadata.
+    
+    :param grading_file: The path of the grading file.
+    :return: The pd.DataFrame with the columns ``GRADING_FILE_COLS``.
+    """
+    if not audit.is_audit_file(grading_file):
+        return loader.read_csv(grading_file, sep=";", names=GRADING_FILE_COLS)
+    
+    metadata = audit.read_audit_metadata(grading_file)
+    cols = [metadata.get(k) for k in ["matr_id_col", "study_id_col", "grade_col", "grade_reason_col"]]
+    if None in cols:
+        raise ValueError(f"audit file '{grading_file}' does not contain the required column metadata")
+    matr_id_col, study_id_col, grade_col, grade_reason_col = cols
+    df, _ = audit.read_audit_file(grading_file, columns=cols)
+    # mimic the CSV files where an empty reason is read as NaN (the reason might be categorical, see
+    # "Grader._evaluate_rules")
+    reason = df[grade_reason_col].astype(object).replace("", np.nan)
+    return pd.DataFrame({"id": df[matr_id_col], "skz": df[study_id_col], "grade": df[grade_col],
+                         "extInfo": reason, "intInfo": reason})
+
+
+def iter_grading_file(grading_file: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Reads a single grading file (see ``read_grading_file``) in chunks of at most
+    ``chunksize`` entries, so that large files can be processed with bounded memory. Only
+    KUSSS grading CSV files that are not in a ZIP archive are actually streamed, audit files
+    (columnar, only the required columns are read) and ZIP archive members are yielded as a
+    single chunk.
+    
+    :param grading_file: The path of the grading file.
+    :param chunksize: The maximum number of entries per chunk.
+    :return: An iterator over pd.DataFrames with the columns ``GRADING_FILE_COLS``.
+    """
+    path, _ = loader.split_member(grading_file)
+    if audit.is_audit_file(grading_file) or os.path.splitext(path)[1].lower() == ".zip":
+        yield read_grading_file(grading_file)
+        return
+    with loader.read_csv(grading_file, sep=";", names=GRADING_FILE_COLS, chunksize=chunksize) as reader:
+        yield from reader
+
+
+def read_grading_files(grading_files: list[str]) -> pd.DataFrame:
+    """
+    Reads (concurrently, see ``loader.read_files``) and merges all ``grading_files`` (see
+    ``read_grading_file``). In case of duplicate entries, i.e., the same (matriculation ID,
+    SKZ) tuple, the last entry is kept, which means that the most recent entry is kept if
+    the list is ordered.
+    
+    :param grading_files: The paths of the grading files.
+    :return: The merged pd.DataFrame with the columns ``GRADING_FILE_COLS``.
+    """
+    df = loader.read_concat(grading_files, read_grading_file, ignore_index=True)
+    return df.drop_duplicates(subset=["id", "skz"], keep="last")
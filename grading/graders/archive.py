@@ -0,0 +1,136 @@
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from graders import audit, registry
+
+# partition columns of the archive dataset (hive partitioning, i.e., "<name>=<value>" directories)
+PARTITION_COLS = ["semester", "course", "run"]
+# format of the "run" partition values (sortable and unique enough for consecutive runs)
+RUN_FORMAT = "%Y%m%dT%H%M%S%f"
+# name of the single data file within each run partition
+RUN_FILE = "part-0.parquet"
+
+
+def _data_schema():
+    import pyarrow as pa
+    
+    # the same schema for all runs (rule_trace is null if the grader does not define rules)
+    return pa.schema([("id", pa.string()), ("skz", pa.int64()), ("grade", pa.int64()), ("reason", pa.string()),
+                      ("rule_trace", pa.int64())])
+
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    
+    return ds.partitioning(pa.schema([(c, pa.string()) for c in PARTITION_COLS]), flavor="hive")
+
+
+def get_partition(grader_cls: type) -> tuple[str, str]:
+    """
+    Returns the archive partition (semester, course) of a grader class based on its
+    module, e.g., ("ss2024", "python2lecture") for the module
+    "graders.ss2024.python2lecturegrader" (the same as the key of ``registry.discover``).
+    Raises a ValueError if the module does not follow this naming scheme.
+    
+    :param grader_cls: The grader class.
+    :return: A tuple containing the semester and the course.
+    """
+    *_, semester, module_name = grader_cls.__module__.split(".")
+    suffix = registry.MODULE_SUFFIX[:-len(".py")]
+    if not registry.SEMESTER_PATTERN.match(semester) or not module_name.endswith(suffix):
+        raise ValueError(f"cannot derive the archive partition of '{grader_cls.__module__}' (expected "
+                         f"'graders.<semester>.<course>{suffix}')")
+    return semester, module_name[:-len(suffix)]
+
+
+def write_run(df: pd.DataFrame, archive_dir: str, semester: str, course: str, metadata: dict = None,
+              run: datetime = None) -> str:
+    """
+    Appends a grading run to the Parquet archive ``archive_dir``, which is partitioned by
+    semester, course and run timestamp, i.e., the run is written to the new file
+    "<archive_dir>/semester=<semester>/course=<course>/run=<timestamp>/part-0.parquet".
+    Existing runs are never modified. Requires the optional dependency "pyarrow".
+    
+    :param df: The grades with the columns "id", "skz", "grade", "reason" and (optionally)
+        "rule_trace".
+    :param archive_dir: The root directory of the archive (created if necessary).
+    :param semester: The semester, e.g., "ss2024".
+    :param course: The course, e.g., "python2lecture".
+    :param metadata: If not None, a JSON-serializable dictionary containing the run metadata
+        (see ``audit.write_audit_file``). Default: None
+    :param run: The run timestamp. Default: None, i.e., the current time
+    :return: The path of the written file.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    if run is None:
+        run = datetime.now()
+    run_dir = os.path.join(archive_dir, f"semester={semester}", f"course={course}", f"run={run.strftime(RUN_FORMAT)}")
+    # exist_ok=False: two runs must never share a partition
+    os.makedirs(run_dir)
+    df = df.copy()
+    if "rule_trace" not in df.columns:
+        df["rule_trace"] = pd.NA
+    df["reason"] = df["reason"].astype(object)
+    table = pa.Table.from_pandas(df, schema=_data_schema(), preserve_index=False)
+    if metadata is not None:
+        table = table.replace_schema_metadata({audit.METADATA_KEY: json.dumps(metadata, default=str).encode("utf8")})
+    run_file = os.path.join(run_dir, RUN_FILE)
+    pq.write_table(table, run_file)
+    return run_file
+
+
+def _semester_order(semester: pd.Series) -> pd.Series:
+    # chronological order: the summer semester (ss) of a year comes before its winter semester (ws)
+    return semester.str[2:].astype(int) * 2 + (semester.str[:2] == "ws")
+
+
+def read_latest_grades(archive_dir: str, semesters: list[str] = None, courses: list[str] = None,
+                       skz: list[int] = None, ids: list[str] = None, before: datetime = None) -> pd.DataFrame:
+    """
+    Reads the latest grade per (matriculation ID, SKZ, course) from the Parquet archive
+    ``archive_dir`` (see ``write_run``). Only the partitions of the selected ``semesters``
+    and ``courses`` are read (partition pruning), and the ``skz`` and ``ids`` filters are
+    pushed down to the Parquet reader (predicate pushdown). The latest grade is the one of
+    the most recent semester, and within a semester, of the most recent run. Requires the
+    optional dependency "pyarrow".
+    
+    :param archive_dir: The root directory of the archive.
+    :param semesters: If not None, only these semesters are read, e.g., ["ss2023", "ss2024"].
+        Default: None, i.e., all semesters
+    :param courses: If not None, only these courses are read, e.g., ["python2lecture"].
+        Default: None, i.e., all courses
+    :param skz: If not None, only these study IDs are read. Default: None
+    :param ids: If not None, only these matriculation IDs are read. Default: None
+    :param before: If not None, only the runs before this timestamp are read, i.e., the latest
+        grades as of this timestamp. Default: None
+    :return: A pd.DataFrame with the columns "semester", "course", "run", "id", "skz", "grade",
+        "reason" and "rule_trace", sorted by "course", "id" and "skz".
+    """
+    import pyarrow.dataset as ds
+    
+    partitioning = _partitioning()
+    # explicit schema, so that the files are not inspected for schema inference
+    schema = _data_schema()
+    for field in partitioning.schema:
+        schema = schema.append(field)
+    dataset = ds.dataset(archive_dir, format="parquet", partitioning=partitioning, schema=schema)
+    conditions = [ds.field(name).isin(values) for name, values in
+                  [("semester", semesters), ("course", courses), ("skz", skz), ("id", ids)] if values is not None]
+    expression = None
+    if before is not None:
+        # the run timestamps are sortable strings (see RUN_FORMAT)
+        conditions.append(ds.field("run") < before.strftime(RUN_FORMAT))
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    df = dataset.to_table(filter=expression).to_pandas()
+    df = df[PARTITION_COLS + [f.name for f in _data_schema()]]
+    df["rule_trace"] = df["rule_trace"].astype("Int64")
+    df["order"] = _semester_order(df["semester"])
+    df = df.sort_values(["order", "run"], kind="stable").drop_duplicates(["id", "skz", "course"], keep="last")
+    return df.drop(columns="order").sort_values(["course", "id", "skz"], ignore_index=True)
@@ -0,0 +1,85 @@
+import argparse
+
+from graders import registry
+
+# the arguments that are common to all grader scripts (see "graders/cli.py" and the "main" function of each grader
+# module); like "graders/registry.py", this module must not import any heavy dependency (numpy, pandas, ...), so
+# that argument validation is instant
+
+
+def get_audit_format_choices() -> list[str]:
+    """Returns the supported audit formats, i.e., the keys of ``audit.AUDIT_FORMATS`` (without importing it)."""
+    return list(registry.get_module_constant("audit", "AUDIT_FORMATS"))
+
+
+def get_backend_choices() -> list[str]:
+    """Returns the supported frame backends, i.e., ``backends.BACKENDS`` (without importing it)."""
+    return list(registry.get_module_constant("backends", "BACKENDS"))
+
+
+def add_grading_args(parser: argparse.ArgumentParser):
+    """
+    Adds the arguments that are common to all grader scripts to ``parser`` (see
+    ``get_grading_args_parser``).
+    
+    :param parser: The argparse.ArgumentParser to which the arguments are added.
+    """
+    parser.add_argument("-mf", "--moodle_file", type=str, required=True,
+                        help="Moodle CSV export file (can be compressed: .gz, .xz or .zip, where a ZIP archive "
+                             "member can be selected with 'archive.zip::member.csv'), or XLSX/ODS spreadsheet "
+                             "export file.")
+    parser.add_argument("-kpf", "--kusss_participants_files", type=str, nargs="+", required=True,
+                        help="KUSSS participants CSV export files (can be compressed like the Moodle file).")
+    parser.add_argument("-gf", "--grading_file", type=str, default=None,
+                        help="The output CSV file where the grades will be stored (compressed if the file name "
+                             "ends with .gz, .xz or .zip).")
+    parser.add_argument("-af", "--audit_format", type=str, default=None, choices=get_audit_format_choices(),
+                        help="If specified, the full graded data is additionally stored as typed binary audit file "
+                             "in this format (requires pyarrow).")
+    parser.add_argument("-cf", "--corrections_file", type=str, default=None,
+                        help="Correction ledger CSV file (columns 'column;adjustment;scope;reason') with point "
+                             "corrections that are applied before grading.")
+    parser.add_argument("-ad", "--archive_dir", type=str, default=None,
+                        help="If specified, the grades of this run are additionally appended to the Parquet archive "
+                             "in this directory (partitioned by semester, course and run; requires pyarrow).")
+    parser.add_argument("-ps", "--point_scale", type=int, default=None,
+                        help="If specified, all points are represented internally as exact fixed-point integers in "
+                             "units of 1/point_scale (e.g., 1000 = thousandths; only supported by some graders).")
+    parser.add_argument("-be", "--backend", type=str, default=None, choices=get_backend_choices(),
+                        help="The frame backend for reading the participants, merging and exporting (the results "
+                             "are the same). polars is experimental: it requires polars and is not benchmarked to "
+                             "be faster for the typical course sizes. Default: pandas")
+    parser.add_argument("-rc", "--reconcile", action="store_true",
+                        help="If specified, the reconciliation of the Moodle students and the KUSSS participants "
+                             "(graded, Moodle-only, KUSSS-only, invalid ID) is additionally stored as CSV file.")
+    parser.add_argument("-ia", "--item_analysis", action="store_true",
+                        help="If specified, the item analysis of the graded entries (statistics of each assignment "
+                             "and quiz) is additionally stored as CSV file.")
+    parser.add_argument("-gb", "--gradebook_file", type=str, default=None,
+                        help="If specified, this run (inputs, grades, reasons and points) is additionally appended to "
+                             "this SQLite gradebook database (created if necessary).")
+    parser.add_argument("-gw", "--grading_workers", type=int, default=None,
+                        help="If specified, the maximum number of processes that grade the entries in parallel (only "
+                             "large courses are split into shards). Default: grading in-process")
+
+
+def grading_kwargs(args: argparse.Namespace) -> dict:
+    """
+    Returns the keyword arguments of ``Grader.create_grading_file`` that every grader script
+    passes through unchanged from the arguments of ``add_grading_args``, i.e., all of them
+    except the inputs and the grading file (which some scripts handle differently) and the
+    arguments of the grader itself ("point_scale" and "backend").
+    
+    :param args: The parsed arguments (see ``get_grading_args_parser``).
+    :return: A dictionary with the keyword arguments.
+    """
+    return dict(audit_format=args.audit_format, corrections_file=args.corrections_file, archive_dir=args.archive_dir,
+                reconcile=args.reconcile, item_analysis=args.item_analysis, gradebook_file=args.gradebook_file,
+                grading_workers=args.grading_workers)
+
+
+def get_grading_args_parser() -> argparse.ArgumentParser:
+    """Returns a new argparse.ArgumentParser with the arguments of ``add_grading_args``."""
+    parser = argparse.ArgumentParser()
+    add_grading_args(parser)
+    return parser
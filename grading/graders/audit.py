@@ -0,0 +1,131 @@
+import json
+import os
+import sys
+
+import pandas as pd
+
+# file extension for each supported binary audit format
+AUDIT_FORMATS = {
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+# key of the schema metadata entry that holds the (JSON-encoded) run metadata
+METADATA_KEY = b"grading"
+
+
+def get_audit_format(audit_file: str) -> str:
+    """
+    Returns the audit format ("parquet" or "arrow") based on the file extension of
+    ``audit_file``. Raises a ValueError if the extension does not match any format.
+    
+    :param audit_file: The path of the audit file.
+    :return: The audit format, i.e., one of the keys of ``AUDIT_FORMATS``.
+    """
+    _, ext = os.path.splitext(audit_file)
+    for audit_format, audit_ext in AUDIT_FORMATS.items():
+        if ext.lower() == audit_ext:
+            return audit_format
+    raise ValueError(f"unknown audit file extension '{ext}' (supported: {list(AUDIT_FORMATS.values())})")
+
+
+def is_audit_file(file: str) -> bool:
+    """Returns whether ``file`` has the file extension of one of the supported audit formats."""
+    return os.path.splitext(file)[1].lower() in AUDIT_FORMATS.values()
+
+
+def get_module_constants(module_name: str) -> dict:
+    """
+    Returns all module-level constants (upper-case names with int, float or bool values)
+    of the module ``module_name``, e.g., the "MAX_POINTS" and "THRESHOLD_*" values of a
+    semester grader module. The module must already be imported.
+    
+    :param module_name: The (fully qualified) name of the module.
+    :return: A dictionary mapping each constant name to its value.
+    """
+    module = sys.modules[module_name]
+    return {k: v for k, v in vars(module).items()
+            if k.isupper() and isinstance(v, (int, float, bool)) and not k.startswith("_")}
+
+
+def write_audit_file(df: pd.DataFrame, audit_file: str, metadata: dict, audit_format: str = None):
+    """
+    Writes the full graded pd.DataFrame ``df`` as binary (typed) audit file, either as
+    Parquet or as Arrow IPC file, and attaches ``metadata`` (JSON-encoded) to the schema.
+    Requires the optional dependency "pyarrow".
+    
+    :param df: The pd.DataFrame to write.
+    :param audit_file: The path of the output audit file.
+    :param metadata: A JSON-serializable dictionary containing the run metadata.
+    :param audit_format: Either "parquet" or "arrow". Default: None, i.e., the format is
+        determined based on the file extension of ``audit_file`` (see ``get_audit_format``)
+    """
+    import pyarrow as pa
+    
+    if audit_format is None:
+        audit_format = get_audit_format(audit_file)
+    if audit_format not in AUDIT_FORMATS:
+        raise ValueError(f"unknown audit format '{audit_format}' (supported: {list(AUDIT_FORMATS)})")
+    
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata[METADATA_KEY] = json.dumps(metadata, default=str).encode("utf8")
+    table = table.replace_schema_metadata(schema_metadata)
+    
+    if audit_format == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, audit_file)
+    else:
+        with pa.OSFile(audit_file, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+
+def _read_table(audit_file: str, columns: list = None, memory_map: bool = True):
+    import pyarrow as pa
+    
+    if get_audit_format(audit_file) == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(audit_file, columns=columns, memory_map=memory_map)
+    source = pa.memory_map(audit_file, "r") if memory_map else pa.OSFile(audit_file, "rb")
+    table = pa.ipc.open_file(source).read_all()
+    return table.select(columns) if columns is not None else table
+
+
+def read_audit_metadata(audit_file: str) -> dict:
+    """
+    Reads only the run metadata of a binary audit file (without reading any data).
+    Requires the optional dependency "pyarrow".
+    
+    :param audit_file: The path of the audit file (".parquet" or ".arrow").
+    :return: The run metadata dictionary (empty if there is none).
+    """
+    import pyarrow as pa
+    
+    if get_audit_format(audit_file) == "parquet":
+        import pyarrow.parquet as pq
+        schema = pq.read_schema(audit_file)
+    else:
+        with pa.memory_map(audit_file, "r") as source:
+            schema = pa.ipc.open_file(source).schema
+    schema_metadata = schema.metadata or {}
+    return json.loads(schema_metadata[METADATA_KEY]) if METADATA_KEY in schema_metadata else dict()
+
+
+def read_audit_file(audit_file: str, columns: list = None, memory_map: bool = True) -> tuple[pd.DataFrame, dict]:
+    """
+    Reads a binary audit file that was written with ``write_audit_file``. Requires the
+    optional dependency "pyarrow".
+    
+    :param audit_file: The path of the audit file (".parquet" or ".arrow").
+    :param columns: If not None, only these columns are read. Default: None, i.e., all
+        columns are read
+    :param memory_map: Whether to memory-map the file instead of reading it into memory.
+        Default: True
+    :return: A tuple containing (as first entry) the pd.DataFrame with the original column
+        types, and as second entry, the run metadata dictionary (empty if there is none).
+    """
+    table = _read_table(audit_file, columns, memory_map)
+    schema_metadata = table.schema.metadata or {}
+    metadata = json.loads(schema_metadata[METADATA_KEY]) if METADATA_KEY in schema_metadata else dict()
+    return table.to_pandas(), metadata
@@ -0,0 +1,189 @@
+import re
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from graders import loader, util
+
+# the supported frame backends (see "get_backend"); "polars" is experimental and requires the optional dependency
+# "polars"
+BACKENDS = ["pandas", "polars"]
+# the backend that is used if a Grader does not specify one
+DEFAULT_BACKEND = "pandas"
+# the temporary position columns of the outer merge (see "PandasBackend.merge"), which restore the order
+# of an inner merge
+LEFT_POS, RIGHT_POS = "__moodle_pos", "__kusss_pos"
+
+
+class PandasBackend:
+    """
+    The frame backend of the participants, merge and export stages of
+    ``Grader.create_grading_file`` that uses pandas (the default). All other stages
+    (processing, filtering, grading) always use pandas, independent of the backend, i.e.,
+    the grading hooks of the graders (``_process_entries``, ``_create_grade_row``,
+    ``_evaluate_rules``) receive the same pd.DataFrames with every backend.
+    """
+    name = "pandas"
+    
+    def read_participants(self, files: list[str], sep: str, matr_id_col: str, study_id_col: str,
+                          encoding: str) -> tuple[object, pd.DataFrame]:
+        """
+        Reads and concatenates the participants CSV files (in the order of ``files``), checks
+        the matriculation IDs (see ``util.check_matr_id_format``) and drops duplicate entries.
+        
+        :param files: The paths of the participants CSV files.
+        :param sep: The separator character.
+        :param matr_id_col: The column that contains the matriculation ID.
+        :param study_id_col: The column that contains the study ID.
+        :param encoding: The encoding of the files.
+        :return: A tuple containing the participants without duplicates (as frame of this
+            backend) and the dropped duplicate entries (pd.DataFrame).
+        """
+        read_file = partial(loader.read_csv, sep=sep, usecols=[matr_id_col, study_id_col], encoding=encoding)
+        full_kdf = loader.read_concat(files, read_file, ignore_index=True)
+        util.check_matr_id_format(full_kdf[matr_id_col])
+        kdf = full_kdf.copy().drop_duplicates()
+        duplicates = full_kdf[full_kdf.duplicated()].drop_duplicates()
+        return kdf, duplicates
+    
+    def merge(self, df: pd.DataFrame, kdf, matr_id_col: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Merges the Moodle entries ``df`` with the participants ``kdf`` (see
+        ``self.read_participants``) in a single outer merge, which sorts every student into
+        "both", "moodle_only" or "kusss_only" (see ``reconciliation.STATUSES``).
+        
+        :param df: The Moodle entries (see ``Grader.df``).
+        :param kdf: The participants (as frame of this backend).
+        :param matr_id_col: The column of ``kdf`` that contains the matriculation ID.
+        :return: A tuple containing the merged pd.DataFrame, i.e., only the entries that are
+            found in both, in the order of ``df`` (the same as an inner merge), and the outer
+            merge with the columns "ID number", "First name", "Last name", the columns of
+            ``kdf`` and "status" (see ``reconciliation.create``).
+        """
+        outer = df.assign(**{LEFT_POS: np.arange(len(df))}).merge(
+            kdf.assign(**{RIGHT_POS: np.arange(len(kdf))}), left_on="ID number", right_on=matr_id_col, how="outer",
+            indicator="status")
+        both = outer["status"] == "both"
+        merged = outer[both].sort_values([LEFT_POS, RIGHT_POS]).drop(columns=[LEFT_POS, RIGHT_POS, "status"])
+        # the outer merge introduces missing values (and thus other types, e.g., float instead of int), which are
+        # not part of the entries found in both
+        merged = merged.astype({**df.dtypes.to_dict(), **kdf.dtypes.to_dict()}).reset_index(drop=True)
+        outer["status"] = outer["status"].cat.rename_categories(dict(left_only="moodle_only", right_only="kusss_only"))
+        return merged, outer[["ID number", "First name", "Last name", *kdf.columns, "status"]]
+    
+    def write_csv(self, df: pd.DataFrame, file: str, sep: str, header: bool, encoding: str):
+        """
+        Writes ``df`` to the CSV file ``file`` without index (see ``pd.DataFrame.to_csv``).
+        
+        :param df: The pd.DataFrame to write.
+        :param file: The path of the CSV file (compressed if it has a compression extension).
+        :param sep: The separator character.
+        :param header: Whether to write the header.
+        :param encoding: The encoding of the file.
+        """
+        df.to_csv(file, sep=sep, index=False, header=header, encoding=encoding)
+
+
+class PolarsBackend(PandasBackend):
+    """
+    The frame backend that uses Polars (see ``PandasBackend``), i.e., the participants
+    files are scanned and concatenated within a single lazy query, and the deduplication,
+    merge and export are executed multithreaded. The results are exactly the same as with
+    ``PandasBackend``. Files that Polars cannot read or write natively (compressed files,
+    encodings that are not ASCII-compatible) are handled like ``PandasBackend`` does.
+    Requires the optional dependency "polars". This backend is experimental, i.e., it is
+    not benchmarked to be faster than ``PandasBackend`` for the typical course sizes, where
+    the fixed overhead of the conversions to and from pandas might dominate.
+    """
+    name = "polars"
+    
+    def __init__(self):
+        import polars
+        
+        self.pl = polars
+    
+    @staticmethod
+    def _is_native(file: str, encoding: str, cols: list[str]) -> bool:
+        # Polars only decodes UTF-8, which is the same as any ASCII-compatible encoding (e.g., "ANSI") for the
+        # selected columns if their names are ASCII (the values are checked to be matriculation IDs anyway)
+        if loader.strip_compression(loader.split_member(file)[0])[1] != "":
+            return False
+        try:
+            return all(c.isascii() and c.encode(encoding) == c.encode("ascii") for c in cols)
+        except LookupError:
+            return False
+    
+    def read_participants(self, files: list[str], sep: str, matr_id_col: str, study_id_col: str,
+                          encoding: str) -> tuple[object, pd.DataFrame]:
+        pl = self.pl
+        cols = [matr_id_col, study_id_col]
+        scans = []
+        for f in files:
+            if self._is_native(f, encoding, cols):
+                # the full file is used for the schema inference (the same types as with pd.read_csv)
+                scans.append(pl.scan_csv(f, separator=sep, encoding="utf8-lossy", infer_schema_length=None,
+                                         null_values=[""]).select(cols))
+            else:
+                scans.append(pl.from_pandas(loader.read_csv(f, sep=sep, usecols=cols, encoding=encoding)).lazy())
+        full_kdf = pl.concat(scans, how="vertical").collect()
+        ids = full_kdf[matr_id_col]
+        if ids.dtype != pl.String or not ids.str.contains(r"^k\d{8}$").all():
+            raise ValueError(f"series does not contain valid ('k<8-digit-matr-id>') matriculation IDs: "
+                             f"{ids.to_pandas()}")
+        kdf = full_kdf.unique(maintain_order=True)
+        # the same as "full_kdf[full_kdf.duplicated()]" (all but the first occurrence)
+        duplicates = full_kdf.filter(~pl.struct(pl.all()).is_first_distinct()).unique(maintain_order=True)
+        return kdf, duplicates.to_pandas()
+    
+    def merge(self, df: pd.DataFrame, kdf, matr_id_col: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+        pl = self.pl
+        pdf = pl.from_pandas(df).with_row_index(LEFT_POS)
+        # coalesce=False keeps both key columns (like pd.merge with left_on and right_on)
+        outer = pdf.join(kdf.with_row_index(RIGHT_POS), left_on="ID number", right_on=matr_id_col, how="full",
+                         coalesce=False)
+        outer = outer.with_columns(status=pl.when(pl.col(LEFT_POS).is_null()).then(pl.lit("kusss_only"))
+                                   .when(pl.col(RIGHT_POS).is_null()).then(pl.lit("moodle_only"))
+                                   .otherwise(pl.lit("both")))
+        merged = outer.filter(pl.col("status") == "both").sort(LEFT_POS, RIGHT_POS).drop(LEFT_POS, RIGHT_POS,
+                                                                                         "status")
+        # the same types and missing values as the Moodle entries (Polars has no all-missing object columns, and its
+        # missing strings are None instead of NaN)
+        merged = merged.to_pandas().astype(df.dtypes.to_dict())
+        for c in merged.columns[merged.dtypes == object]:
+            merged[c] = merged[c].where(merged[c].notna(), np.nan)
+        outer = outer.select("ID number", "First name", "Last name", *kdf.columns, "status").to_pandas()
+        return merged, outer
+    
+    def write_csv(self, df: pd.DataFrame, file: str, sep: str, header: bool, encoding: str):
+        # Polars only writes uncompressed UTF-8 files, it formats floats (and rows of a single empty field) differently,
+        # and it does not support duplicate column names (such as the reason in the default export columns), so the
+        # columns are written by position
+        if (re.sub(r"[-_]", "", encoding.lower()) != "utf8" or loader.strip_compression(file)[1] != "" or
+                (header and df.columns.has_duplicates) or any(dtype.kind == "f" for dtype in df.dtypes) or
+                df.shape[1] < 2):
+            super().write_csv(df, file, sep, header, encoding)
+            return
+        pl = self.pl
+        pdf = pl.DataFrame({f"{i}": df.iloc[:, i] for i in range(df.shape[1])})
+        # pandas does not quote empty strings (but Polars does), which is the same as writing them as missing values
+        pdf = pdf.with_columns(pl.col(pl.Categorical).cast(pl.String)).with_columns(pl.col(pl.String).replace("", None))
+        if header:
+            pdf.columns = [str(c) for c in df.columns]
+        pdf.write_csv(file, separator=sep, include_header=header)
+
+
+def get_backend(name: str = None) -> PandasBackend:
+    """
+    Returns the frame backend ``name`` (see ``BACKENDS``).
+    
+    :param name: The name of the backend. Default: None = ``DEFAULT_BACKEND``
+    :return: The frame backend object.
+    """
+    if name is None:
+        name = DEFAULT_BACKEND
+    if name == "pandas":
+        return PandasBackend()
+    if name == "polars":
+        return PolarsBackend()
+    raise ValueError(f"unknown backend '{name}' (supported: {BACKENDS})")
@@ -0,0 +1,60 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from graders import registry
+
+
+def measure(code: str, repeat: int = 5) -> list[float]:
+    """
+    Measures the wall-clock time of running ``code`` in a fresh Python interpreter,
+    i.e., including the interpreter startup and all imports (nothing is cached
+    between the runs except for the operating system's file cache).
+    
+    :param code: The Python code to run (passed via "-c").
+    :param repeat: The number of runs. Default: 5
+    :return: A list with the time in seconds of each run.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_benchmark(repeat: int = 5, all_graders: bool = False):
+    """
+    Prints the startup time of the unified CLI (see "graders/cli.py") compared to
+    importing the grader modules, which is what every grader script invocation pays.
+    
+    :param repeat: The number of runs per measurement. Default: 5
+    :param all_graders: Whether to measure the import of every grader module instead
+        of only the first one. Default: False
+    """
+    benchmarks = {
+        "python (baseline)": "pass",
+        "import graders.cli": "import graders.cli",
+        "cli: list": "from graders.cli import main; main(['list'])",
+        "import graders.grader": "import graders.grader",
+    }
+    entries = list(registry.discover().values())
+    for entry in entries if all_graders else entries[:1]:
+        benchmarks[f"import {entry.module}"] = f"import {entry.module}"
+    
+    print(f"{'benchmark':<60} {'median':>8} {'min':>8}")
+    for name, code in benchmarks.items():
+        times = measure(code, repeat)
+        print(f"{name:<60} {statistics.median(times):>7.3f}s {min(times):>7.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import-time benchmark of the unified CLI and the grader modules.")
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                        help="The number of runs per measurement.")
+    parser.add_argument("--all", action="store_true",
+                        help="Measure the import of every grader module instead of only the first one.")
+    args = parser.parse_args()
+    run_benchmark(args.repeat, args.all)
@@ -0,0 +1,165 @@
+import argparse
+import shlex
+import time
+
+from graders import arguments, registry
+
+# like "graders/registry.py", this module must not import any heavy dependency (numpy, pandas, ...)
+# at module level, so that argument validation and listing the graders is instant
+
+
+def parse_grader_args(entry: registry.GraderEntry, grader_args: list[str]) -> argparse.Namespace:
+    """
+    Parses ``grader_args`` with the same arguments as the grader script of ``entry``
+    would. The grader module is only imported if it defines additional arguments
+    (function ``add_args``), otherwise, the arguments are validated without any import.
+    
+    :param entry: The ``registry.GraderEntry`` of the grader.
+    :param grader_args: The arguments to parse (without the grader key).
+    :return: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(prog=f"python -m graders run {entry.key}",
+                                     description=f"{entry.class_name} ({entry.module})")
+    arguments.add_grading_args(parser)
+    if entry.has_add_args:
+        entry.load_module().add_args(parser)
+    return parser.parse_args(grader_args)
+
+
+def run(key: str, grader_args: list[str]):
+    """
+    Runs the grader script with the key ``key`` (see ``registry.discover``) with the
+    arguments ``grader_args``, i.e., the same as calling the respective grader module
+    as script. All heavy imports are deferred until after the argument validation.
+    
+    :param key: The grader key "<semester>/<course>", e.g., "ss2024/python2lecture".
+    :param grader_args: The arguments of the grader script.
+    """
+    entry = registry.get_entry(key)
+    args = parse_grader_args(entry, grader_args)
+    entry.load_module().main(args)
+
+
+def read_batch(batch_file: str) -> list[tuple[registry.GraderEntry, argparse.Namespace]]:
+    """
+    Reads and validates all grader invocations of ``batch_file`` (see ``run_batch``)
+    without running them. Raises a KeyError with the file and line number if a grader key
+    is unknown.
+    
+    :param batch_file: The path of the batch file.
+    :return: A list of tuples containing the ``registry.GraderEntry`` and the parsed
+        arguments of each grader invocation.
+    """
+    with open(batch_file, encoding="utf8") as f:
+        lines = [line.strip() for line in f]
+    jobs = []
+    for i, line in enumerate(lines):
+        if len(line) == 0 or line.startswith("#"):
+            continue
+        key, *grader_args = shlex.split(line)
+        try:
+            entry = registry.get_entry(key)
+        except KeyError as e:
+            raise KeyError(f"{batch_file}:{i + 1}: {e.args[0]}") from e
+        jobs.append((entry, parse_grader_args(entry, grader_args)))
+    return jobs
+
+
+def run_batch(batch_file: str):
+    """
+    Runs multiple grader scripts within the same process, so that the startup cost
+    (imports) is only paid once. Each non-empty line of ``batch_file`` that does not
+    start with "#" contains a grader key followed by the arguments of this grader
+    script (shell-like quoting is supported), e.g.:
+        
+        ss2024/python2lecture -mf moodle.csv -kpf kusss1.csv kusss2.csv
+    
+    All lines are validated before any grader is run (see ``read_batch``).
+    
+    :param batch_file: The path of the batch file.
+    """
+    _run_jobs(read_batch(batch_file))
+
+
+def _run_jobs(jobs: list[tuple[registry.GraderEntry, argparse.Namespace]]):
+    for entry, args in jobs:
+        print(f"===== {entry.key} =====")
+        start = time.perf_counter()
+        entry.load_module().main(args)
+        print(f"===== {entry.key} finished in {time.perf_counter() - start:.2f}s =====\n")
+
+
+def list_graders():
+    for entry in registry.discover().values():
+        print(f"{entry.key:<30} {entry.class_name}")
+
+
+def submit(key: str, grader_args: list[str], host: str, port: int):
+    """
+    Runs the grader script with the key ``key`` with the arguments ``grader_args`` within
+    a running grading daemon (see ``daemon.submit``) and prints its output.
+    
+    :param key: The grader key "<semester>/<course>", e.g., "ss2024/python2lecture".
+    :param grader_args: The arguments of the grader script.
+    :param host: The host of the daemon.
+    :param port: The port of the daemon.
+    """
+    from graders import daemon
+    
+    result = daemon.submit(key, grader_args, host, port)
+    print(result["output"], end="")
+    for message in result["warnings"]:
+        print(f"warning: {message}")
+    print(f"===== {key} finished in {result['seconds']:.2f}s (daemon) =====")
+
+
+def main(argv: list[str] = None):
+    from graders import daemon
+    
+    parser = argparse.ArgumentParser(prog="python -m graders",
+                                     description="Unified entry point for all grader scripts.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="List all available graders.")
+    run_parser = subparsers.add_parser("run", help="Run a single grader script.")
+    run_parser.add_argument("grader", type=str,
+                            help="The grader key '<semester>/<course>' (see 'list'), e.g., 'ss2024/python2lecture'.")
+    run_parser.add_argument("grader_args", nargs=argparse.REMAINDER,
+                            help="The arguments of the grader script (use '<grader> -h' for details).")
+    batch_parser = subparsers.add_parser("batch", help="Run multiple grader scripts within the same process.")
+    batch_parser.add_argument("batch_file", type=str,
+                              help="File with one grader invocation '<grader> <arguments...>' per line.")
+    serve_parser = subparsers.add_parser("serve", help="Run the grading daemon, which keeps the graders and their "
+                                                       "inputs in memory between grading requests (see 'submit').")
+    submit_parser = subparsers.add_parser("submit", help="Run a single grader script within the grading daemon.")
+    for p in [serve_parser, submit_parser]:
+        p.add_argument("--host", type=str, default=daemon.DEFAULT_HOST, help="The host of the grading daemon.")
+        p.add_argument("--port", type=int, default=daemon.DEFAULT_PORT, help="The port of the grading daemon.")
+    submit_parser.add_argument("grader", type=str, help="The grader key '<semester>/<course>' (see 'list').")
+    submit_parser.add_argument("grader_args", nargs=argparse.REMAINDER, help="The arguments of the grader script.")
+    args = parser.parse_args(argv)
+    
+    if args.command == "list":
+        list_graders()
+    elif args.command == "serve":
+        daemon.serve(args.host, args.port)
+    elif args.command == "submit":
+        try:
+            submit(args.grader, args.grader_args, args.host, args.port)
+        except ValueError as e:
+            # the request failed within the daemon (e.g., unknown grader key or invalid arguments)
+            parser.exit(1, f"error: {e}\n")
+    elif args.command == "run":
+        # only the lookup of the grader key is caught, so errors of the grader script keep their traceback
+        try:
+            entry = registry.get_entry(args.grader)
+        except KeyError as e:
+            # unknown grader key (str(e) would wrap the message in quotes, so use the raw message)
+            parser.exit(1, f"error: {e.args[0]}\n")
+        entry.load_module().main(parse_grader_args(entry, args.grader_args))
+    else:
+        try:
+            jobs = read_batch(args.batch_file)
+        except KeyError as e:
+            # unknown grader key in the batch file (with file and line number)
+            parser.exit(1, f"error: {e.args[0]}\n")
+        _run_jobs(jobs)
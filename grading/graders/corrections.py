@@ -0,0 +1,99 @@
+import re
+
+import pandas as pd
+
+# columns of a correction ledger file
+LEDGER_COLS = ["column", "adjustment", "scope", "reason"]
+# scope that applies a correction to all students
+SCOPE_ALL = "all"
+
+
+def read_ledger(ledger_file: str, sep: str = ";", encoding: str = "utf8") -> pd.DataFrame:
+    """
+    Reads a correction ledger, i.e., a CSV file with a header and the columns
+    ``LEDGER_COLS``, where each line describes one point correction:
+        
+        column;adjustment;scope;reason
+        Quiz: Exam (Real);0.5;all;incorrect question 7
+        Quiz: Retry Exam (Real);0.833;k01234567 k11234567;wrong answer key for group B
+    
+    "column" is the (English) Moodle column, "adjustment" the points that are added (can
+    be negative), "scope" either "all" or a whitespace- or comma-separated list of
+    matriculation IDs (format "k<8-digit-matr-id>"), and "reason" is a free text. Raises
+    a ValueError if the ledger is malformed.
+    
+    :param ledger_file: The path of the ledger CSV file.
+    :param sep: The separator character. Default: ";"
+    :param encoding: The encoding of the file. Default: "utf8"
+    :return: A pd.DataFrame with the columns ``LEDGER_COLS``, where "scope" is either the
+        string "all" or a list of matriculation IDs.
+    """
+    ledger = pd.read_csv(ledger_file, sep=sep, encoding=encoding, dtype=dict(column=str, scope=str, reason=str))
+    if list(ledger.columns) != LEDGER_COLS:
+        raise ValueError(f"correction ledger '{ledger_file}' must have the columns {LEDGER_COLS}, "
+                         f"but has: {list(ledger.columns)}")
+    if ledger[LEDGER_COLS[:3]].isna().any().any() or not pd.api.types.is_numeric_dtype(ledger["adjustment"]):
+        raise ValueError(f"correction ledger '{ledger_file}' contains missing or non-numeric values:\n{ledger}")
+    ledger["reason"] = ledger["reason"].fillna("")
+    ledger["scope"] = [s.strip() if s.strip() == SCOPE_ALL else re.split(r"[\s,]+", s.strip())
+                       for s in ledger["scope"]]
+    invalid = [i for s in ledger["scope"] if s != SCOPE_ALL for i in s if re.match(r"k\d{8}$", i) is None]
+    if len(invalid) > 0:
+        raise ValueError(f"correction ledger '{ledger_file}' contains invalid scopes (must be '{SCOPE_ALL}' or "
+                         f"'k<8-digit-matr-id>' IDs): {invalid}")
+    return ledger
+
+
+def get_unknown_ids(ledger: pd.DataFrame, ids: pd.Series) -> list[str]:
+    """Returns all IDs of the scopes of ``ledger`` that are not contained in ``ids``."""
+    scope_ids = {i for s in ledger["scope"] if s != SCOPE_ALL for i in s}
+    return sorted(scope_ids - set(ids))
+
+
+def apply_corrections(df: pd.DataFrame, ledger: pd.DataFrame, id_col: str = "ID number") -> tuple[pd.DataFrame,
+                                                                                                   pd.DataFrame]:
+    """
+    Applies all corrections of ``ledger`` (see ``read_ledger``) to ``df`` at once: The
+    adjustments of all ledger entries are first summed up per (student, column), and the
+    resulting adjustment matrix is then added to the corrected columns in a single
+    vectorized operation. Missing points (NaN) remain missing, i.e., a correction never
+    creates a submission or an exam attempt.
+    
+    :param df: The pd.DataFrame containing the points (not modified).
+    :param ledger: The correction ledger.
+    :param id_col: The column of ``df`` that contains the matriculation IDs. Default: "ID number"
+    :return: A tuple containing (as first entry) the corrected pd.DataFrame, and as second
+        entry, the applied ledger with the additional column "n_affected" (the number of
+        students with non-missing points whose points were changed by each entry), where
+        "scope" is converted back to a string.
+    """
+    unknown_cols = sorted(set(ledger["column"]) - set(df.columns))
+    if len(unknown_cols) > 0:
+        raise ValueError(f"the correction ledger contains unknown columns: {unknown_cols}")
+    cols = list(dict.fromkeys(ledger["column"]))
+    ledger = ledger.reset_index(drop=True)
+    is_all = ledger["scope"].apply(lambda s: s == SCOPE_ALL)
+    
+    # one row per (entry, ID) for all ID-scoped entries
+    per_id = ledger[~is_all].explode("scope").rename(columns=dict(scope="id"))
+    adjustment = pd.DataFrame(0.0, index=df.index, columns=cols)
+    if is_all.any():
+        adjustment += ledger[is_all].groupby("column")["adjustment"].sum().reindex(cols, fill_value=0)
+    if len(per_id) > 0:
+        id_adjustment = per_id.pivot_table(index="id", columns="column", values="adjustment", aggfunc="sum")
+        adjustment += id_adjustment.reindex(index=df[id_col], columns=cols).fillna(0).set_axis(df.index)
+    corrected = df.copy()
+    corrected[cols] = df[cols] + adjustment
+    
+    # number of affected students (with non-missing points) per entry
+    present = df[cols].notna().set_axis(df[id_col]).rename_axis("id")
+    n_affected = pd.Series(0, index=ledger.index)
+    if is_all.any():
+        n_affected[is_all] = [present[c].sum() for c in ledger.loc[is_all, "column"]]
+    if len(per_id) > 0:
+        present_long = present.stack().rename("present").reset_index().rename(columns=dict(level_1="column"))
+        matched = per_id.reset_index().merge(present_long, on=["id", "column"], how="inner")
+        n_affected = n_affected.add(matched.groupby("index")["present"].sum(), fill_value=0).astype(int)
+    applied = ledger.assign(scope=[s if s == SCOPE_ALL else " ".join(s) for s in ledger["scope"]],
+                            n_affected=n_affected)
+    return corrected, applied
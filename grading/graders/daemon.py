@@ -0,0 +1,311 @@
+import contextlib
+import importlib
+import io
+import json
+import os
+import secrets
+import sys
+import time
+import traceback
+import warnings
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib import error, request
+
+from graders import cli, registry
+
+# like "graders/cli.py", this module must not import any heavy dependency (numpy, pandas, ...) at
+# module level, so that submitting a request to a running daemon is instant (the daemon itself
+# imports everything once at startup, see "GradingService")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# the directory of the access token files of the running daemons (one per port, readable only by the user, see
+# "create_server"), which "submit" sends along with each request
+DEFAULT_TOKEN_DIR = os.path.join(os.path.expanduser("~"), ".graders")
+TOKEN_HEADER = "X-Grading-Token"
+
+
+class RequestError(ValueError):
+    """Raised if a grading request is invalid, i.e., an unknown grader key or invalid arguments."""
+
+
+def get_token_file(port: int, token_dir: str = None) -> str:
+    """
+    Returns the path of the access token file of the grading daemon on port ``port``.
+    
+    :param port: The port of the daemon.
+    :param token_dir: The directory of the token files. Default: None, i.e., ``DEFAULT_TOKEN_DIR``
+    :return: The path of the token file.
+    """
+    return os.path.join(DEFAULT_TOKEN_DIR if token_dir is None else token_dir, f"daemon-{port}.token")
+
+
+class GradingService:
+    """
+    Runs grader scripts (see ``cli.run``) within a long-running process, keeping everything
+    in memory between the runs: the imported grader modules, the grader registry (see
+    ``registry.discover``) and the Grader objects of the grader scripts, i.e., their prepared
+    Moodle entries and memoized stages (see ``Grader.cached``). A grader module is reloaded
+    if its source file changed since it was imported. Changes of the shared modules (e.g.,
+    "graders/grader.py" or "graders/util.py") are not reloaded, since every grader module
+    (and Grader object) depends on them, so the daemon must be restarted. Such changes are
+    detected and reported as warning of every run (see ``self.grade``). Runs are not
+    thread-safe and must be serialized (see ``create_server``).
+    """
+    
+    def __init__(self, preload: bool = True):
+        """
+        Initializes a new GradingService object and enables the instance cache of the graders
+        (see ``grader.set_instance_cache``).
+        
+        :param preload: Whether to import all grader modules right away (otherwise, they are
+            imported on their first run). Default: True
+        """
+        from graders import grader
+        
+        grader.set_instance_cache(True)
+        # the modification time of the source file of each grader module when it was (re)loaded
+        self._mtimes = dict()
+        # the modification time of the source file of each shared module when it was first seen
+        self._shared_mtimes = dict()
+        self.n_reloads = 0
+        if preload:
+            for key in registry.discover():
+                self._load(key)
+    
+    def _load(self, key: str) -> tuple[registry.GraderEntry, object]:
+        try:
+            entry = registry.get_entry(key)
+        except KeyError:
+            # the grader module might have been added since the registry was cached
+            registry.discover.cache_clear()
+            try:
+                entry = registry.get_entry(key)
+            except KeyError as e:
+                raise RequestError(e.args[0]) from None
+        mtime = os.stat(entry.file).st_mtime_ns
+        if entry.module in sys.modules and self._mtimes.get(entry.module, mtime) != mtime:
+            # the registry entry (e.g., "has_add_args") is parsed again as well
+            registry.discover.cache_clear()
+            entry = registry.get_entry(key)
+            module = importlib.reload(sys.modules[entry.module])
+            self.n_reloads += 1
+            print(f"reloaded grader module '{entry.module}'")
+        else:
+            module = entry.load_module()
+        self._mtimes[entry.module] = mtime
+        return entry, module
+    
+    def _changed_shared_modules(self) -> list[str]:
+        # all loaded modules of the "graders" package except for the grader modules, which are reloaded
+        grader_modules = {entry.module for entry in registry.discover().values()}
+        changed = []
+        for name, module in list(sys.modules.items()):
+            file = getattr(module, "__file__", None)
+            if not name.startswith("graders.") or name in grader_modules or file is None:
+                continue
+            mtime = os.stat(file).st_mtime_ns
+            if self._shared_mtimes.setdefault(name, mtime) != mtime:
+                changed.append(file)
+        return sorted(changed)
+    
+    def keys(self) -> list[str]:
+        """Returns the keys of all available graders (see ``registry.discover``)."""
+        return list(registry.discover())
+    
+    def grade(self, key: str, grader_args: list[str], cwd: str = None) -> dict:
+        """
+        Runs the grader script with the key ``key`` with the arguments ``grader_args`` (the
+        same as ``cli.run``), reusing everything that is still valid from previous runs.
+        
+        :param key: The grader key "<semester>/<course>", e.g., "ss2024/python2lecture".
+        :param grader_args: The arguments of the grader script.
+        :param cwd: If not None, the working directory of the run, i.e., relative paths in
+            ``grader_args`` are resolved against it. Default: None
+        :return: A dictionary containing the captured output ("output"), the messages of all
+            issued warnings ("warnings") and the duration in seconds ("seconds"). Raises a
+            RequestError if the grader key or the arguments are invalid.
+        """
+        start = time.perf_counter()
+        entry, module = self._load(key)
+        output = io.StringIO()
+        previous_cwd = os.getcwd()
+        try:
+            if cwd is not None:
+                os.chdir(cwd)
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output), \
+                    warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                try:
+                    args = cli.parse_grader_args(entry, grader_args)
+                except SystemExit:
+                    # argparse already wrote the usage and error message to the (captured) output
+                    raise RequestError(f"invalid arguments for '{key}': {output.getvalue().strip()}") from None
+                module.main(args)
+        finally:
+            os.chdir(previous_cwd)
+        messages = [str(w.message) for w in caught]
+        changed = self._changed_shared_modules()
+        if len(changed) > 0:
+            messages.append(f"the shared modules {changed} changed since they were imported, so this run still used "
+                            f"their previous version (restart the grading daemon to apply the changes)")
+        return dict(output=output.getvalue(), warnings=messages, seconds=time.perf_counter() - start)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    # GET /graders: the available grader keys
+    # POST /grade: {"grader": "<key>", "args": ["-mf", "moodle.csv", ...], "cwd": "<dir>"}, see "GradingService.grade"
+    # every request must carry the access token of the daemon (see "create_server"), and requests of web pages
+    # (with an "Origin" header) are always rejected, so that a browser cannot trigger any grading run
+    
+    def _respond(self, status: int, content: dict):
+        body = json.dumps(content).encode("utf8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _authorize(self) -> bool:
+        if self.headers.get("Origin") is not None:
+            self._respond(403, dict(ok=False, error="cross-origin requests are not allowed"))
+            return False
+        if not secrets.compare_digest(self.headers.get(TOKEN_HEADER, ""), self.server.token):
+            self._respond(401, dict(ok=False, error=f"missing or invalid access token (header '{TOKEN_HEADER}')"))
+            return False
+        return True
+    
+    def do_GET(self):
+        if not self._authorize():
+            return
+        if self.path != "/graders":
+            self._respond(404, dict(ok=False, error=f"unknown path '{self.path}'"))
+            return
+        self._respond(200, dict(ok=True, graders=self.server.service.keys()))
+    
+    def do_POST(self):
+        if not self._authorize():
+            return
+        if self.path != "/grade":
+            self._respond(404, dict(ok=False, error=f"unknown path '{self.path}'"))
+            return
+        # a JSON content type cannot be sent by a web page without a CORS preflight (which is never answered)
+        if self.headers.get_content_type() != "application/json":
+            self._respond(415, dict(ok=False, error="the content type must be 'application/json'"))
+            return
+        try:
+            content = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if not isinstance(content, dict) or "grader" not in content:
+                raise RequestError("the request must be a JSON object with the entry 'grader'")
+        except ValueError as e:
+            self._respond(400, dict(ok=False, error=f"{type(e).__name__}: {e}"))
+            return
+        try:
+            result = self.server.service.grade(content["grader"], list(content.get("args", [])), content.get("cwd"))
+        except RequestError as e:
+            # unknown grader key or invalid arguments (errors of the grader script itself are internal errors)
+            self._respond(400, dict(ok=False, error=f"{type(e).__name__}: {e}"))
+            return
+        except Exception as e:
+            self._respond(500, dict(ok=False, error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc()))
+            return
+        self._respond(200, dict(ok=True, **result))
+    
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def _write_token_file(token_file: str, token: str):
+    os.makedirs(os.path.dirname(token_file), mode=0o700, exist_ok=True)
+    # create the file readable only by the user (also restrict an existing file before writing the new token)
+    fd = os.open(token_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.chmod(token_file, 0o600)
+    with os.fdopen(fd, "w", encoding="utf8") as f:
+        f.write(token)
+
+
+def create_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, preload: bool = True,
+                  verbose: bool = True, token_dir: str = None) -> HTTPServer:
+    """
+    Creates the HTTP server of the grading daemon (see ``GradingService``), which handles
+    one request at a time (``serve_forever`` starts it). The endpoints are "GET /graders"
+    (the available grader keys) and "POST /grade" with the JSON content {"grader": <key>,
+    "args": <list of arguments of the grader script>, "cwd": <working directory>} (see
+    ``submit``). The grader scripts read and write the files on the server side, so every
+    request must carry the access token of this server in the header ``TOKEN_HEADER``. The
+    token is newly generated and written to a file that only the user can read (see
+    ``get_token_file``). Requests with an "Origin" header (i.e., from web pages) and POST
+    requests without the content type "application/json" are rejected.
+    
+    :param host: The host to bind. Default: ``DEFAULT_HOST`` (only local connections)
+    :param port: The port to bind (0 = any free port, see ``server.server_address``).
+        Default: ``DEFAULT_PORT``
+    :param preload: Whether to import all grader modules right away. Default: True
+    :param verbose: Whether to log every request. Default: True
+    :param token_dir: The directory of the token file. Default: None, i.e.,
+        ``DEFAULT_TOKEN_DIR``
+    :return: The HTTP server, where ``server.token_file`` is the path of its token file.
+    """
+    server = HTTPServer((host, port), _RequestHandler)
+    server.token = secrets.token_urlsafe(32)
+    server.token_file = get_token_file(server.server_address[1], token_dir)
+    _write_token_file(server.token_file, server.token)
+    server.service = GradingService(preload=preload)
+    server.verbose = verbose
+    return server
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, token_dir: str = None):
+    """
+    Runs the grading daemon (see ``create_server``) until it is interrupted. The token file
+    is removed afterwards.
+    
+    :param host: The host to bind. Default: ``DEFAULT_HOST`` (only local connections)
+    :param port: The port to bind. Default: ``DEFAULT_PORT``
+    :param token_dir: The directory of the token file. Default: None, i.e.,
+        ``DEFAULT_TOKEN_DIR``
+    """
+    server = create_server(host, port, token_dir=token_dir)
+    print(f"grading daemon listening on http://{server.server_address[0]}:{server.server_address[1]} "
+          f"(access token: '{server.token_file}')")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.remove(server.token_file)
+
+
+def submit(key: str, grader_args: list[str], host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+           token_dir: str = None) -> dict:
+    """
+    Submits a grading request to a running grading daemon (see ``create_server``). The
+    current working directory is sent along, so relative paths in ``grader_args`` are
+    resolved the same as with ``cli.run``. The access token is read from the token file of
+    the daemon (see ``get_token_file``).
+    
+    :param key: The grader key "<semester>/<course>", e.g., "ss2024/python2lecture".
+    :param grader_args: The arguments of the grader script.
+    :param host: The host of the daemon. Default: ``DEFAULT_HOST``
+    :param port: The port of the daemon. Default: ``DEFAULT_PORT``
+    :param token_dir: The directory of the token file. Default: None, i.e.,
+        ``DEFAULT_TOKEN_DIR``
+    :return: The result of the run (see ``GradingService.grade``).
+    """
+    token_file = get_token_file(port, token_dir)
+    try:
+        with open(token_file, encoding="utf8") as f:
+            token = f.read()
+    except FileNotFoundError:
+        raise ValueError(f"no access token of a grading daemon on port {port} found ('{token_file}')") from None
+    data = json.dumps({"grader": key, "args": grader_args, "cwd": os.getcwd()}).encode("utf8")
+    req = request.Request(f"http://{host}:{port}/grade", data=data,
+                          headers={"Content-Type": "application/json", TOKEN_HEADER: token})
+    try:
+        with request.urlopen(req) as response:
+            return json.loads(response.read())
+    except error.HTTPError as e:
+        content = json.loads(e.read())
+        raise ValueError(f"grading request failed: {content['error']}") from None
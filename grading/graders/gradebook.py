@@ -0,0 +1,234 @@
+import json
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+
+# the schema of the gradebook database (created if necessary, see "connect"), where the indexes cover the lookups
+# of the query helpers, i.e., by matriculation ID (all courses) and by course and semester
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run INTEGER PRIMARY KEY,
+    semester TEXT NOT NULL,
+    semester_order INTEGER NOT NULL,
+    course TEXT NOT NULL,
+    grader TEXT,
+    created TEXT NOT NULL,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS inputs (
+    run INTEGER NOT NULL REFERENCES runs(run),
+    file TEXT NOT NULL,
+    hash TEXT
+);
+CREATE TABLE IF NOT EXISTS grades (
+    run INTEGER NOT NULL REFERENCES runs(run),
+    id TEXT NOT NULL,
+    skz INTEGER,
+    grade INTEGER NOT NULL,
+    reason TEXT,
+    rule_trace INTEGER
+);
+CREATE TABLE IF NOT EXISTS points (
+    run INTEGER NOT NULL REFERENCES runs(run),
+    id TEXT NOT NULL,
+    skz INTEGER,
+    item TEXT NOT NULL,
+    points REAL
+);
+CREATE INDEX IF NOT EXISTS runs_course_semester ON runs(course, semester);
+CREATE INDEX IF NOT EXISTS inputs_run ON inputs(run);
+CREATE INDEX IF NOT EXISTS grades_id ON grades(id, run);
+CREATE INDEX IF NOT EXISTS grades_run ON grades(run);
+CREATE INDEX IF NOT EXISTS points_id ON points(id, run);
+"""
+# the condition (on "grades g JOIN runs r") that keeps the latest grade of each (ID, SKZ, semester, course), i.e.,
+# the grades that were actually uploaded to KUSSS (like "archive.read_latest_grades"): regrades within a semester
+# replace the previous grades, but runs that only grade some students (e.g., only the retry exam participants or a
+# single participants file) keep the previous grades of all other students; the lookup uses the index on the ID
+LATEST_GRADE = ("g.run = (SELECT MAX(g2.run) FROM grades g2 JOIN runs r2 ON r2.run = g2.run "
+                "WHERE g2.id = g.id AND g2.skz IS g.skz AND r2.semester = r.semester AND r2.course = r.course)")
+NEGATIVE_GRADE = 5
+
+
+def semester_order(semester: str) -> int:
+    """
+    Returns the chronological order of a semester, where the summer semester (ss) of a
+    year comes before its winter semester (ws), e.g., "ss2024" < "ws2024" < "ss2025".
+    
+    :param semester: The semester, e.g., "ss2024".
+    :return: An integer that sorts semesters chronologically.
+    """
+    return int(semester[2:]) * 2 + (semester[:2] == "ws")
+
+
+def connect(db_file: str) -> sqlite3.Connection:
+    """
+    Opens the SQLite gradebook ``db_file`` and creates its tables and indexes if they do not
+    exist yet (see ``SCHEMA``).
+    
+    :param db_file: The path of the gradebook database file (created if necessary).
+    :return: The connection, which must be closed by the caller.
+    """
+    con = sqlite3.connect(db_file)
+    con.executescript(SCHEMA)
+    return con
+
+
+def write_run(db_file: str, df: pd.DataFrame, semester: str, course: str, metadata: dict = None,
+              points: pd.DataFrame = None, run: datetime = None) -> int:
+    """
+    Appends a grading run to the SQLite gradebook ``db_file`` in a single transaction, i.e.,
+    the run (semester, course, grader and metadata), its input files with their hashes (from
+    the "input_hashes" of ``metadata``), the grades and (optionally) the points. Existing runs
+    are never modified.
+    
+    :param db_file: The path of the gradebook database file (created if necessary).
+    :param df: The grades with the columns "id", "skz", "grade", "reason" and (optionally)
+        "rule_trace".
+    :param semester: The semester, e.g., "ss2024".
+    :param course: The course, e.g., "python2lecture".
+    :param metadata: If not None, a JSON-serializable dictionary containing the run metadata
+        (see ``Grader._get_run_metadata``). Default: None
+    :param points: If not None, the points of the graded entries in wide format, i.e., the
+        columns "id" and "skz" plus one column per item (e.g., an exam or an assignment total).
+        Missing points (NaN) are not stored. Default: None
+    :param run: The run timestamp. Default: None, i.e., the current time
+    :return: The ID of the new run.
+    """
+    if metadata is None:
+        metadata = dict()
+    if run is None:
+        run = datetime.now()
+    df = df.copy()
+    if "rule_trace" not in df.columns:
+        df["rule_trace"] = None
+    df = df[["id", "skz", "grade", "reason", "rule_trace"]].astype(object).where(df.notna(), None)
+    with closing(connect(db_file)) as con, con:
+        cursor = con.execute("INSERT INTO runs (semester, semester_order, course, grader, created, metadata) "
+                             "VALUES (?, ?, ?, ?, ?, ?)",
+                             (semester, semester_order(semester), course, metadata.get("grader"),
+                              run.isoformat(timespec="seconds"), json.dumps(metadata, default=str)))
+        run_id = cursor.lastrowid
+        con.executemany("INSERT INTO inputs VALUES (?, ?, ?)",
+                        [(run_id, f, h) for f, h in metadata.get("input_hashes", dict()).items()])
+        con.executemany("INSERT INTO grades VALUES (?, ?, ?, ?, ?, ?)",
+                        [(run_id, *row) for row in df.itertuples(index=False, name=None)])
+        if points is not None:
+            long_df = points.melt(id_vars=["id", "skz"], var_name="item", value_name="points").dropna(subset="points")
+            long_df = long_df.astype(object).where(long_df.notna(), None)
+            con.executemany("INSERT INTO points VALUES (?, ?, ?, ?, ?)",
+                            [(run_id, *row) for row in long_df.itertuples(index=False, name=None)])
+    return run_id
+
+
+def _query(db_file: str, sql: str, params: list) -> pd.DataFrame:
+    with closing(connect(db_file)) as con:
+        return pd.read_sql_query(sql, con, params=params)
+
+
+def _in(values: list) -> str:
+    return f"({', '.join('?' * len(values))})"
+
+
+def read_runs(db_file: str, semesters: list[str] = None, courses: list[str] = None) -> pd.DataFrame:
+    """
+    Reads the grading runs of the gradebook ``db_file`` (see ``write_run``).
+    
+    :param db_file: The path of the gradebook database file.
+    :param semesters: If not None, only the runs of these semesters are read. Default: None
+    :param courses: If not None, only the runs of these courses are read. Default: None
+    :return: A pd.DataFrame with the columns "run", "semester", "course", "grader", "created"
+        and "n_grades", sorted by "run".
+    """
+    sql = ("SELECT r.run, r.semester, r.course, r.grader, r.created, COUNT(g.id) AS n_grades "
+           "FROM runs r LEFT JOIN grades g ON g.run = r.run WHERE 1")
+    params = []
+    for col, values in [("semester", semesters), ("course", courses)]:
+        if values is not None:
+            sql += f" AND r.{col} IN {_in(values)}"
+            params += list(values)
+    return _query(db_file, sql + " GROUP BY r.run ORDER BY r.run", params)
+
+
+def read_inputs(db_file: str, run: int) -> dict[str, str]:
+    """
+    Returns the input files of a grading run of the gradebook ``db_file``.
+    
+    :param db_file: The path of the gradebook database file.
+    :param run: The ID of the run (see ``write_run``).
+    :return: A dictionary mapping the input files to their hashes (see ``util.file_hash``).
+    """
+    df = _query(db_file, "SELECT file, hash FROM inputs WHERE run = ?", [int(run)])
+    return dict(zip(df["file"], df["hash"]))
+
+
+def student_history(db_file: str, matr_id: str, courses: list[str] = None, all_runs: bool = False) -> pd.DataFrame:
+    """
+    Returns the attempt history of a student across all courses of the gradebook
+    ``db_file``, i.e., the grade (and points) of each (semester, course) the student was
+    graded in, in chronological order. The lookup uses the index on the matriculation ID.
+    
+    :param db_file: The path of the gradebook database file.
+    :param matr_id: The matriculation ID, e.g., "k12345678".
+    :param courses: If not None, only these courses are considered. Default: None
+    :param all_runs: If True, the grades of all runs are returned (e.g., to see regrades),
+        otherwise, only the latest grade of each (SKZ, semester, course). Default: False
+    :return: A pd.DataFrame with the columns "run", "semester", "course", "created", "skz",
+        "grade", "reason", "rule_trace" and one column per item of the stored points (see
+        ``write_run``), sorted chronologically (by semester and run).
+    """
+    sql = ("SELECT g.run, r.semester, r.course, r.created, g.skz, g.grade, g.reason, g.rule_trace "
+           "FROM grades g JOIN runs r ON r.run = g.run WHERE g.id = ?")
+    params = [matr_id]
+    if not all_runs:
+        sql += f" AND {LATEST_GRADE}"
+    if courses is not None:
+        sql += f" AND r.course IN {_in(courses)}"
+        params += list(courses)
+    df = _query(db_file, sql + " ORDER BY r.semester_order, g.run, g.skz", params)
+    df["rule_trace"] = df["rule_trace"].astype("Int64")
+    if len(df) == 0:
+        return df
+    points = _query(db_file, f"SELECT run, skz, item, points FROM points WHERE id = ? AND run IN {_in(df['run'])}",
+                    [matr_id] + df["run"].tolist())
+    if len(points) == 0:
+        return df
+    points = points.pivot(index=["run", "skz"], columns="item", values="points").rename_axis(columns=None)
+    return df.merge(points.reset_index(), on=["run", "skz"], how="left")
+
+
+def count_negative_grades(db_file: str, ids: list[str] = None, courses: list[str] = None,
+                          before_semester: str = None) -> pd.Series:
+    """
+    Returns the number of previous negative grades (grade 5) of students, where only the
+    latest grade of each (student, SKZ, semester, course) counts, i.e., each negative attempt
+    is counted once regardless of regrades.
+    
+    :param db_file: The path of the gradebook database file.
+    :param ids: If not None, only these matriculation IDs are counted (students without
+        negative grades are included with 0). Default: None, i.e., all students with at least
+        one negative grade
+    :param courses: If not None, only the grades of these courses are counted, e.g.,
+        ["python1lecture"]. Default: None, i.e., all courses
+    :param before_semester: If not None, only the semesters before this semester are counted,
+        e.g., "ss2024" to count the previous attempts of the current semester. Default: None
+    :return: A pd.Series mapping matriculation IDs to the number of negative grades.
+    """
+    sql = (f"SELECT g.id, COUNT(*) AS n_negative FROM grades g JOIN runs r ON r.run = g.run "
+           f"WHERE g.grade = ? AND {LATEST_GRADE}")
+    params = [NEGATIVE_GRADE]
+    if ids is not None:
+        sql += f" AND g.id IN {_in(ids)}"
+        params += list(ids)
+    if courses is not None:
+        sql += f" AND r.course IN {_in(courses)}"
+        params += list(courses)
+    if before_semester is not None:
+        sql += " AND r.semester_order < ?"
+        params.append(semester_order(before_semester))
+    counts = _query(db_file, sql + " GROUP BY g.id ORDER BY g.id", params).set_index("id")["n_negative"]
+    if ids is not None:
+        counts = counts.reindex(ids, fill_value=0)
+    return counts
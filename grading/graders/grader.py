@@ -1,12 +1,27 @@
+import copy
 import os.path
 import re
 import warnings
-from typing import Iterable, Union, Sequence, Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterable, Union, Sequence, Callable, TypeVar
 
 import numpy as np
 import pandas as pd
 
-from graders import util
+from graders import (archive, audit, backends, corrections, gradebook, itemanalysis, loader, reconciliation, schema,
+                     spreadsheet, trace, util, view)
+
+T = TypeVar("T")
+
+# minimum number of entries per shard when grading in a process pool (see "grading_workers" of
+# "Grader.create_grading_file"); smaller frames are graded in-process, since the process startup and
+# the transfer of the shards would take longer than the grading itself
+MIN_SHARD_SIZE = 2000
+
+# the Grader objects that are reused by "Grader.cached" if enabled (see "set_instance_cache"), e.g., by the grading
+# daemon (see "daemon.GradingService"), mapping the class and arguments to the file signatures and the Grader object
+_instance_cache: dict = None
 
 MOODLE_DE_TO_EN_FULL = {
     "Vorname": "First name",
@@ -30,15 +45,27 @@ MOODLE_DE_TO_EN_END = {
 
 class Grader:
     
+    # whether the grader supports fixed-point points (see "point_scale" of "__init__"), i.e., whether
+    # all of its point constants and thresholds are converted with "_scale_points" and "_threshold_points"
+    SUPPORTS_FIXED_POINT = False
+    
+    # the expected columns of the Moodle export and the plausible ranges of their points (see "schema.ColumnSpec"),
+    # which are checked right after reading the export (see "__init__"); missing optional columns are added
+    SCHEMA: Sequence[schema.ColumnSpec] = ()
+    
     # TODO: add "df" parameter which is XOR with moodle_file (simplifies testing)
     def __init__(self, moodle_file: str, encoding: str = "utf8", cols_to_keep: Iterable = None,
                  ignore_assignment_words: Iterable = None, ignore_quiz_words: Iterable = None,
-                 verbose: bool = True):
+                 point_scale: int = None, backend: str = None, verbose: bool = True):
         """
         Initializes a new Grader object.
         
         :param moodle_file: The path to the CSV input file that contains the grading
             information, i.e., the points for assignments and quizzes (exported via Moodle).
+            The file can also be compressed or archived (see ``loader.read_csv``), or it can
+            be a spreadsheet export (".xlsx" or ".ods", see ``spreadsheet.read_spreadsheet``),
+            in which case only the columns that are kept are read, and the parsed spreadsheet
+            is cached.
         :param encoding: The encoding to use when reading ``moodle_file``. Default: "utf8"
         :param cols_to_keep: A collection of columns to keep in addition to the three mandatory
             ID columns ("First name", "Surname", "ID number") and in addition to the assignment
@@ -52,9 +79,25 @@ class Grader:
             a quiz column if any word of this collection is contained within this column.
             Default: None = ["dummy"], i.e., every quiz column is dropped which contains
             "dummy" (case-insensitive)
+        :param point_scale: If not None, all points (assignments and quizzes) are represented
+            internally as fixed-point points in units of ``1 / point_scale`` from reading
+            ``moodle_file`` onwards (see ``util.to_fixed_point``), e.g., 1000 = thousandths,
+            so that all sums and threshold comparisons are exact. The points are converted
+            back at export (see ``self._get_point_cols``). Only supported by graders with
+            ``SUPPORTS_FIXED_POINT``. Default: None, i.e., regular floating point points
+        :param backend: The frame backend of the participants, merge and export stages of
+            ``self.create_grading_file``, either "pandas" or "polars" (see ``backends.BACKENDS``),
+            which both yield exactly the same results ("polars" is experimental, see
+            ``backends.PolarsBackend``). The grading itself always uses pandas.
+            Default: None = ``backends.DEFAULT_BACKEND``
         :param verbose: Whether to print additional output information. Default: True
         """
+        if point_scale is not None and not self.SUPPORTS_FIXED_POINT:
+            raise ValueError(f"{type(self).__name__} does not support fixed-point points (point_scale)")
         self.verbose = verbose
+        self.moodle_file = moodle_file
+        self.point_scale = point_scale
+        self.backend = backends.get_backend(backend)
         if cols_to_keep is None:
             cols_to_keep = []
         if ignore_assignment_words is None:
@@ -64,17 +107,37 @@ class Grader:
             ignore_quiz_words = ["dummy"]
         ignore_quiz_words = [w.lower() for w in ignore_quiz_words]
         
-        df = pd.read_csv(moodle_file, na_values="-", encoding=encoding)
+        # TODO: parameterize
+        self.id_cols = ["First name", "Last name", "ID number"]
+        
+        def is_assignment_col(c: str):
+            return c.startswith("Assignment:") and all([w not in c.lower() for w in ignore_assignment_words])
+        
+        def is_quiz_col(c: str):
+            return c.startswith("Quiz:") and all([w not in c.lower() for w in ignore_quiz_words])
+        
+        # the English columns of the spreadsheet header (original column -> English column)
+        translated_header = None
+        if spreadsheet.is_spreadsheet(moodle_file):
+            def select_cols(header: list[str]) -> list[str]:
+                # the header is only translated once, which also decides which (original) columns to read
+                nonlocal translated_header
+                translated_header = dict(zip(header, self._to_en(pd.DataFrame(columns=header)).columns))
+                return [h for h, c in translated_header.items() if c in self.id_cols or c in cols_to_keep or
+                        is_assignment_col(c) or is_quiz_col(c)]
+            
+            df = spreadsheet.read_spreadsheet(moodle_file, select_cols, na_values=["-"])
+        else:
+            df = loader.read_csv(moodle_file, na_values="-", encoding=encoding)
         self._print(f"original size: {df.shape}")
         self.original_df = df.copy()
-        df = self._to_en(df)
+        if translated_header is None:
+            df = self._to_en(df)
+        else:
+            df = df.set_axis([translated_header[c] for c in df.columns], axis=1)
         
-        # TODO: parameterize
-        self.id_cols = ["First name", "Last name", "ID number"]
-        self.assignment_cols = [c for c in df.columns if c.startswith("Assignment:") and
-                                all([w not in c.lower() for w in ignore_assignment_words])]
-        self.quiz_cols = [c for c in df.columns if c.startswith("Quiz:") and
-                          all([w not in c.lower() for w in ignore_quiz_words])]
+        self.assignment_cols = [c for c in df.columns if is_assignment_col(c)]
+        self.quiz_cols = [c for c in df.columns if is_quiz_col(c)]
         cols_to_keep = self.id_cols + self.assignment_cols + self.quiz_cols + cols_to_keep
         dropped_cols = set(df.columns) - set(cols_to_keep)
         df = df[cols_to_keep]
@@ -84,10 +147,13 @@ class Grader:
         
         # check if there are invalid matriculation ID numbers (e.g., due to having manually
         # added a student to Moodle who is not a registered KUSSS student); if there are, then
-        # pandas could not convert them to np.int64 (should then be str, i.e., pandas object)
+        # pandas could not convert them to np.int64 (should then be str, i.e., pandas object);
+        # the dropped entries are kept for the reconciliation (see "create_grading_file")
+        self.invalid_id_df = pd.DataFrame(columns=self.id_cols)
         if df["ID number"].dtype != np.int64:
             invalid = df[df["ID number"].str.contains(r"\D", regex=True)]
             if len(invalid) > 0:
+                self.invalid_id_df = invalid[self.id_cols].copy()
                 df.drop(invalid.index, inplace=True)
                 df["ID number"] = df["ID number"].astype(np.int64)  # should now work
                 self._print(f"dropped {len(invalid)} entries due to invalid matriculation IDs; new size: {df.shape}")
@@ -96,9 +162,48 @@ class Grader:
         
         # transform the integer ID to a string with exactly 8 characters (with leading zeros) + a leading "k"
         df["ID number"] = df["ID number"].apply(lambda x: f"k{x:08d}")
+        # check the whole export at once before anything is computed (see "SCHEMA")
+        violations = schema.validate(df, self.SCHEMA)
+        if len(violations) > 0:
+            raise schema.SchemaError(type(self).__name__, violations)
+        for c in schema.add_missing_columns(df, self.SCHEMA):
+            if is_assignment_col(c):
+                self.assignment_cols.append(c)
+            elif is_quiz_col(c):
+                self.quiz_cols.append(c)
+            self._print(f"added missing optional column '{c}' (no submissions)")
+        if point_scale is not None:
+            df[self.assignment_cols + self.quiz_cols] = self._scale_points(df[self.assignment_cols + self.quiz_cols])
         
         # basic DataFrame is now finished at this point
         self.df = df
+        self.clear_stages()
+    
+    @classmethod
+    def cached(cls, *args, **kwargs) -> "Grader":
+        """
+        Returns ``cls(*args, **kwargs)``. If the instance cache is enabled (see
+        ``set_instance_cache``), the Grader object of a previous call with the same arguments
+        is returned instead, unless one of the files in the arguments (e.g., ``moodle_file``)
+        changed since (see ``loader.file_signature``) or the class was reloaded. A reused
+        Grader object keeps its prepared Moodle entries and its memoized stages (see
+        ``self.create_grading_file``).
+        
+        :param args: The positional arguments of ``cls``.
+        :param kwargs: The keyword arguments of ``cls``.
+        :return: The (possibly reused) Grader object.
+        """
+        if _instance_cache is None:
+            return cls(*args, **kwargs)
+        key = (cls.__module__, cls.__qualname__, repr(args), repr(sorted(kwargs.items())))
+        signatures = _get_file_signatures(list(args) + list(kwargs.values()))
+        memo = _instance_cache.get(key)
+        if memo is not None and memo[0] == signatures and type(memo[1]) is cls:
+            memo[1]._print(f"reusing prepared {cls.__name__} of '{memo[1].moodle_file}'")
+            return memo[1]
+        grader = cls(*args, **kwargs)
+        _instance_cache[key] = (signatures, grader)
+        return grader
     
     def _print(self, msg):
         if self.verbose:
@@ -146,19 +251,36 @@ class Grader:
                             output_sep: str = ";", header: bool = False, grading_file: str = None,
                             grade_col: str = "grade", grade_reason_col: str = "grade_reason",
                             cols_to_export: Sequence = None, input_encoding: str = "ANSI",
-                            output_encoding: str = "utf8") -> tuple[pd.DataFrame, str]:
+                            output_encoding: str = "utf8", audit_format: str = None,
+                            audit_file: str = None, corrections_file: str = None,
+                            rule_trace_col: str = "rule_trace", archive_dir: str = None,
+                            views: dict[str, view.View] = None, grading_workers: int = None,
+                            reconcile: bool = False, reconciliation_file: str = None,
+                            item_analysis: bool = False, item_analysis_file: str = None,
+                            gradebook_file: str = None) -> tuple[pd.DataFrame, str]:
         """
         Creates a grading CSV file that can be uploaded to KUSSS based on the CSV input
         file(s) that contain the participants/students of some course(s) (exported via KUSSS).
         
+        The grading is done in stages (participants, merged, processed, filtered and graded),
+        where each stage is memoized by its inputs (see ``self._stage``). Repeated calls on the
+        same Grader object thus only recompute the stages downstream of what changed, e.g., if
+        only ``row_filter`` changes, only entries that have not been graded yet are graded. The
+        output files are always written.
+        
         :param kusss_participants_files: Either a single string that indicates the path
             of the participants CSV input file, or a list of strings that indicate multiple
             paths of participants CSV input files. If it is a list, the participants will
             simply be merged, thereby dropping duplicate entries, where a duplicate entry
-            is determined on the tuple (``matr_id_col``, ``study_id_col``).
+            is determined on the tuple (``matr_id_col``, ``study_id_col``). The files can
+            also be compressed or archived (see ``loader.read_csv``).
         :param row_filter: If not None, specifies a filter function that only keeps rows,
             i.e., student entries, where True is returned. This function is applied after
             merging with the KUSSS participants and right before the grades are calculated.
+            It only restricts the main grading output, i.e., not the ``views``. The filtered
+            entries are memoized by the code, defaults and closure values of the function (see
+            ``self._stage``), so a new but equivalent lambda in each call reuses them, which
+            also means that the function must not depend on changing global variables.
             Default: None, i.e., all entries are used for grading
         :param warn_if_not_found_in_kusss_participants: If True, a warning is issued in
             case there are students in the main Moodle file that cannot be found in the
@@ -177,7 +299,11 @@ class Grader:
             will be stored. Otherwise, the grading file will be stored at the same location
             as the input file (or as the first input file if multiple files were specified).
             Moreover, the default file name will be the same as the (first) input file with
-            "_grading.csv" as the new file name ending. Default: None
+            "_grading.csv" as the new file name ending (plus the compression extension ".gz" or
+            ".xz" of the input file, if any). The grading file (and the audit file) is written
+            next to the ZIP archive if the input file is a ZIP archive member. The grading file
+            is compressed if the path has a compression extension (see ``loader.COMPRESSIONS``),
+            e.g., "grading.csv.gz". Default: None
         :param grade_col: The column name of the grading CSV output file that contains the
             grade (np.int64). Default: "grade"
         :param grade_reason_col: The column name of the grading CSV output file that contains
@@ -187,78 +313,481 @@ class Grader:
         :param input_encoding: The encoding to use when reading each file specified by
             ``kusss_participants_files``. Default: "ANSI"
         :param output_encoding: The encoding to use when writing ``grading_file``. Default: "utf8"
+        :param audit_format: If not None, the full final pd.DataFrame (all columns, including
+            grades and reasons) is additionally written as typed binary audit file in this
+            format, which must be either "parquet" or "arrow" (Arrow IPC). The audit file also
+            contains run metadata, i.e., the grader class, its module constants (maximum points,
+            thresholds) and the hashes of all input files (see ``audit.read_audit_file``). The
+            audit file is written on a background thread while the grading CSV output file is
+            written. Requires the optional dependency "pyarrow". Default: None
+        :param audit_file: If not None, specifies the path where the audit file will be stored.
+            Otherwise, the audit file will be stored next to ``grading_file`` with "_FULL" plus
+            the extension of ``audit_format`` as the new file name ending. Ignored if
+            ``audit_format`` is None. Default: None
+        :param corrections_file: If not None, the path of a correction ledger CSV file (see
+            ``corrections.read_ledger``), i.e., point corrections (column, adjustment, scope,
+            reason) that are applied to the Moodle points in one vectorized pass right after
+            merging with the KUSSS participants (before ``self._process_entries``). The applied
+            corrections are recorded in the metadata of the audit file. Default: None
+        :param rule_trace_col: The column name of the final pd.DataFrame that contains the
+            rule-evaluation trace, i.e., the bitmask of all failed rules of each student (see
+            ``self._evaluate_rules``). If the grader defines rules, ``grade_reason_col`` is a
+            categorical, and the rules (ordered by their IDs) are recorded in the metadata of
+            the audit file. Default: "rule_trace"
+        :param archive_dir: If not None, the grades of this run (matriculation ID, study ID,
+            grade, reason and rule trace) are additionally appended to the Parquet archive in
+            this directory, which is partitioned by semester, course (both derived from the
+            grader module, see ``archive.get_partition``) and run timestamp (see
+            ``archive.write_run`` and ``archive.read_latest_grades``). Requires the optional
+            dependency "pyarrow". Default: None
+        :param views: If not None, a dictionary mapping names to views (see ``view.View``),
+            i.e., subsets of the graded entries (e.g., only the participants of the retry exam,
+            only certain study IDs or only the entries that changed since the last upload),
+            where each view is additionally written to its own grading CSV output file (see
+            ``view.get_view_file``, e.g., "<grading_file>_retry.csv"), in the same format as
+            ``grading_file``. All views are selected from the same graded pd.DataFrame of all
+            entries, independent of ``row_filter`` (e.g., the full grading as a view of a main
+            grading file that only contains the retry exam participants), i.e., the grading is
+            only done once. Views with ``changed_since`` require ``archive_dir`` (the previous
+            grades are read before this run is archived). Default: None
+        :param grading_workers: If not None, the maximum number of processes that grade the
+            entries (``self._create_grade_row``), i.e., the entries are split into contiguous
+            shards that are graded in a process pool (in the original order). Each process is
+            initialized once with a copy of this grader. Frames with fewer than ``2 *
+            MIN_SHARD_SIZE`` entries are always graded in-process. Default: None, i.e., the
+            entries are graded in-process
+        :param reconcile: If True, the reconciliation of this run, i.e., every student of the
+            main Moodle file and the KUSSS participants with its status ("both", "moodle_only",
+            "kusss_only" or "invalid_id", see ``reconciliation.Reconciliation``), is additionally
+            written to ``reconciliation_file``. The reconciliation is always available as
+            ``self.reconciliation`` after this call, and its counts are recorded in the metadata
+            of the audit file. Default: False
+        :param reconciliation_file: If not None, specifies the path where the reconciliation
+            CSV file will be stored. Otherwise, it will be stored next to ``grading_file`` with
+            "_reconciliation.csv" as the new file name ending. Ignored if ``reconcile`` is False.
+            Default: None
+        :param item_analysis: If True, the item analysis of the graded entries, i.e., statistics
+            of each assignment and quiz column (mean, quantiles, rate of missing submissions,
+            rate below the individual threshold and correlation with the grade, see
+            ``itemanalysis.analyze`` and ``self._get_item_thresholds``), is computed from the
+            final pd.DataFrame and written to ``item_analysis_file``. It is then also available
+            as ``self.item_analysis``. Default: False
+        :param item_analysis_file: If not None, specifies the path where the item analysis CSV
+            file will be stored. Otherwise, it will be stored next to ``grading_file`` with
+            "_items.csv" as the new file name ending. Ignored if ``item_analysis`` is False.
+            Default: None
+        :param gradebook_file: If not None, the path of an SQLite gradebook database, to which
+            this run (semester and course, see ``archive.get_partition``, the metadata and the
+            input files with their hashes), the grades (matriculation ID, study ID, grade, reason
+            and rule trace) and the points of the items (the assignment and quiz columns and the
+            derived columns of ``self._get_item_thresholds``) are appended (see
+            ``gradebook.write_run``). The history of the students can then be queried across
+            courses and semesters (e.g., ``gradebook.student_history``). Default: None
         :return: A tuple containing (as first entry) the final pd.DataFrame that contains all
             information including grades and the reasons for these grades, and as second entry,
             the path of the grading CSV output file, i.e., ``grading_file``.
         """
+        if audit_format is not None and audit_format not in audit.AUDIT_FORMATS:
+            raise ValueError(f"unknown audit format '{audit_format}' (supported: {list(audit.AUDIT_FORMATS)})")
+        if views is None:
+            views = dict()
+        if archive_dir is None and any(v.changed_since is not None for v in views.values()):
+            raise ValueError("views with 'changed_since' require the previous grades of the archive (archive_dir)")
         if isinstance(kusss_participants_files, str):
             kusss_participants_files = [kusss_participants_files]
-        kdfs = [pd.read_csv(f, sep=input_sep, usecols=[matr_id_col, study_id_col], encoding=input_encoding)
-                for f in kusss_participants_files]
-        
-        # check duplicate entries (students who are found multiple times)
-        full_kdf = pd.concat(kdfs, ignore_index=True)
-        util.check_matr_id_format(full_kdf[matr_id_col])
-        kdf = full_kdf.copy().drop_duplicates()
-        diff = full_kdf[full_kdf.duplicated()].drop_duplicates()
+        if self._stages_df is not self.df:
+            # the memoized stages are only valid for the current self.df
+            self.clear_stages()
+        
+        # each stage is memoized by its inputs (see "self._stage"), so only the stages downstream
+        # of what changed since the previous call are recomputed
+        participants_key = (tuple(tuple(loader.file_signature(f)) for f in kusss_participants_files), input_sep,
+                            matr_id_col, study_id_col, input_encoding)
+        kdf = self._stage("participants", participants_key, lambda: self._read_participants(
+            kusss_participants_files, input_sep, matr_id_col, study_id_col, input_encoding))
+        merged_key = (participants_key, warn_if_not_found_in_kusss_participants)
+        merged_df, self.reconciliation = self._stage("merged", merged_key, lambda: self._merge_participants(
+            kdf, matr_id_col, study_id_col, warn_if_not_found_in_kusss_participants))
+        # the correction ledger is applied after merging, so a changed ledger only reprocesses and regrades the
+        # corrected entries (see "self._process_corrected")
+        corrections_key = None if corrections_file is None else tuple(loader.file_signature(corrections_file))
+        corrected_key = (merged_key, corrections_key)
+        df, applied_corrections = self._stage("corrected", corrected_key,
+                                              lambda: self._apply_corrections(merged_df, corrections_file))
+        processed_df = self._process_corrected(df, corrected_key)
+        kept_index = self._stage("filtered", (corrected_key, _get_function_key(row_filter)),
+                                 lambda: self._filter(processed_df, row_filter))
+        # the views are independent of the row filter, so all entries are graded if there are views
+        graded_index = kept_index if len(views) == 0 else processed_df.index
+        grades = self._grade(processed_df, graded_index, merged_key, grading_workers)
+        
+        df = processed_df.loc[graded_index].copy()
+        df[[grade_col, grade_reason_col]] = grades
+        rules = self._evaluate_rules(df)
+        if len(rules) > 0:
+            df[rule_trace_col] = trace.rule_trace(rules)
+            df[grade_reason_col] = self._get_trace_reasons(df, list(rules), grade_col, grade_reason_col,
+                                                           rule_trace_col)
+        if self.point_scale is not None:
+            # fixed-point points are only converted back for the export
+            point_cols = self._get_point_cols(df)
+            df[point_cols] = util.from_fixed_point(df[point_cols], self.point_scale)
+        # sort according to matriculation ID and study ID to always get the same output order, which
+        # makes a (potential) manual inspection more convenient
+        df.sort_values([matr_id_col, study_id_col], inplace=True)
+        view_dfs = {name: self._select_view(df, name, v, matr_id_col, study_id_col, grade_col,
+                                            grade_reason_col, archive_dir) for name, v in views.items()}
+        if len(graded_index) > len(kept_index):
+            df = df[df.index.isin(kept_index)].copy()
+        if item_analysis:
+            self.item_analysis = itemanalysis.analyze(df, self._get_item_cols(df), grade_col,
+                                                      self._get_item_thresholds())
+        
+        if grading_file is None:
+            path, member = loader.split_member(kusss_participants_files[0])
+            filename, compression_ext = loader.strip_compression(path)
+            if member is not None or compression_ext.lower() == ".zip":
+                # never write into the ZIP archive, but next to it (uncompressed)
+                filename = os.path.join(os.path.dirname(path), os.path.basename(member or filename))
+                compression_ext = ""
+            grading_file = os.path.splitext(filename)[0] + "_grading.csv" + compression_ext
+        # default CSV format for KUSSS grading import: "matriculationID;studyID;grade;externalInfo;internalInfo"
+        # in the official KUSSS documentation, only "matriculationID;studyID;grade" is actually mentioned, but the last
+        # two columns "externalInfo" and "internalInfo" are also automatically recognized without an explicit header
+        if cols_to_export is None:
+            # use the same reason for both the external and internal info
+            cols_to_export = [matr_id_col, study_id_col, grade_col, grade_reason_col, grade_reason_col]
+        export_df = df[cols_to_export].copy()
+        view_files = {name: view.get_view_file(grading_file, name) for name in views}
+        
+        metadata = None
+        if audit_format is not None or archive_dir is not None or gradebook_file is not None:
+            metadata = self._get_run_metadata(kusss_participants_files, matr_id_col=matr_id_col,
+                                              study_id_col=study_id_col, grade_col=grade_col,
+                                              grade_reason_col=grade_reason_col)
+            if len(rules) > 0:
+                metadata["rules"] = dict(trace_col=rule_trace_col, reasons=list(rules))
+            if applied_corrections is not None:
+                metadata["corrections"] = dict(file=corrections_file, hash=util.file_hash(corrections_file),
+                                               entries=applied_corrections.to_dict("records"))
+            metadata["reconciliation"] = self.reconciliation.counts()
+            if len(views) > 0:
+                metadata["views"] = {name: dict(file=view_files[name], n_entries=len(view_df))
+                                     for name, view_df in view_dfs.items()}
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            audit_future = None
+            if audit_format is not None:
+                if audit_file is None:
+                    audit_file = (os.path.splitext(loader.strip_compression(grading_file)[0])[0] + "_FULL" +
+                                  audit.AUDIT_FORMATS[audit_format])
+                audit_future = executor.submit(audit.write_audit_file, df, audit_file, metadata, audit_format)
+            self.backend.write_csv(export_df, grading_file, output_sep, header, output_encoding)
+            self._print(f"KUSSS grading file ({len(df)} grades) written to: '{grading_file}'")
+            for name, view_df in view_dfs.items():
+                self.backend.write_csv(view_df[cols_to_export], view_files[name], output_sep, header, output_encoding)
+                self._print(f"KUSSS grading file of view '{name}' ({len(view_df)} grades) written to: "
+                            f"'{view_files[name]}'")
+            if reconcile:
+                if reconciliation_file is None:
+                    reconciliation_file = (os.path.splitext(loader.strip_compression(grading_file)[0])[0] +
+                                           "_reconciliation.csv")
+                self.reconciliation.write(reconciliation_file)
+                self._print(f"reconciliation file ({self.reconciliation.counts()}) written to: "
+                            f"'{reconciliation_file}'")
+            if item_analysis:
+                if item_analysis_file is None:
+                    item_analysis_file = os.path.splitext(loader.strip_compression(grading_file)[0])[0] + "_items.csv"
+                self.item_analysis.to_csv(item_analysis_file)
+                self._print(f"item analysis ({len(self.item_analysis)} items) written to: '{item_analysis_file}'")
+            if audit_future is not None:
+                audit_future.result()  # re-raises any exception of the background thread
+                self._print(f"audit file written to: '{audit_file}'")
+        
+        archive_cols = {matr_id_col: "id", study_id_col: "skz", grade_col: "grade", grade_reason_col: "reason"}
+        if len(rules) > 0:
+            archive_cols[rule_trace_col] = "rule_trace"
+        archive_df = df[list(archive_cols)].rename(columns=archive_cols)
+        if archive_dir is not None:
+            archive_file = archive.write_run(archive_df, archive_dir, *archive.get_partition(type(self)), metadata)
+            self._print(f"run archived to: '{archive_file}'")
+        if gradebook_file is not None:
+            points_df = df[[matr_id_col, study_id_col] + self._get_item_cols(df)]
+            points_df = points_df.rename(columns={matr_id_col: "id", study_id_col: "skz"})
+            run_id = gradebook.write_run(gradebook_file, archive_df, *archive.get_partition(type(self)), metadata,
+                                         points_df)
+            self._print(f"run {run_id} ({len(df)} grades) written to the gradebook: '{gradebook_file}'")
+        
+        return df, grading_file
+    
+    def clear_stages(self):
+        """
+        Clears all memoized stages of ``self.create_grading_file`` (see ``self._stage``), so
+        the next call recomputes everything. This happens automatically if ``self.df`` is
+        replaced, but it must be called manually if ``self.df`` is changed in place.
+        """
+        self._stages = dict()
+        self._stages_df = self.df
+    
+    def _stage(self, name: str, key: tuple, compute: Callable[[], T]) -> T:
+        """
+        Returns the memoized result of the stage ``name`` of ``self.create_grading_file`` if
+        its inputs ``key`` are the same as in the previous call, otherwise, the result of
+        ``compute`` (which then replaces the memoized result). The stages are "participants",
+        "merged", "corrected" and "filtered" (and "processed" and "graded", see
+        ``self._process_corrected`` and ``self._grade``), and only the latest result of each
+        stage is kept.
+        
+        :param name: The name of the stage.
+        :param key: The inputs of the stage (compared with ``==``), which include the key of
+            the upstream stage.
+        :param compute: The function (without arguments) that computes the stage result.
+        :return: The (memoized) stage result, which must not be changed in place.
+        """
+        memo = self._stages.get(name)
+        if memo is not None and memo[0] == key:
+            self._print(f"reusing memoized stage '{name}'")
+            return memo[1]
+        result = compute()
+        self._stages[name] = (key, result)
+        return result
+    
+    def _read_participants(self, kusss_participants_files: list[str], input_sep: str, matr_id_col: str,
+                           study_id_col: str, input_encoding: str):
+        # read all participant files (in the specified order) and drop duplicate entries (students who are found
+        # multiple times); the participants are a frame of the backend (see backends.PandasBackend)
+        kdf, diff = self.backend.read_participants(kusss_participants_files, input_sep, matr_id_col, study_id_col,
+                                                   input_encoding)
         if len(diff) > 0:
             warnings.warn(f"the following {len(diff)} duplicate entries were dropped (might be OK, e.g., if a "
                           f"student was unregistered from one course but the export still contains an entry):\n{diff}")
-        
-        # "inner" skips those that are not registered in this particular KUSSS course
-        df = self.df.merge(kdf, left_on="ID number", right_on=matr_id_col, how="inner")
+        return kdf
+    
+    def _merge_participants(self, kdf, matr_id_col: str, study_id_col: str,
+                            warn_if_not_found_in_kusss_participants: bool) -> tuple[pd.DataFrame,
+                                                                                    reconciliation.Reconciliation]:
+        # a single outer merge sorts every student into "both", "moodle_only" and "kusss_only", where only "both" is
+        # kept, i.e., those that are not registered in this particular KUSSS course are skipped
+        df, outer = self.backend.merge(self.df, kdf, matr_id_col)
+        rec = reconciliation.create(outer, matr_id_col, study_id_col, self.invalid_id_df)
         self._print(f"size after merging with KUSSS participants {kdf.shape}: {df.shape}")
         if len(df) == 0:
             raise ValueError("no entries remain after merging with KUSSS participants")
-        if len(df) < len(kdf):
-            diff = kdf[~kdf[matr_id_col].isin(df["ID number"])]
-            assert len(diff) == len(kdf) - len(df)
+        diff = outer[outer["status"] == "kusss_only"][list(kdf.columns)]
+        if len(diff) > 0:
             warnings.warn(f"the following {len(diff)} KUSSS participants were not part of the main Moodle participants "
                           f"(might be OK, e.g., if students dropped out/are no longer active):\n{diff}")
-        if len(df) < len(self.df) and warn_if_not_found_in_kusss_participants:
-            diff = self.df[~self.df["ID number"].isin(kdf[matr_id_col])]
-            assert len(diff) == len(self.df) - len(df)
+        diff = outer[outer["status"] == "moodle_only"][self.id_cols]
+        if len(diff) > 0 and warn_if_not_found_in_kusss_participants:
             warnings.warn(f"the following {len(diff)} entries were not part of the KUSSS participants, so they cannot "
                           f"be graded (might be OK, e.g., if there is both a lecture and exercise, or multiple "
                           f"mutually exclusive exercise groups, with a joint Moodle page, and these students "
                           f"deliberately only registered for one of the two):\n{diff}")
-        
+        return df, rec
+    
+    def _apply_corrections(self, df: pd.DataFrame, corrections_file: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+        applied_corrections = None
+        if corrections_file is not None:
+            ledger = corrections.read_ledger(corrections_file)
+            unknown_ids = corrections.get_unknown_ids(ledger, self.df["ID number"])
+            if len(unknown_ids) > 0:
+                warnings.warn(f"the following {len(unknown_ids)} IDs of the correction ledger are not part of the "
+                              f"main Moodle participants: {unknown_ids}")
+            # the adjustments must have the same (fixed-point) representation as the points
+            df, applied_corrections = corrections.apply_corrections(
+                df, ledger.assign(adjustment=self._scale_points(ledger["adjustment"])))
+            applied_corrections["adjustment"] = ledger["adjustment"].to_numpy()
+            self._print(f"applied {len(ledger)} corrections from '{corrections_file}':\n{applied_corrections}")
+        return df, applied_corrections
+    
+    def _process(self, df: pd.DataFrame) -> pd.DataFrame:
         # apply general processing (changes, filtering)
         df = self._process_entries(df)
         self._print(f"size after processing: {df.shape}")
         if len(df) == 0:
             raise ValueError("no entries remain after processing")
+        return df
+    
+    def _process_corrected(self, df: pd.DataFrame, key: tuple) -> pd.DataFrame:
+        """
+        Returns the processed, corrected pd.DataFrame ``df`` (see ``self._process``). This
+        "processed" stage is memoized like the other stages (see ``self._stage``), where ``key``
+        consists of the key of the "merged" stage and the key of the correction ledger. If only
+        the correction ledger changed since the previous call, only the entries whose points
+        differ from the previously corrected ones are processed again (``self._process_entries``
+        processes each entry independently of the others), and only their memoized grades are
+        invalidated (see ``self._grade``).
         
+        :param df: The corrected pd.DataFrame.
+        :param key: The inputs of ``df`` (the key of the "merged" stage and the key of the
+            correction ledger).
+        :return: The (memoized) processed pd.DataFrame, which must not be changed in place.
+        """
+        memo = self._stages.get("processed")
+        if memo is not None and memo[0] == key:
+            self._print("reusing memoized stage 'processed'")
+            return memo[1][1]
+        if memo is None or memo[0][0] != key[0]:
+            # "_process_entries" might change the passed pd.DataFrame in place, so it gets a copy
+            processed_df = self._process(df.copy())
+        else:
+            previous_df, processed_df = memo[1]
+            changed = ~((previous_df == df) | (previous_df.isna() & df.isna()))
+            changed_index = df.index[changed.any(axis=1)]
+            self._print(f"reprocessing {len(changed_index)} entries changed by the correction ledger")
+            if len(changed_index) > 0:
+                reprocessed_df = self._process_entries(df.loc[changed_index].copy())
+                processed_df = processed_df.drop(index=changed_index, errors="ignore")
+                if len(reprocessed_df) > 0:
+                    processed_df = pd.concat([processed_df, reprocessed_df])
+                # restore the order of the entries
+                processed_df = processed_df.loc[df.index[df.index.isin(processed_df.index)]]
+                if len(processed_df) == 0:
+                    raise ValueError("no entries remain after processing")
+                graded = self._stages.get("graded")
+                if graded is not None:
+                    self._stages["graded"] = (graded[0], graded[1].drop(index=changed_index, errors="ignore"))
+        self._stages["processed"] = (key, (df, processed_df))
+        return processed_df
+    
+    def _filter(self, df: pd.DataFrame, row_filter: Callable[[pd.Series], bool]) -> pd.Index:
         # apply optional, row-based filtering to only create grades for certain entries
-        if row_filter is not None:
-            # row_filter yields true if the entry should be kept, so invert the boolean mask
-            exclude = df[~df.apply(row_filter, axis=1)]
-            if len(exclude) > 0:
-                df.drop(exclude.index, inplace=True)
-                if len(df) == 0:
-                    raise ValueError("no entries remain after applying the specified row filter")
-            self._print(f"size after applying row filter: {df.shape}")
-        
-        # apply the actual grading logic (implemented in concrete course subclasses)
-        df[[grade_col, grade_reason_col]] = df.apply(self._create_grade_row, axis=1)
-        # sort according to matriculation ID and study ID to always get the same output order, which
-        # makes a (potential) manual inspection more convenient
-        df.sort_values([matr_id_col, study_id_col], inplace=True)
+        if row_filter is None:
+            return df.index
+        # row_filter yields true if the entry should be kept
+        kept_index = df.index[df.apply(row_filter, axis=1).astype(bool)]
+        if len(kept_index) == 0:
+            raise ValueError("no entries remain after applying the specified row filter")
+        self._print(f"size after applying row filter: {(len(kept_index), df.shape[1])}")
+        return kept_index
+    
+    def _grade(self, df: pd.DataFrame, kept_index: pd.Index, key: tuple, grading_workers: int = None) -> pd.DataFrame:
+        """
+        Returns the grades and reasons (see ``self._create_grade_row``) of the entries
+        ``kept_index`` of the processed pd.DataFrame ``df``. This "graded" stage is memoized
+        per entry (see ``self._stage``), i.e., as long as ``key`` (the merged inputs of ``df``)
+        is the same, only entries that have not been graded in a previous call are graded, e.g.,
+        if only the row filter changed or if a changed correction ledger invalidated the grades
+        of the corrected entries (see ``self._process_corrected``).
         
-        if grading_file is None:
-            filename, file_extension = os.path.splitext(kusss_participants_files[0])
-            grading_file = filename + "_grading.csv"
-        # default CSV format for KUSSS grading import: "matriculationID;studyID;grade;externalInfo;internalInfo"
-        # in the official KUSSS documentation, only "matriculationID;studyID;grade" is actually mentioned, but the last
-        # two columns "externalInfo" and "internalInfo" are also automatically recognized without an explicit header
-        if cols_to_export is None:
-            # use the same reason for both the external and internal info
-            cols_to_export = [matr_id_col, study_id_col, grade_col, grade_reason_col, grade_reason_col]
-        export_df = df[cols_to_export].copy()
-        export_df.to_csv(grading_file, sep=output_sep, index=False, header=header, encoding=output_encoding)
-        self._print(f"KUSSS grading file ({len(df)} grades) written to: '{grading_file}'")
+        :param df: The processed pd.DataFrame.
+        :param kept_index: The index of the entries to grade (after applying the row filter).
+        :param key: The merged inputs of ``df`` (the key of the "merged" stage).
+        :param grading_workers: The maximum number of grading processes (see ``self._grade_rows``).
+            Default: None
+        :return: A pd.DataFrame with the index ``kept_index`` and the two columns grade and reason.
+        """
+        memo = self._stages.get("graded")
+        graded = memo[1] if memo is not None and memo[0] == key else None
+        missing_index = kept_index if graded is None else kept_index.difference(graded.index, sort=False)
+        if len(missing_index) < len(kept_index):
+            self._print(f"reusing {len(kept_index) - len(missing_index)} memoized grades")
+        if len(missing_index) > 0:
+            new_grades = self._grade_rows(df.loc[missing_index], grading_workers)
+            new_grades.columns = ["grade", "reason"]
+            graded = new_grades if graded is None else pd.concat([graded, new_grades])
+            self._stages["graded"] = (key, graded)
+        return graded.loc[kept_index]
+    
+    def _grade_rows(self, df: pd.DataFrame, grading_workers: int = None) -> pd.DataFrame:
+        """
+        Applies the actual grading logic (``self._create_grade_row``, implemented in concrete
+        course subclasses) to all entries of ``df``. If ``grading_workers`` is greater than 1
+        and ``df`` is large enough for at least two shards of ``MIN_SHARD_SIZE`` entries, the
+        entries are split into contiguous shards that are graded in a process pool, where each
+        process is initialized once with a copy of this grader (see ``self._get_worker_copy``).
+        The grades are in the same order as ``df`` either way.
         
-        return df, grading_file
+        :param df: The entries to grade.
+        :param grading_workers: The maximum number of grading processes. Default: None, i.e.,
+            the entries are graded in-process
+        :return: A pd.DataFrame with the same index as ``df`` and the grade and reason columns.
+        """
+        n_shards = 1 if grading_workers is None else min(grading_workers, len(df) // MIN_SHARD_SIZE)
+        if n_shards < 2:
+            return df.apply(self._create_grade_row, axis=1)
+        self._print(f"grading {len(df)} entries in {n_shards} shards (processes)")
+        bounds = np.linspace(0, len(df), n_shards + 1).astype(int)
+        shards = [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+        with ProcessPoolExecutor(max_workers=n_shards, initializer=_init_grading_worker,
+                                 initargs=(self._get_worker_copy(),)) as executor:
+            # map preserves the order of the shards
+            return pd.concat(executor.map(_grade_shard, shards))
+    
+    def _get_worker_copy(self) -> "Grader":
+        """
+        Returns a copy of this grader for the grading processes (see ``self._grade_rows``),
+        which only needs the grading logic, i.e., the (large) pd.DataFrames, the memoized
+        stages and the frame backend are not copied. Subclasses that hold additional large or
+        unpicklable attributes which ``self._create_grade_row`` does not need should remove them.
+        
+        :return: The (picklable) copy of this grader.
+        """
+        grader = copy.copy(self)
+        grader.df = grader.original_df = grader._stages_df = None
+        grader._stages = dict()
+        grader.backend = None
+        return grader
+    
+    def _select_view(self, df: pd.DataFrame, name: str, v: view.View, matr_id_col: str, study_id_col: str,
+                     grade_col: str, grade_reason_col: str, archive_dir: str) -> pd.DataFrame:
+        previous_grades = None
+        if v.changed_since is not None:
+            # if nothing has been archived yet, every entry changed
+            if os.path.isdir(archive_dir):
+                semester, course = archive.get_partition(type(self))
+                previous_grades = archive.read_latest_grades(archive_dir, [semester], [course], before=v.changed_since)
+        view_df = view.select(df, v, matr_id_col, study_id_col, grade_col, grade_reason_col, previous_grades)
+        if len(view_df) == 0:
+            warnings.warn(f"the view '{name}' does not contain any entries")
+        return view_df
+    
+    def _get_run_metadata(self, kusss_participants_files: list[str], **kwargs) -> dict:
+        """
+        Returns the metadata of a grading run, which is stored in the audit file (see
+        ``self.create_grading_file``). Subclasses can extend this dictionary, if required.
+        
+        :param kusss_participants_files: The paths of the participants CSV input files.
+        :param kwargs: Additional entries (e.g., column names) that are added as they are.
+        :return: A JSON-serializable dictionary containing the run metadata.
+        """
+        grader_cls = type(self)
+        input_files = [self.moodle_file] + list(kusss_participants_files)
+        return dict(
+            grader=f"{grader_cls.__module__}.{grader_cls.__qualname__}",
+            constants=audit.get_module_constants(grader_cls.__module__),
+            point_scale=self.point_scale,
+            created=datetime.now().isoformat(timespec="seconds"),
+            input_hashes={f: util.file_hash(f) for f in input_files},
+            **kwargs
+        )
+    
+    def _get_item_cols(self, df: pd.DataFrame) -> list[str]:
+        """
+        Returns the items of the final pd.DataFrame, i.e., the assignment and quiz columns plus
+        the derived columns with individual thresholds (see ``self._get_item_thresholds``),
+        which are analyzed in the item analysis and stored in the gradebook.
+        
+        :param df: The final pd.DataFrame (including the grades).
+        :return: The list of item columns.
+        """
+        item_cols = self.assignment_cols + self.quiz_cols
+        return item_cols + [c for c in self._get_item_thresholds() if c not in item_cols and c in df.columns]
+    
+    def _get_item_thresholds(self) -> dict[str, float]:
+        """
+        Returns the individual thresholds of the items for the item analysis (see
+        ``self.create_grading_file``), i.e., a dictionary mapping assignment and quiz columns
+        (or derived columns of ``self._process_entries``, e.g., the total of an assignment
+        group) to the minimum points (not fixed-point) that are required to reach the
+        threshold, e.g., ``MAX_POINTS_A * THRESHOLD_INDIVIDUAL_A``. Derived columns are
+        additionally analyzed as items. Subclasses with individual thresholds should
+        override this method.
+        
+        :return: A dictionary mapping items to their threshold points. Default: {}, i.e., no
+            item has an individual threshold
+        """
+        return dict()
     
     def _process_entries(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -283,6 +812,103 @@ class Grader:
             self._print(f"dropped {len_before - len(df)} entries due to all NaN (no participation at all)")
         return df
     
+    def _get_point_cols(self, df: pd.DataFrame) -> list[str]:
+        """
+        Returns the columns of the final, processed pd.DataFrame that contain points, which
+        are converted back from fixed-point points at export (see ``point_scale`` of
+        ``self.__init__``). By default, these are the assignment and quiz columns. Subclasses
+        that add point columns in ``self._process_entries`` (e.g., totals) must add them.
+        
+        :param df: The final, processed pd.DataFrame (including the grades).
+        :return: The list of point columns.
+        """
+        return self.assignment_cols + self.quiz_cols
+    
+    def _scale_points(self, points):
+        """
+        Returns ``points`` (e.g., a point constant of a grader) in the internal point
+        representation, i.e., as fixed-point points if ``point_scale`` was specified (see
+        ``util.to_fixed_point``), otherwise, ``points`` is returned unchanged.
+        
+        :param points: The points (scalar, array-like, pd.Series or pd.DataFrame).
+        :return: The points in the internal representation.
+        """
+        if self.point_scale is None:
+            return points
+        return util.to_fixed_point(points, self.point_scale)
+    
+    def _threshold_points(self, max_points: float, threshold: float):
+        """
+        Returns the points threshold ``threshold * max_points`` in the internal point
+        representation (see ``self._scale_points``), which is exact for fixed-point points
+        (see ``util.fixed_point_threshold``), i.e., ``points >= threshold_points`` is
+        exactly the same as ``points >= threshold * max_points`` without any floating
+        point imprecision.
+        
+        :param max_points: The maximum points (not scaled), e.g., 10.
+        :param threshold: The lower percentage threshold, e.g., 0.4.
+        :return: The points threshold in the internal representation.
+        """
+        if self.point_scale is None:
+            return threshold * max_points
+        return util.fixed_point_threshold(max_points, threshold, self.point_scale)
+    
+    def _evaluate_rules(self, df: pd.DataFrame) -> dict[str, pd.Series]:
+        """
+        This method is called in ``self.create_grading_file`` after creating the grades and
+        evaluates all rules of the grader column-wise, i.e., for all students at once. A rule
+        is a requirement that results in grade 5 if it is failed (e.g., an exam threshold),
+        and its ID is its position within the returned dictionary, which must therefore be
+        the order in which ``self._create_grade_row`` checks the rules. In contrast to
+        ``self._create_grade_row``, which only returns the first failed rule, every rule is
+        evaluated for every student, which results in the bitmask of all failed rules (see
+        ``trace.rule_trace``). The reason of the first failed rule must be exactly the reason
+        that ``self._create_grade_row`` returns.
+        
+        By default, there are no rules (and thus no trace). Subclasses are encouraged to add
+        their rules.
+        
+        :param df: The final, processed pd.DataFrame (including the grades).
+        :return: An (ordered) dictionary mapping the reason of each rule to a boolean pd.Series
+            (True = rule failed).
+        """
+        return dict()
+    
+    def _get_threshold_rules(self, df: pd.DataFrame, thresholds: dict[str, Sequence[float]]) -> tuple:
+        """
+        Returns the inputs of a what-if analysis of the thresholds (see
+        ``simulation.grader_rules``), i.e., the column-wise counterpart of the threshold checks
+        of ``self._create_grade_row``: the total points of each student that determine the
+        grade if no rule fails, the maximum points and the ``simulation.ThresholdRule`` of each
+        threshold constant of the grader module (named after the constant without the
+        "THRESHOLD_" prefix in lower case, e.g., "exam" for ``THRESHOLD_EXAM``).
+        
+        By default, the analysis is not supported. Subclasses with threshold constants are
+        encouraged to add their rules.
+        
+        :param df: The final, processed pd.DataFrame with regular (not fixed-point) points.
+        :param thresholds: A dictionary mapping each threshold constant of the grader module
+            (e.g., "THRESHOLD_EXAM") to its candidate thresholds.
+        :return: A tuple containing the total points (pd.Series), the maximum points and the
+            list of ``simulation.ThresholdRule`` objects.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support the what-if analysis of its thresholds")
+    
+    def _get_trace_reasons(self, df: pd.DataFrame, reasons: list[str], grade_col: str, grade_reason_col: str,
+                           rule_trace_col: str) -> pd.Categorical:
+        # the reason is derived from the trace if any rule failed, otherwise, the original reason is kept (e.g.,
+        # "total threshold not reached" of util.create_grade)
+        failed = df[rule_trace_col] != 0
+        first_failed = trace.first_failed(df[rule_trace_col], reasons)
+        inconsistent = df[failed & ((df[grade_col] != 5) | (df[grade_reason_col] != first_failed.astype(object)))]
+        if len(inconsistent) > 0:
+            warnings.warn(f"the rule trace of the following {len(inconsistent)} entries is inconsistent with their "
+                          f"grades/reasons (the rules of '_evaluate_rules' do not match '_create_grade_row'):\n"
+                          f"{inconsistent[[grade_col, grade_reason_col, rule_trace_col]]}")
+        categories = reasons + [r for r in df.loc[~failed, grade_reason_col].unique() if r not in reasons]
+        return pd.Categorical(np.where(failed, first_failed.astype(object), df[grade_reason_col]),
+                              categories=categories)
+    
     def _create_grade_row(self, row: pd.Series) -> pd.Series:
         """
         This method is called for each row in the final, processed pd.DataFrame in
@@ -297,3 +923,46 @@ class Grader:
             the second entry the reason (type: str, i.e., pandas object) for this grade.
         """
         raise NotImplementedError("must be implemented in subclass")
+
+
+# the grader of a grading process (see "Grader._grade_rows"), which is set once per process
+_worker_grader = None
+
+
+def _init_grading_worker(grader: Grader):
+    global _worker_grader
+    _worker_grader = grader
+
+
+def _grade_shard(shard: pd.DataFrame) -> pd.DataFrame:
+    return shard.apply(_worker_grader._create_grade_row, axis=1)
+
+
+def set_instance_cache(enabled: bool):
+    """
+    Enables or disables (and clears) the instance cache of ``Grader.cached``.
+    
+    :param enabled: Whether ``Grader.cached`` reuses the Grader objects of previous calls.
+    """
+    global _instance_cache
+    _instance_cache = dict() if enabled else None
+
+
+def _get_file_signatures(values: list) -> list:
+    # the signatures of all arguments that are existing files (including lists of files, e.g., exam files)
+    signatures = []
+    for v in values:
+        if isinstance(v, (list, tuple)):
+            signatures.append(_get_file_signatures(list(v)))
+        elif isinstance(v, str) and os.path.isfile(loader.split_member(v)[0]):
+            signatures.append(loader.file_signature(v))
+    return signatures
+
+
+def _get_function_key(f: Callable):
+    # a stable identity of a (row filter) function for memoization, as the callers usually pass a new lambda in each
+    # call: its code, defaults and closure values (global variables that the function refers to are not included)
+    if f is None or not hasattr(f, "__code__"):
+        return f
+    closure = tuple(c.cell_contents for c in f.__closure__ or ())
+    return f.__code__, f.__defaults__, f.__kwdefaults__, closure
@@ -0,0 +1,65 @@
+import warnings
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+# the default quantiles of the points of each item (see "analyze")
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+def analyze(df: pd.DataFrame, item_cols: Sequence[str], grade_col: str, thresholds: dict[str, float] = None,
+            quantiles: Sequence[float] = QUANTILES) -> pd.DataFrame:
+    """
+    Computes the item analysis of a graded pd.DataFrame, i.e., statistics of the points of
+    each item (assignment or quiz column) that show which items have low scores, many
+    missing submissions or high failure rates. All items are reduced at once as a single
+    two-dimensional block (one column per item), without iterating over the items.
+    
+    :param df: The graded pd.DataFrame (see ``Grader.create_grading_file``).
+    :param item_cols: The columns of the items (numeric points, NaN = no submission).
+    :param grade_col: The column that contains the final grade.
+    :param thresholds: If not None, a dictionary mapping items to the minimum points that
+        are required to reach their individual threshold, e.g., ``MAX_POINTS_A *
+        THRESHOLD_INDIVIDUAL_A`` (see ``Grader._get_item_thresholds``). Items without a
+        threshold have a NaN "below_threshold_rate". Default: None
+    :param quantiles: The quantiles of the points of each item (missing points are ignored),
+        which are stored in the columns "q<percent>", e.g., "q25". Default: ``QUANTILES``
+    :return: A pd.DataFrame with one row per item (index "item") and the columns "n"
+        (number of submissions), "mean" (mean points of the submissions), the quantiles,
+        "nan_rate" (rate of missing submissions), "below_threshold_rate" (rate of entries
+        that do not reach the threshold, where missing submissions never reach it, like in
+        the graders) and "grade_corr" (Pearson correlation between the points and the grade
+        over all submissions, which is negative if more points mean better grades).
+    """
+    if thresholds is None:
+        thresholds = dict()
+    points = df[list(item_cols)].to_numpy(dtype=float)
+    grades = df[grade_col].to_numpy(dtype=float)
+    submitted = ~np.isnan(points)
+    n = submitted.sum(axis=0)
+    
+    with warnings.catch_warnings():
+        # items without any submission result in NaN (instead of warning about empty slices)
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(points, axis=0)
+        item_quantiles = np.nanquantile(points, quantiles, axis=0).reshape(len(quantiles), len(item_cols))
+        # pairwise-complete Pearson correlation, i.e., only the entries with submissions of each item
+        grade_mean = (submitted * grades[:, None]).sum(axis=0) / n
+        points_dev = np.where(submitted, points - mean, 0)
+        grades_dev = np.where(submitted, grades[:, None] - grade_mean, 0)
+        grade_corr = (points_dev * grades_dev).sum(axis=0) / np.sqrt((points_dev ** 2).sum(axis=0) *
+                                                                    (grades_dev ** 2).sum(axis=0))
+    
+    threshold_points = np.array([thresholds.get(c, np.nan) for c in item_cols], dtype=float)
+    # NaN points never reach any threshold (NaN >= x is False)
+    below_threshold_rate = np.where(np.isnan(threshold_points), np.nan,
+                                    (~(points >= threshold_points)).mean(axis=0) if len(points) > 0 else np.nan)
+    
+    result = pd.DataFrame(dict(n=n, mean=mean), index=pd.Index(list(item_cols), name="item"))
+    for q, values in zip(quantiles, item_quantiles):
+        result[f"q{q * 100:g}"] = values
+    result["nan_rate"] = (~submitted).mean(axis=0) if len(points) > 0 else np.nan
+    result["below_threshold_rate"] = below_threshold_rate
+    result["grade_corr"] = grade_corr
+    return result
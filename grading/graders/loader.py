@@ -0,0 +1,130 @@
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+import pandas as pd
+
+T = TypeVar("T")
+
+# upper bound of concurrent reader threads (reading is mostly waiting for I/O, so a few
+# threads are enough, and more would only compete for the disk/network share)
+MAX_WORKERS = 8
+# supported compression file extensions (the same as pandas infers for reading and writing)
+COMPRESSIONS = {".gz": "gzip", ".xz": "xz", ".zip": "zip"}
+# separator between a ZIP archive and one of its members, e.g., "exports.zip::moodle.csv"
+ZIP_MEMBER_SEP = "::"
+
+
+def split_member(file: str) -> tuple[str, str]:
+    """
+    Splits ``file`` into the path of the actual file and the selected ZIP archive member,
+    e.g., "exports.zip::moodle.csv" into ("exports.zip", "moodle.csv"), or "moodle.csv"
+    into ("moodle.csv", None).
+    
+    :param file: The path, optionally with a ZIP archive member (see ``ZIP_MEMBER_SEP``).
+    :return: A tuple containing the path and the member (None if no member is selected).
+    """
+    path, sep, member = file.partition(ZIP_MEMBER_SEP)
+    if sep == "":
+        return path, None
+    if os.path.splitext(path)[1].lower() != ".zip":
+        raise ValueError(f"a member can only be selected in ZIP archives: '{file}'")
+    return path, member
+
+
+def strip_compression(file: str) -> tuple[str, str]:
+    """
+    Splits the compression extension (see ``COMPRESSIONS``) from ``file``, e.g.,
+    "grading.csv.gz" into ("grading.csv", ".gz"), or "grading.csv" into ("grading.csv", "").
+    
+    :param file: The path.
+    :return: A tuple containing the path without and the compression extension ("" if the
+        path has no compression extension).
+    """
+    root, ext = os.path.splitext(file)
+    if ext.lower() in COMPRESSIONS:
+        return root, ext
+    return file, ""
+
+
+def file_signature(file: str) -> list:
+    """
+    Returns a cheap signature of ``file`` (absolute path, size and modification time) that
+    changes whenever the file is modified, i.e., the file does not have to be read. For ZIP
+    archive members (see ``split_member``), the signature of the archive itself is returned.
+    
+    :param file: The path, optionally with a ZIP archive member.
+    :return: A list containing the absolute path, the size and the modification time (ns).
+    """
+    stat = os.stat(split_member(file)[0])
+    return [os.path.abspath(file), stat.st_size, stat.st_mtime_ns]
+
+
+def read_csv(file: str, **kwargs) -> pd.DataFrame:
+    """
+    Reads a CSV file like ``pd.read_csv``, which can additionally be compressed or archived,
+    i.e., ".gz", ".xz" or ".zip" (inferred from the extension). A ZIP archive must either
+    contain a single file, or the member must be selected with ``ZIP_MEMBER_SEP``, e.g.,
+    "exports.zip::moodle.csv". The files are decompressed while streaming, i.e., they are
+    never unpacked to disk.
+    
+    :param file: The path of the (compressed) CSV file, optionally with a ZIP archive member.
+    :param kwargs: Additional keyword arguments that are passed to ``pd.read_csv``.
+    :return: The pd.DataFrame.
+    """
+    path, member = split_member(file)
+    if os.path.splitext(path)[1].lower() != ".zip":
+        return pd.read_csv(path, compression="infer", **kwargs)
+    with zipfile.ZipFile(path) as zf:
+        if member is None:
+            members = [m for m in zf.namelist() if not m.endswith("/")]
+            if len(members) != 1:
+                raise ValueError(f"ZIP archive '{path}' contains {len(members)} files, so one must be selected, "
+                                 f"e.g., '{path}{ZIP_MEMBER_SEP}{members[0] if members else 'file.csv'}'")
+            member = members[0]
+        with zf.open(member) as f:
+            return pd.read_csv(f, **kwargs)
+
+
+def read_files(files: list, read_file: Callable[..., T], max_workers: int = None) -> list[T]:
+    """
+    Reads all ``files`` concurrently on a bounded thread pool. The results are returned
+    in the same order as ``files`` (not in the order in which the reads finish), so any
+    "the file specified last wins" semantics of the caller is preserved. If a read fails,
+    its exception is raised (the exception of the first failed file in ``files`` order).
+    
+    :param files: The paths of the files to read (or any other items that ``read_file``
+        accepts, e.g., tuples of a path and its type).
+    :param read_file: The function that reads a single file, e.g., ``pd.read_csv`` (must
+        be thread-safe; use ``functools.partial`` for additional arguments).
+    :param max_workers: The maximum number of reader threads. Default: None, i.e., at most
+        ``MAX_WORKERS`` (and never more than there are files)
+    :return: A list containing the result of ``read_file`` for each file.
+    """
+    files = list(files)
+    if max_workers is None:
+        max_workers = MAX_WORKERS
+    max_workers = min(max_workers, len(files))
+    # no thread overhead if there is nothing to overlap
+    if max_workers <= 1:
+        return [read_file(f) for f in files]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(read_file, files))
+
+
+def read_concat(files: list[str], read_file: Callable[[str], pd.DataFrame], max_workers: int = None,
+                **concat_kwargs) -> pd.DataFrame:
+    """
+    Reads all ``files`` concurrently (see ``read_files``) and concatenates the resulting
+    pd.DataFrames in the order of ``files``, i.e., the rows of later files come after the
+    rows of earlier files (which is what ``drop_duplicates(..., keep="last")`` relies on).
+    
+    :param files: The paths of the files to read.
+    :param read_file: The function that reads a single file and returns a pd.DataFrame.
+    :param max_workers: The maximum number of reader threads (see ``read_files``).
+        Default: None
+    :param concat_kwargs: Additional keyword arguments that are passed to ``pd.concat``.
+    :return: The concatenated pd.DataFrame.
+    """
+    return pd.concat(read_files(files, read_file, max_workers), **concat_kwargs)
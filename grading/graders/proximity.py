@@ -0,0 +1,108 @@
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from graders import simulation, util
+from graders.simulation import ThresholdRule
+
+
+def proximity_report(points, max_points, rules: Sequence[ThresholdRule] = (), grading: dict = None,
+                     index=None, round_ndec: int = 2, step: float = 0.01) -> pd.DataFrame:
+    """
+    Creates a report with the minimum additional points that each student requires to
+    reach the next better grade and to pass each rule, i.e., how close each student is to
+    the next boundary. Everything is calculated with array operations over all students
+    (see ``util.points_to_next_grade`` and ``ThresholdRule.missing_points``), so the report
+    can be created right after grading, e.g., with the final pd.DataFrame ``df`` of the
+    ``HandsOn2LectureGrader`` (see ``grader_proximity_report`` for the rules of a grader):
+        
+        e = util.latest_points(df, ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"])
+        report = proximity_report(e, MAX_POINTS, index=df["ID number"])
+    
+    :param points: An array-like object containing the total points of each student that
+        determine the grade if no rule fails. NaN points are treated as 0 points.
+    :param max_points: The absolute maximum points that can be achieved.
+    :param rules: The ``ThresholdRule`` objects, where each rule must have exactly one
+        threshold (the actual one). Default: ()
+    :param grading: The grading scheme (see ``util.create_grade``). Default: None, i.e.,
+        ``util.DEFAULT_GRADING``
+    :param index: If not None, the index of the report, e.g., the matriculation IDs.
+        Default: None, i.e., the index of ``points`` if it is a pd.Series, otherwise, a
+        default range index
+    :param round_ndec: The number of decimal places for rounding the calculated percentage
+        (see ``util.create_grade``). Default: 2
+    :param step: The resolution of the points (see ``util.points_to_next_grade``).
+        Default: 0.01
+    :return: A pd.DataFrame with one row per student, containing the "points", the grade
+        that these points result in ("points_grade", i.e., ignoring the rules), the missing
+        points for the next better grade ("to_next_grade", NaN for grade 1), the missing points
+        for each rule (column "to_<rule name>", 0 if passed) and the number of failed rules
+        ("n_failed_rules").
+    """
+    if index is None and isinstance(points, pd.Series):
+        index = points.index
+    for r in rules:
+        if len(r.thresholds) != 1:
+            raise ValueError(f"rule '{r.name}' must have exactly one threshold, but has: {list(r.thresholds)}")
+    points = np.nan_to_num(np.asarray(points, dtype=float))
+    grades, to_next_grade = util.points_to_next_grade(points, max_points, grading, round_ndec, step)
+    report = pd.DataFrame(dict(points=points, points_grade=grades, to_next_grade=to_next_grade), index=index)
+    for r in rules:
+        report[f"to_{r.name}"] = r.missing_points(step)[:, 0]
+    report["n_failed_rules"] = (report[[f"to_{r.name}" for r in rules]] > 0).sum(axis=1)
+    return report
+
+
+def grader_proximity_report(grader, df: pd.DataFrame = None, grading: dict = None, round_ndec: int = 2,
+                            step: float = 0.01) -> pd.DataFrame:
+    """
+    Creates the ``proximity_report`` of a grader with its own rules and current thresholds
+    (see ``simulation.grader_rules``), e.g., right after grading:
+        
+        df, _ = grader.create_grading_file(kusss_participants_file)
+        cases = near_boundary_cases(grader_proximity_report(grader, df))
+    
+    :param grader: The ``Grader`` object, which must support the what-if analysis of its
+        thresholds (see ``Grader._get_threshold_rules``).
+    :param df: The final pd.DataFrame of the grader (``Grader.create_grading_file``).
+        Default: None, i.e., all entries of ``grader.df`` (see ``simulation.grader_rules``)
+    :param grading: The grading scheme (see ``util.create_grade``). Default: None, i.e.,
+        ``util.DEFAULT_GRADING``
+    :param round_ndec: The number of decimal places for rounding the calculated percentage
+        (see ``util.create_grade``). Default: 2
+    :param step: The resolution of the points (see ``util.points_to_next_grade``).
+        Default: 0.01
+    :return: The pd.DataFrame of ``proximity_report``, where the index contains the
+        matriculation IDs ("ID number").
+    """
+    points, max_points, rules = simulation.grader_rules(grader, df)
+    return proximity_report(points, max_points, rules, grading, round_ndec=round_ndec, step=step)
+
+
+def near_boundary_cases(report: pd.DataFrame, max_missing: float = 1.0) -> pd.DataFrame:
+    """
+    Returns the cohort-wide list of near-boundary cases of a ``proximity_report``, i.e.,
+    all students who miss the next better grade or a rule by at most ``max_missing``
+    points. For grades, only students who pass all rules are considered (since a failed
+    rule determines the grade regardless of the points), and for rules, only students who
+    fail exactly this one rule are considered (since they would need to pass all other
+    failed rules as well).
+    
+    :param report: The report as returned by ``proximity_report``.
+    :param max_missing: The maximum number of missing points of a near-boundary case.
+        Default: 1.0
+    :return: A pd.DataFrame with one row per near-boundary case and the columns "boundary"
+        ("grade <g>" for the next better grade g, or the rule name) and "missing" (the
+        missing points), sorted by "missing". The index is the index of ``report``.
+    """
+    rule_cols = [c for c in report.columns if c.startswith("to_") and c != "to_next_grade"]
+    cases = []
+    passed_all = report["n_failed_rules"] == 0
+    near = passed_all & (report["to_next_grade"] <= max_missing)
+    cases.append(pd.DataFrame(dict(boundary="grade " + (report.loc[near, "points_grade"] - 1).astype(str),
+                                   missing=report.loc[near, "to_next_grade"])))
+    for c in rule_cols:
+        near = (report["n_failed_rules"] == 1) & (report[c] > 0) & (report[c] <= max_missing)
+        cases.append(pd.DataFrame(dict(boundary=c[len("to_"):], missing=report.loc[near, c])))
+    return pd.concat(cases).sort_values("missing", kind="stable")
@@ -0,0 +1,84 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# the status of each student: found in both the Moodle file and the KUSSS participants (i.e., graded), only in
+# one of them, or dropped from the Moodle file due to an invalid matriculation ID (see "Grader.__init__")
+STATUSES = ["both", "moodle_only", "kusss_only", "invalid_id"]
+# the columns of the reconciliation entries (the names are only available for students of the Moodle file, and
+# the study ID only for KUSSS participants)
+REPORT_COLS = ["status", "id", "skz", "First name", "Last name"]
+
+
+class Reconciliation(NamedTuple):
+    """
+    The reconciliation of the Moodle entries and the KUSSS participants of a grading run
+    (see ``create``), i.e., one entry per student with its status (see ``STATUSES``).
+    """
+    entries: pd.DataFrame  # the columns REPORT_COLS, ordered by status and matriculation ID
+    
+    def get(self, status: str) -> pd.DataFrame:
+        """Returns the entries with the status ``status`` (see ``STATUSES``)."""
+        if status not in STATUSES:
+            raise ValueError(f"unknown status '{status}' (supported: {STATUSES})")
+        return self.entries[self.entries["status"] == status]
+    
+    def counts(self) -> dict[str, int]:
+        """Returns the number of entries per status (including statuses without entries)."""
+        return {status: int(n) for status, n in self.entries["status"].value_counts(sort=False).items()}
+    
+    def write(self, file: str):
+        """Writes the entries to the CSV file ``file`` (see ``read``)."""
+        self.entries.to_csv(file, index=False)
+
+
+def create(outer: pd.DataFrame, matr_id_col: str, study_id_col: str, invalid: pd.DataFrame = None) -> Reconciliation:
+    """
+    Creates the reconciliation based on the outer merge of the Moodle entries and the KUSSS
+    participants (see ``backends.PandasBackend.merge``).
+    
+    :param outer: The outer merge with the Moodle columns "ID number", "First name" and
+        "Last name", the KUSSS columns ``matr_id_col`` and ``study_id_col``, and the column
+        "status" ("both", "moodle_only" or "kusss_only").
+    :param matr_id_col: The KUSSS column that contains the matriculation ID.
+    :param study_id_col: The KUSSS column that contains the study ID.
+    :param invalid: If not None, the Moodle entries (columns "ID number", "First name" and
+        "Last name") that were dropped due to invalid matriculation IDs. Default: None
+    :return: The reconciliation.
+    """
+    entries = pd.DataFrame({
+        "status": outer["status"].to_numpy(),
+        # the Moodle ID is missing for KUSSS participants that are not part of the Moodle file
+        "id": outer["ID number"].where(outer["ID number"].notna(), outer[matr_id_col]).to_numpy(),
+        "skz": outer[study_id_col].astype("Int64").array,
+        "First name": outer["First name"].to_numpy(),
+        "Last name": outer["Last name"].to_numpy(),
+    })
+    if invalid is not None and len(invalid) > 0:
+        invalid_entries = pd.DataFrame({
+            "status": "invalid_id",
+            "id": invalid["ID number"].astype(str).to_numpy(),
+            "skz": pd.array([pd.NA] * len(invalid), dtype="Int64"),
+            "First name": invalid["First name"].to_numpy(),
+            "Last name": invalid["Last name"].to_numpy(),
+        })
+        entries = pd.concat([entries, invalid_entries], ignore_index=True)
+    # the missing names are NaN with every backend (instead of None)
+    entries[["First name", "Last name"]] = entries[["First name", "Last name"]].astype(object).where(
+        entries[["First name", "Last name"]].notna(), np.nan)
+    entries["status"] = pd.Categorical(entries["status"], categories=STATUSES)
+    entries = entries.sort_values(["status", "id"], kind="stable", ignore_index=True)
+    return Reconciliation(entries[REPORT_COLS])
+
+
+def read(file: str) -> Reconciliation:
+    """
+    Reads a reconciliation CSV file (see ``Reconciliation.write``).
+    
+    :param file: The path of the reconciliation CSV file.
+    :return: The reconciliation.
+    """
+    entries = pd.read_csv(file, dtype={"id": str, "skz": "Int64"}, keep_default_na=False, na_values=[""])
+    entries["status"] = pd.Categorical(entries["status"], categories=STATUSES)
+    return Reconciliation(entries[REPORT_COLS])
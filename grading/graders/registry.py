@@ -0,0 +1,108 @@
+import ast
+import functools
+import importlib
+import os
+import re
+from typing import NamedTuple
+
+# this module must not import any heavy dependency (numpy, pandas, ...) or any grader module,
+# since it is used to find graders without importing them (see "graders/cli.py")
+
+GRADERS_DIR = os.path.dirname(os.path.abspath(__file__))
+SEMESTER_PATTERN = re.compile(r"(ws|ss)\d{4}$")
+MODULE_SUFFIX = "grader.py"
+
+
+class GraderEntry(NamedTuple):
+    key: str  # "<semester>/<course>", e.g., "ss2024/python2lecture"
+    module: str  # fully qualified module name, e.g., "graders.ss2024.python2lecturegrader"
+    class_name: str  # name of the grader class, e.g., "Python2LectureGrader"
+    file: str  # path of the module source file
+    has_add_args: bool  # whether the module defines "add_args(parser)" for additional script arguments
+    
+    def load_module(self):
+        """Imports (if not already done) and returns the grader module."""
+        return importlib.import_module(self.module)
+    
+    def load_class(self) -> type:
+        """Imports (if not already done) the grader module and returns the grader class."""
+        return getattr(self.load_module(), self.class_name)
+
+
+def _parse_entry(semester: str, file: str) -> GraderEntry:
+    with open(file, encoding="utf8") as f:
+        tree = ast.parse(f.read(), filename=file)
+    # a grader class is any top-level class with at least one base class whose name ends with "Grader"
+    class_names = [node.name for node in tree.body if isinstance(node, ast.ClassDef) and
+                   any(isinstance(b, ast.Name) and b.id.endswith("Grader") for b in node.bases)]
+    function_names = {node.name for node in tree.body if isinstance(node, ast.FunctionDef)}
+    if len(class_names) != 1:
+        raise ValueError(f"expected exactly one grader class in '{file}', found: {class_names}")
+    module_name = os.path.basename(file)[:-len(".py")]
+    return GraderEntry(
+        key=f"{semester}/{module_name[:-len('grader')]}",
+        module=f"graders.{semester}.{module_name}",
+        class_name=class_names[0],
+        file=file,
+        has_add_args="add_args" in function_names
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def discover(graders_dir: str = GRADERS_DIR) -> dict[str, GraderEntry]:
+    """
+    Finds all grader modules in the semester subdirectories of ``graders_dir`` (e.g.,
+    "ws2021" or "ss2024") without importing them, i.e., the source files are only
+    parsed. Each grader module must contain exactly one grader class and its file name
+    must end with "grader.py". The result is cached.
+    
+    :param graders_dir: The directory that contains the semester subdirectories.
+        Default: the directory of the "graders" package
+    :return: A dictionary mapping each key "<semester>/<course>" (e.g., "ss2024/python2lecture"
+        for the module "graders/ss2024/python2lecturegrader.py") to its ``GraderEntry``,
+        sorted by key.
+    """
+    entries = []
+    for semester in os.listdir(graders_dir):
+        semester_dir = os.path.join(graders_dir, semester)
+        if not SEMESTER_PATTERN.match(semester) or not os.path.isdir(semester_dir):
+            continue
+        for file in os.listdir(semester_dir):
+            if file.endswith(MODULE_SUFFIX):
+                entries.append(_parse_entry(semester, os.path.join(semester_dir, file)))
+    return {e.key: e for e in sorted(entries, key=lambda e: e.key)}
+
+
+def get_entry(key: str) -> GraderEntry:
+    """
+    Returns the ``GraderEntry`` for ``key`` (see ``discover``). Raises a KeyError with
+    all available keys if there is no such entry.
+    
+    :param key: The key "<semester>/<course>", e.g., "ss2024/python2lecture".
+    :return: The corresponding ``GraderEntry``.
+    """
+    entries = discover()
+    if key not in entries:
+        raise KeyError(f"unknown grader '{key}' (available: {', '.join(entries)})")
+    return entries[key]
+
+
+@functools.lru_cache(maxsize=None)
+def get_module_constant(module_name: str, name: str):
+    """
+    Returns the value of the top-level constant ``name`` of the module ``module_name`` of the
+    "graders" package without importing this module, i.e., its source file is only parsed.
+    The value must be a literal (see ``ast.literal_eval``), e.g., a list or a dictionary. The
+    result is cached.
+    
+    :param module_name: The name of the module within the "graders" package, e.g., "audit".
+    :param name: The name of the constant, e.g., "AUDIT_FORMATS".
+    :return: The value of the constant. Raises a KeyError if the module does not assign it.
+    """
+    file = os.path.join(GRADERS_DIR, f"{module_name}.py")
+    with open(file, encoding="utf8") as f:
+        tree = ast.parse(f.read(), filename=file)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == name for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise KeyError(f"'{file}' does not define the constant '{name}'")
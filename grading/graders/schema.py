@@ -0,0 +1,110 @@
+import re
+from typing import NamedTuple, Sequence
+
+import numpy as np
+import pandas as pd
+
+# the maximum number of example matriculation IDs per violation (see "Violation")
+MAX_EXAMPLES = 5
+
+
+class ColumnSpec(NamedTuple):
+    """
+    The expected column(s) of a Moodle export (see ``Grader.SCHEMA``), i.e., whether they
+    must exist and the plausible range of their points.
+    """
+    column: str  # the (English) column name, or a regular expression (full match) if "regex" is True
+    max_points: float = None  # the maximum (actual) points, None = no upper bound
+    min_points: float = 0.0  # the minimum (actual) points, None = no lower bound
+    # the factor by which Moodle scales the actual points in the export, e.g., 10 if the export contains 10 times the
+    # actual points, so the range of the exported points is [scale * min_points, scale * max_points]
+    scale: float = 1
+    required: bool = True  # if False, a missing column (not "regex") is added with NaN points (no submissions)
+    regex: bool = False
+    
+    def matches(self, column: str) -> bool:
+        """Returns whether ``column`` is a column of this specification."""
+        if self.regex:
+            return re.fullmatch(self.column, column) is not None
+        return column == self.column
+
+
+class Violation(NamedTuple):
+    column: str  # the column (or the specified column/pattern if it is missing)
+    check: str  # "missing", "not numeric", "below minimum" or "above maximum"
+    n_entries: int  # the number of violating entries (0 for missing columns)
+    examples: list[str]  # up to MAX_EXAMPLES matriculation IDs of violating entries
+    
+    def __str__(self):
+        if self.n_entries == 0:
+            return f"'{self.column}': {self.check}"
+        return f"'{self.column}': {self.check} ({self.n_entries} entries, e.g., {', '.join(self.examples)})"
+
+
+class SchemaError(ValueError):
+    """Raised if a Moodle export violates the schema of a grader (see ``validate``)."""
+    
+    def __init__(self, grader_name: str, violations: list[Violation]):
+        self.violations = violations
+        super().__init__(f"the Moodle export violates the schema of {grader_name} ({len(violations)} violations):\n" +
+                         "\n".join(f"- {v}" for v in violations))
+
+
+def validate(df: pd.DataFrame, schema: Sequence[ColumnSpec], id_col: str = "ID number") -> list[Violation]:
+    """
+    Checks all columns of ``df`` against ``schema`` and returns every violation at once.
+    The points of all specified columns are checked in a single vectorized pass, i.e.,
+    they are compared with the bounds of their columns as a two-dimensional block. Each
+    column is checked against the first specification that matches it. Missing points
+    (NaN, i.e., no submission) are never a violation.
+    
+    :param df: The Moodle entries (with English column names, see ``Grader.__init__``).
+    :param schema: The column specifications.
+    :param id_col: The column of the matriculation IDs, which are reported as examples.
+    :return: A list of all violations (empty if ``df`` satisfies ``schema``), i.e., first the
+        missing and non-numeric columns, then the points out of range.
+    """
+    violations = []
+    cols, lower, upper = [], [], []
+    for spec in schema:
+        spec_cols = [c for c in df.columns if spec.matches(c) and c not in cols]
+        if len(spec_cols) == 0 and spec.required:
+            violations.append(Violation(spec.column, "missing", 0, []))
+        for c in spec_cols:
+            if not pd.api.types.is_numeric_dtype(df[c]):
+                # e.g., Moodle exported "-" in a different format, or a text column ended up in this position
+                non_numeric = df[c].notna() & pd.to_numeric(df[c], errors="coerce").isna()
+                violations.append(Violation(c, "not numeric", int(non_numeric.sum()),
+                                            df.loc[non_numeric, id_col].astype(str).head(MAX_EXAMPLES).tolist()))
+                continue
+            cols.append(c)
+            lower.append(-np.inf if spec.min_points is None else spec.min_points * spec.scale)
+            upper.append(np.inf if spec.max_points is None else spec.max_points * spec.scale)
+    if len(cols) == 0:
+        return violations
+    
+    # shape (n_entries, n_cols); NaN is neither below nor above any bound
+    points = df[cols].to_numpy(dtype=float)
+    ids = df[id_col].astype(str).to_numpy()
+    for check, mask in [("below minimum", points < np.array(lower)), ("above maximum", points > np.array(upper))]:
+        counts = mask.sum(axis=0)
+        for i in np.flatnonzero(counts):
+            bound = lower[i] if check == "below minimum" else upper[i]
+            violations.append(Violation(cols[i], f"{check} {bound:g}", int(counts[i]),
+                                        ids[mask[:, i]][:MAX_EXAMPLES].tolist()))
+    return violations
+
+
+def add_missing_columns(df: pd.DataFrame, schema: Sequence[ColumnSpec]) -> list[str]:
+    """
+    Adds all optional columns of ``schema`` that are missing in ``df`` (in place) with NaN
+    points, e.g., a retry exam that is not part of earlier Moodle exports.
+    
+    :param df: The Moodle entries.
+    :param schema: The column specifications.
+    :return: The added columns.
+    """
+    added = [spec.column for spec in schema if not spec.required and not spec.regex and spec.column not in df.columns]
+    for c in added:
+        df[c] = np.nan
+    return added
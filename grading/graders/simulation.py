@@ -0,0 +1,247 @@
+import itertools
+import sys
+from typing import NamedTuple, Sequence
+
+import numpy as np
+import pandas as pd
+
+from graders import util
+
+# upper bound for the number of (student, combination) grades that are evaluated at once
+MAX_CHUNK_ELEMENTS = 2 ** 24
+
+
+class ThresholdRule(NamedTuple):
+    """
+    A "hard" requirement of a grader, i.e., students fail (grade 5) if they do not reach
+    the threshold, e.g., ``THRESHOLD_EXAM`` or ``THRESHOLD_INDIVIDUAL_A``. The rule is the
+    same float comparison that the graders use: ``points < max_points * threshold`` means
+    that the threshold is not reached (NaN points never reach any threshold).
+    
+    If ``points`` is two-dimensional (one column per item, e.g., per assignment), the rule
+    fails if more than ``max_failed`` items do not reach the threshold, which corresponds
+    to, e.g., ``MAX_N_ASSIGNMENTS_FAILED``. In this case, ``max_points`` can also be one
+    value per item.
+    """
+    name: str
+    points: np.ndarray  # shape (n_students,) or (n_students, n_items)
+    max_points: float  # or one value per item if "points" is two-dimensional
+    thresholds: Sequence[float]  # all candidate thresholds to evaluate
+    max_failed: int = 0
+    
+    def fail_matrix(self) -> np.ndarray:
+        """Returns a boolean np.ndarray of shape (n_students, len(thresholds)) (True = rule failed)."""
+        points = np.asarray(self.points, dtype=float)
+        thresholds = np.asarray(self.thresholds, dtype=float)
+        if points.ndim == 1:
+            points = points[:, None]
+        max_points = np.broadcast_to(np.asarray(self.max_points, dtype=float), points.shape[1:])
+        # shape (n_students, n_items, n_thresholds); NaN < x is False, so use "not >=" to fail NaN points
+        not_reached = ~(points[:, :, None] >= max_points[None, :, None] * thresholds[None, None, :])
+        return not_reached.sum(axis=1) > self.max_failed
+    
+    def missing_points(self, step: float = None) -> np.ndarray:
+        """
+        Vectorized inverse of the rule: Returns the minimum additional points that are
+        required to pass the rule (0 if it is already passed) as np.ndarray of shape
+        (n_students, len(thresholds)). NaN points are treated as 0 points. For a two-
+        dimensional rule, the smallest deficits of the failed items are added up until no
+        more than ``max_failed`` items remain failed.
+        
+        :param step: If not None, the missing points of each item are rounded up to the next
+            multiple of ``step`` (the point resolution, e.g., 0.5). Default: None
+        :return: A float np.ndarray of shape (n_students, len(thresholds)).
+        """
+        points = np.nan_to_num(np.asarray(self.points, dtype=float))
+        thresholds = np.asarray(self.thresholds, dtype=float)
+        if points.ndim == 1:
+            points = points[:, None]
+        max_points = np.broadcast_to(np.asarray(self.max_points, dtype=float), points.shape[1:])
+        # shape (n_students, n_items, n_thresholds), 0 for all items that reach the threshold
+        deficits = util.round_up_to_step(np.clip(max_points[None, :, None] * thresholds[None, None, :] -
+                                                 points[:, :, None], 0, None), step)
+        # passed items have a deficit of 0, so the smallest "n_items - max_failed" deficits are exactly the
+        # passed items plus the cheapest failed items that must be fixed
+        n_required = max(points.shape[1] - self.max_failed, 0)
+        return np.sort(deficits, axis=1)[:, :n_required, :].sum(axis=1)
+
+
+def _scheme_grades(units: np.ndarray, gradings: Sequence[dict], round_ndec: int) -> np.ndarray:
+    # shape (n_students, n_gradings), same logic as "util.create_grades" for all grading schemes at once
+    thresholds = np.array([[util.min_units(g[i], round_ndec) for i in range(1, 5)] for g in gradings])
+    match = units[:, None, None] >= thresholds[None, :, :]
+    return np.where(match.any(axis=2), match.argmax(axis=2) + 1, 5).astype(np.int8)
+
+
+def simulate_thresholds(points, max_points, rules: Sequence[ThresholdRule] = (), gradings: Sequence[dict] = None,
+                        baseline=None, round_ndec: int = 2) -> pd.DataFrame:
+    """
+    Evaluates the grade distribution of a cohort for every combination of candidate
+    thresholds at once (what-if analysis), i.e., for the full grid that consists of all
+    ``thresholds`` of all ``rules`` and all grading schemes ``gradings``. Students fail if
+    any rule fails, otherwise, their grade is determined by ``points`` and the respective
+    grading scheme (exactly like ``util.create_grade``). Instead of grading once per
+    combination, each rule and each grading scheme is evaluated once, and all combinations
+    are then assembled with array broadcasting (in chunks of at most ``MAX_CHUNK_ELEMENTS``
+    grades to bound the memory).
+    
+    The inputs are typically computed from the final pd.DataFrame of an already prepared
+    grader (``Grader.create_grading_file``), which ``grader_rules`` and ``simulate_grader``
+    do with the rules of the grader itself, e.g., for the ``Python2ExerciseGrader``:
+        
+        a_cols = [f"Assignment: Assignment {i + 1} (Real)" for i in range(N_ASSIGNMENTS)]
+        a = df[a_cols + ["Assignment: Assignment 7 (Project) (Real)"]].fillna(0)
+        e = util.latest_points(df, ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"])
+        rules = [
+            ThresholdRule("individual_a", a, [MAX_POINTS_A] * N_ASSIGNMENTS + [MAX_POINTS_PROJECT],
+                          [0.2, 0.25, 0.3], max_failed=MAX_N_ASSIGNMENTS_FAILED),
+            ThresholdRule("all_a", a.sum(axis=1), MAX_POINTS_ALL_A, np.arange(0.4, 0.61, 0.05)),
+            ThresholdRule("exam", e, MAX_POINTS_EXAM, [0.4, 0.45, 0.5]),
+        ]
+        bonus = df["Assignment: Assignment 8 (Bonus) (Real)"].fillna(0)
+        table = simulate_thresholds(e + a.sum(axis=1) + bonus, MAX_POINTS, rules, baseline=df["grade"])
+    
+    :param points: An array-like object containing the total points of each student that
+        determine the grade if no rule fails. NaN points result in grade 5.
+    :param max_points: The absolute maximum points that can be achieved.
+    :param rules: The ``ThresholdRule`` objects with their candidate thresholds. Default: ()
+    :param gradings: The candidate grading schemes (see ``util.create_grade``). Default:
+        None, i.e., only ``util.DEFAULT_GRADING``
+    :param baseline: If not None, an array-like object containing the reference grade of
+        each student (e.g., the grades of the current thresholds) that is used to count the
+        changed grades. Default: None, i.e., the first combination (first threshold of each
+        rule and first grading scheme) is the baseline
+    :param round_ndec: The number of decimal places for rounding the calculated percentage
+        (see ``util.create_grade``). Default: 2
+    :return: A pd.DataFrame with one row per combination, containing the threshold of each
+        rule (column = rule name), the grading scheme ("grading" = index within ``gradings``
+        and "grading_1" to "grading_4" = its thresholds), the number of each grade ("n_1"
+        to "n_5"), the "pass_rate" and the number of grades that differ from ``baseline``
+        ("n_changed", split into "n_better" and "n_worse").
+    """
+    if gradings is None:
+        gradings = [util.DEFAULT_GRADING]
+    names = [r.name for r in rules]
+    if len(set(names)) != len(names) or any(n.startswith("grading") or n.startswith("n_") for n in names):
+        raise ValueError(f"rule names must be unique and must not clash with the result columns: {names}")
+    points = np.asarray(points, dtype=float)
+    n = len(points)
+    
+    missing = np.isnan(points)
+    units = util.percentage_units(np.where(missing, 0, points), max_points, round_ndec)
+    scheme_grades = _scheme_grades(units, gradings, round_ndec)
+    scheme_grades[missing] = 5
+    fail_matrices = [r.fail_matrix() for r in rules]
+    for r, f in zip(rules, fail_matrices):
+        if f.shape[0] != n:
+            raise ValueError(f"rule '{r.name}' has {f.shape[0]} entries, but there are {n} points")
+    
+    grid_shape = tuple(f.shape[1] for f in fail_matrices) + (len(gradings),)
+    n_combinations = int(np.prod(grid_shape))
+    chunk_size = max(1, MAX_CHUNK_ELEMENTS // max(n, 1))
+    counts = np.empty((n_combinations, 5), dtype=np.int64)
+    changes = np.empty((n_combinations, 2), dtype=np.int64)
+    baseline_grades = None if baseline is None else np.asarray(baseline, dtype=np.int8)[:, None]
+    for start in range(0, n_combinations, chunk_size):
+        combinations = np.arange(start, min(start + chunk_size, n_combinations))
+        *rule_idx, grading_idx = np.unravel_index(combinations, grid_shape)
+        # shape (n_students, n_chunk_combinations)
+        failed = np.zeros((n, len(combinations)), dtype=bool)
+        for f, idx in zip(fail_matrices, rule_idx):
+            failed |= f[:, idx]
+        grades = np.where(failed, np.int8(5), scheme_grades[:, grading_idx])
+        if baseline_grades is None:
+            baseline_grades = grades[:, :1].copy()
+        for g in range(5):
+            counts[combinations, g] = (grades == g + 1).sum(axis=0)
+        changes[combinations, 0] = (grades < baseline_grades).sum(axis=0)
+        changes[combinations, 1] = (grades > baseline_grades).sum(axis=0)
+    
+    table = pd.DataFrame(list(itertools.product(*[r.thresholds for r in rules], range(len(gradings)))),
+                         columns=names + ["grading"])
+    for i in range(1, 5):
+        table[f"grading_{i}"] = [gradings[g][i] for g in table["grading"]]
+    for g in range(5):
+        table[f"n_{g + 1}"] = counts[:, g]
+    table["pass_rate"] = counts[:, :4].sum(axis=1) / n if n > 0 else np.nan
+    table["n_changed"] = changes.sum(axis=1)
+    table["n_better"] = changes[:, 0]
+    table["n_worse"] = changes[:, 1]
+    return table
+
+
+def get_threshold_constants(grader) -> dict[str, float]:
+    """
+    Returns the threshold constants of the module of a grader, i.e., all module-level
+    constants whose name starts with "THRESHOLD_" (e.g., ``THRESHOLD_EXAM``).
+    
+    :param grader: The ``Grader`` object.
+    :return: A dictionary mapping the constant names to their current values.
+    """
+    module = sys.modules[type(grader).__module__]
+    return {name: value for name, value in vars(module).items() if name.startswith("THRESHOLD_")}
+
+
+def grader_rules(grader, df: pd.DataFrame = None, thresholds: dict[str, Sequence[float]] = None,
+                 index_col: str = "ID number") -> tuple[pd.Series, float, list[ThresholdRule]]:
+    """
+    Builds the inputs of ``simulate_thresholds`` (and ``proximity.proximity_report``) from
+    a grader, i.e., the total points, the maximum points and the ``ThresholdRule`` objects
+    as defined by the grader itself (see ``Grader._get_threshold_rules``), so the rules do
+    not have to be re-encoded by hand:
+        
+        grader = Python2ExerciseGrader(moodle_file)
+        df, _ = grader.create_grading_file(kusss_participants_file)
+        points, max_points, rules = grader_rules(grader, df, dict(THRESHOLD_EXAM=[0.4, 0.45, 0.5]))
+    
+    :param grader: The ``Grader`` object, which must support the what-if analysis of its
+        thresholds (``NotImplementedError`` otherwise).
+    :param df: The final pd.DataFrame of the grader (``Grader.create_grading_file``). If None,
+        all entries of ``grader.df`` are processed (without any KUSSS participants) and the
+        point columns (see ``Grader._get_point_cols``) are converted back from fixed-point
+        points (if any). Default: None
+    :param thresholds: A dictionary mapping threshold constants of the grader module (see
+        ``get_threshold_constants``) to their candidate thresholds. Constants that are not
+        specified only have their current value as candidate. Default: None, i.e., only the
+        current thresholds
+    :param index_col: The column of ``df`` that is used as index of the returned total
+        points. Default: "ID number"
+    :return: A tuple containing the total points (pd.Series), the maximum points and the
+        list of ``ThresholdRule`` objects.
+    """
+    constants = get_threshold_constants(grader)
+    if thresholds is None:
+        thresholds = dict()
+    unknown = set(thresholds) - set(constants)
+    if len(unknown) > 0:
+        raise ValueError(f"unknown threshold constants {sorted(unknown)} (available: {list(constants)})")
+    if df is None:
+        df = grader._process_entries(grader.df.copy())
+        if grader.point_scale is not None:
+            point_cols = grader._get_point_cols(df)
+            df[point_cols] = util.from_fixed_point(df[point_cols], grader.point_scale)
+    points, max_points, rules = grader._get_threshold_rules(df, {**{c: [v] for c, v in constants.items()},
+                                                                 **thresholds})
+    return pd.Series(np.asarray(points, dtype=float), index=df[index_col].values), max_points, rules
+
+
+def simulate_grader(grader, df: pd.DataFrame, thresholds: dict[str, Sequence[float]] = None,
+                    gradings: Sequence[dict] = None, grade_col: str = "grade", round_ndec: int = 2) -> pd.DataFrame:
+    """
+    Runs ``simulate_thresholds`` with the rules of a grader (see ``grader_rules``), where the
+    actual grades of ``df`` are the baseline.
+    
+    :param grader: The ``Grader`` object.
+    :param df: The final pd.DataFrame of the grader (``Grader.create_grading_file``).
+    :param thresholds: A dictionary mapping threshold constants of the grader module to their
+        candidate thresholds (see ``grader_rules``). Default: None, i.e., only the current
+        thresholds
+    :param gradings: The candidate grading schemes (see ``simulate_thresholds``). Default:
+        None, i.e., only ``util.DEFAULT_GRADING``
+    :param grade_col: The column of ``df`` that contains the grades. Default: "grade"
+    :param round_ndec: The number of decimal places for rounding the calculated percentage
+        (see ``util.create_grade``). Default: 2
+    :return: The pd.DataFrame of ``simulate_thresholds``.
+    """
+    points, max_points, rules = grader_rules(grader, df, thresholds)
+    return simulate_thresholds(points, max_points, rules, gradings, baseline=df[grade_col], round_ndec=round_ndec)
@@ -0,0 +1,160 @@
+import json
+import os
+import warnings
+from typing import Callable, Union
+
+import numpy as np
+import pandas as pd
+
+# supported spreadsheet file extensions and the respective parsing engine (optional dependencies)
+SPREADSHEET_ENGINES = {".xlsx": "openpyxl", ".ods": "odf"}
+# the parsed spreadsheet is cached next to the spreadsheet file in a binary Arrow IPC file
+CACHE_SUFFIX = ".parsed.arrow"
+# key of the schema metadata entry of the cache file that holds the (JSON-encoded) cache key and header
+CACHE_METADATA_KEY = b"spreadsheet"
+CACHE_VERSION = 1
+
+
+def is_spreadsheet(file: str) -> bool:
+    """Returns whether ``file`` has the file extension of one of the supported spreadsheet formats."""
+    return os.path.splitext(file)[1].lower() in SPREADSHEET_ENGINES
+
+
+def _read_xlsx(file: str, select_cols: Callable[[list[str]], list[str]],
+               sheet_name: Union[int, str]) -> tuple[list[str], pd.DataFrame]:
+    import openpyxl
+    
+    # read-only mode streams the rows instead of loading the whole workbook into memory
+    wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        rows = ws.iter_rows(values_only=True)
+        header = ["" if h is None else str(h) for h in next(rows, ())]
+        cols = select_cols(header)
+        indices = [header.index(c) for c in cols]
+        # only the selected cells of each row are kept (and completely empty rows are skipped)
+        data = [[row[i] if i < len(row) else None for i in indices] for row in rows
+                if any(v is not None for v in row)]
+    finally:
+        wb.close()
+    return header, pd.DataFrame(data, columns=cols, dtype=object)
+
+
+def _read_ods(file: str, select_cols: Callable[[list[str]], list[str]],
+              sheet_name: Union[int, str]) -> tuple[list[str], pd.DataFrame]:
+    # there is no streaming mode for ODS (the whole document is parsed), so the columns are selected afterwards
+    df = pd.read_excel(file, engine=SPREADSHEET_ENGINES[".ods"], sheet_name=sheet_name, dtype=object)
+    header = [str(c) for c in df.columns]
+    df.columns = header
+    return header, df[select_cols(header)]
+
+
+def _normalize(df: pd.DataFrame, na_values: list[str]) -> pd.DataFrame:
+    # same types as with pd.read_csv, i.e., "na_values" are missing values, columns that only contain
+    # numbers are numeric, and all other columns contain strings (e.g., a number within a text column)
+    df = df.replace(list(na_values), np.nan).fillna(np.nan)
+    for c in df.columns:
+        try:
+            df[c] = pd.to_numeric(df[c])
+        except (ValueError, TypeError):
+            df[c] = df[c].map(lambda v: v if pd.isna(v) else str(v)).astype(object)
+    return df
+
+
+def _cache_key(file: str, sheet_name: Union[int, str], na_values: list[str]) -> dict:
+    # cheap change detection (no need to read the file)
+    stat = os.stat(file)
+    return dict(version=CACHE_VERSION, size=stat.st_size, mtime_ns=stat.st_mtime_ns, sheet_name=sheet_name,
+                na_values=list(na_values))
+
+
+def _read_cache(cache_file: str, key: dict):
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    try:
+        with pa.memory_map(cache_file) as source:
+            table = pa.ipc.open_file(source).read_all()
+        metadata = json.loads(table.schema.metadata[CACHE_METADATA_KEY])
+        cache_key, header = metadata["key"], metadata["header"]
+    except (OSError, pa.ArrowInvalid, KeyError, TypeError, ValueError) as e:
+        # e.g., a truncated file of an interrupted write; the spreadsheet is parsed again (and the cache replaced)
+        warnings.warn(f"the spreadsheet cache '{cache_file}' is corrupt and ignored: {e}")
+        return None
+    if cache_key != key:
+        return None
+    return header, table.to_pandas()
+
+
+def _write_cache(cache_file: str, key: dict, header: list[str], df: pd.DataFrame):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        warnings.warn(f"the parsed spreadsheet could not be cached (mixed column types): {e}")
+        return
+    metadata = json.dumps(dict(key=key, header=header)).encode("utf8")
+    table = table.replace_schema_metadata({CACHE_METADATA_KEY: metadata})
+    try:
+        with pa.OSFile(cache_file, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    except OSError as e:
+        # e.g., a read-only directory or a full disk; a partially written cache must not be read later
+        warnings.warn(f"the parsed spreadsheet could not be cached (cannot write '{cache_file}'): {e}")
+        if os.path.isfile(cache_file):
+            os.remove(cache_file)
+
+
+def read_spreadsheet(file: str, select_cols: Callable[[list[str]], list[str]] = None,
+                     sheet_name: Union[int, str] = 0, na_values: list[str] = None,
+                     cache: bool = True) -> pd.DataFrame:
+    """
+    Reads a spreadsheet file (".xlsx" or ".ods", see ``SPREADSHEET_ENGINES``) and returns
+    it with the same column types as ``pd.read_csv`` would, i.e., ``na_values`` are missing
+    values, and columns that only contain numbers are numeric. XLSX files are streamed in
+    read-only mode, where only the cells of the columns selected by ``select_cols`` are kept
+    (ODS files must be parsed as a whole). The parsed result is cached next to ``file``
+    (see ``CACHE_SUFFIX``), so the slow spreadsheet parsing only happens once per file (as
+    long as it is not modified). Requires the optional dependency "openpyxl" (XLSX) or
+    "odfpy" (ODS), and "pyarrow" for the cache (without it, the file is always parsed).
+    
+    :param file: The path of the spreadsheet file.
+    :param select_cols: If not None, a function that receives the header (the column names
+        of the first row) and returns the columns to read. Default: None, i.e., all columns
+    :param sheet_name: The index or name of the worksheet. Default: 0, i.e., the first sheet
+    :param na_values: The cell values that are treated as missing values. Default: None = ["-"]
+    :param cache: Whether to use (and create) the cache file. Default: True
+    :return: The pd.DataFrame containing the selected columns.
+    """
+    ext = os.path.splitext(file)[1].lower()
+    if ext not in SPREADSHEET_ENGINES:
+        raise ValueError(f"unknown spreadsheet file extension '{ext}' (supported: {list(SPREADSHEET_ENGINES)})")
+    if select_cols is None:
+        select_cols = list
+    if na_values is None:
+        na_values = ["-"]
+    cache_file = file + CACHE_SUFFIX
+    key = _cache_key(file, sheet_name, na_values)
+    
+    if cache:
+        cached = _read_cache(cache_file, key)
+        if cached is not None:
+            header, df = cached
+            cols = select_cols(header)
+            # the cache can be used if it contains all selected columns (it only contains those of the last parse)
+            if set(cols) <= set(df.columns):
+                return df[cols]
+    
+    read = _read_xlsx if ext == ".xlsx" else _read_ods
+    header, df = read(file, select_cols, sheet_name)
+    df = _normalize(df, na_values)
+    if cache:
+        _write_cache(cache_file, key, header, df)
+    return df
@@ -1,8 +1,12 @@
+import argparse
+from typing import Sequence
+
 import numpy as np
 import pandas as pd
 
-from graders import util
+from graders import arguments, schema, util, view
 from graders.grader import Grader
+from graders.simulation import ThresholdRule
 
 MAX_POINTS_EXAM = 10
 MAX_POINTS_A1 = 35
@@ -17,6 +21,13 @@ THRESHOLD_ALL_A = 0.5
 
 class Python2Grader(Grader):
     
+    SCHEMA = [
+        schema.ColumnSpec(r"Assignment: Exercise \d+ \(Real\)", regex=True),
+        schema.ColumnSpec("Quiz: Exam (Real)", MAX_POINTS_EXAM),
+        schema.ColumnSpec("Quiz: Retry Exam (Real)", MAX_POINTS_EXAM, required=False),
+        schema.ColumnSpec("Quiz: Retry Exam 2 (Real)", MAX_POINTS_EXAM, required=False),
+    ]
+    
     def _process_entries(self, df: pd.DataFrame) -> pd.DataFrame:
         df = super()._process_entries(df)
         a1_cols = [c for c in self.assignment_cols if any([f"Exercise {i} " in c for i in range(1, 3 + 1)])]
@@ -25,6 +36,35 @@ class Python2Grader(Grader):
         df["a2_total"] = df[a2_cols].sum(axis=1)
         return df
     
+    def _get_item_thresholds(self) -> dict[str, float]:
+        return {
+            "a1_total": MAX_POINTS_A1 * THRESHOLD_INDIVIDUAL_A,
+            "a2_total": MAX_POINTS_A2 * THRESHOLD_INDIVIDUAL_A,
+            **{c: MAX_POINTS_EXAM * THRESHOLD_EXAM for c in self.quiz_cols},
+        }
+    
+    def _evaluate_rules(self, df: pd.DataFrame) -> dict[str, pd.Series]:
+        e_points = util.latest_points(df, ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"])
+        return {
+            "assignment 1 threshold not reached": df["a1_total"] < MAX_POINTS_A1 * THRESHOLD_INDIVIDUAL_A,
+            "assignment 2 threshold not reached": df["a2_total"] < MAX_POINTS_A2 * THRESHOLD_INDIVIDUAL_A,
+            "total assignment threshold not reached":
+                df["a1_total"] + df["a2_total"] < MAX_POINTS_ALL_A * THRESHOLD_ALL_A,
+            "no exam participation": e_points.isna(),
+            "exam threshold not reached": e_points < MAX_POINTS_EXAM * THRESHOLD_EXAM,
+        }
+    
+    def _get_threshold_rules(self, df: pd.DataFrame, thresholds: dict[str, Sequence[float]]) -> tuple:
+        a_points = df[["a1_total", "a2_total"]]
+        e_points = util.latest_points(df, ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"])
+        rules = [
+            ThresholdRule("individual_a", a_points, [MAX_POINTS_A1, MAX_POINTS_A2],
+                          thresholds["THRESHOLD_INDIVIDUAL_A"]),
+            ThresholdRule("all_a", a_points.sum(axis=1), MAX_POINTS_ALL_A, thresholds["THRESHOLD_ALL_A"]),
+            ThresholdRule("exam", e_points, MAX_POINTS_EXAM, thresholds["THRESHOLD_EXAM"]),
+        ]
+        return e_points + a_points.sum(axis=1), MAX_POINTS, rules
+    
     def _create_grade_row(self, row: pd.Series) -> pd.Series:
         # assignments processing (if students already failed the course via some
         # assignment rule, there is no need to even look at the exam, since it
@@ -59,18 +99,21 @@ class Python2Grader(Grader):
         return util.create_grade(e_points + a1_points + a2_points, MAX_POINTS)
 
 
-if __name__ == "__main__":
-    args = util.get_grading_args_parser().parse_args()
+def main(args: argparse.Namespace):
     util.args_sanity_check(args.moodle_file, args.kusss_participants_files, "python2")
     assert args.grading_file is None, "not supported since all KUSSS participants files are treated individually"
-    grader = Python2Grader(args.moodle_file)
+    grader = Python2Grader.cached(args.moodle_file, point_scale=args.point_scale, backend=args.backend)
     for kusss_participants_file in args.kusss_participants_files:
         try:
-            # regular; below is creating grades only for retry exam participants
-            # gdf, gf = grader.create_grading_file(kusss_participants_file)
+            # creating grades only for retry exam participants, and additionally, all grades as view (regular)
             gdf, gf = grader.create_grading_file(kusss_participants_file,
-                                                 row_filter=lambda row: not np.isnan(row["Quiz: Retry Exam (Real)"]))
+                                                 row_filter=lambda row: not np.isnan(row["Quiz: Retry Exam (Real)"]),
+                                                 views=dict(full=view.View()), **arguments.grading_kwargs(args))
             gdf.to_csv(gf.replace(".csv", "_FULL.csv"), index=False)
         except ValueError as e:
             print(f"### ignore file '{kusss_participants_file}' because of '{e}'")
         print()
+
+
+if __name__ == "__main__":
+    main(arguments.get_grading_args_parser().parse_args())
@@ -1,14 +1,19 @@
+import argparse
+from typing import Sequence
+
 import numpy as np
 import pandas as pd
 
-from graders import util
+from graders import arguments, schema, util
 from graders.grader import Grader
+from graders.simulation import ThresholdRule
 
 MAX_POINTS_EXAM = 100
 # all assignments have 100 points (except the bonus assignment (50) and the project (400) which we can ignore here)
 MAX_POINTS_A = 100
 N_ASSIGNMENTS = 6
 MAX_POINTS_PROJECT = 400  # ignore the optional 50 or 100 bonus points here
+MAX_BONUS_POINTS_PROJECT = 100
 MAX_POINTS_ALL_A = N_ASSIGNMENTS * MAX_POINTS_A + MAX_POINTS_PROJECT
 assert MAX_POINTS_ALL_A == 1000
 MAX_POINTS = MAX_POINTS_EXAM + MAX_POINTS_ALL_A
@@ -22,6 +27,14 @@ THRESHOLD_ALL_A = 0.5
 
 class Python2ExerciseGrader(Grader):
     
+    SCHEMA = [
+        *[schema.ColumnSpec(f"Assignment: Assignment {i + 1} (Real)", MAX_POINTS_A) for i in range(N_ASSIGNMENTS)],
+        schema.ColumnSpec("Assignment: Assignment 7 (Project) (Real)", MAX_POINTS_PROJECT + MAX_BONUS_POINTS_PROJECT),
+        schema.ColumnSpec("Quiz: Exam (Real)", MAX_POINTS_EXAM),
+        schema.ColumnSpec("Quiz: Retry Exam (Real)", MAX_POINTS_EXAM, required=False),
+        schema.ColumnSpec("Quiz: Retry Exam 2 (Real)", MAX_POINTS_EXAM, required=False),
+    ]
+    
     def _process_entries(self, df: pd.DataFrame) -> pd.DataFrame:
         len_before = len(df)
         df.dropna(how="all", subset=self.assignment_cols, inplace=True)
@@ -30,6 +43,44 @@ class Python2ExerciseGrader(Grader):
                         f"the assignments at all)")
         return df
     
+    def _get_item_thresholds(self) -> dict[str, float]:
+        return {
+            **{f"Assignment: Assignment {i + 1} (Real)": MAX_POINTS_A * THRESHOLD_INDIVIDUAL_A
+               for i in range(N_ASSIGNMENTS)},
+            "Assignment: Assignment 7 (Project) (Real)": MAX_POINTS_PROJECT * THRESHOLD_INDIVIDUAL_A,
+            **{c: MAX_POINTS_EXAM * THRESHOLD_EXAM for c in
+               ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]},
+        }
+    
+    def _evaluate_rules(self, df: pd.DataFrame) -> dict[str, pd.Series]:
+        a_cols = [f"Assignment: Assignment {i + 1} (Real)" for i in range(N_ASSIGNMENTS)]
+        a_points = df[a_cols].fillna(0)
+        project_points = df["Assignment: Assignment 7 (Project) (Real)"].fillna(0)
+        n_failed = (a_points < MAX_POINTS_A * THRESHOLD_INDIVIDUAL_A).sum(axis=1) + \
+                   (project_points < MAX_POINTS_PROJECT * THRESHOLD_INDIVIDUAL_A)
+        e_points = util.latest_points(df, ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"])
+        return {
+            f"more than {MAX_N_ASSIGNMENTS_FAILED} individual assignment thresholds not reached":
+                n_failed > MAX_N_ASSIGNMENTS_FAILED,
+            "total assignment threshold not reached":
+                a_points.sum(axis=1) + project_points < MAX_POINTS_ALL_A * THRESHOLD_ALL_A,
+            "no exam participation": e_points.isna(),
+            "exam threshold not reached": e_points < MAX_POINTS_EXAM * THRESHOLD_EXAM,
+        }
+    
+    def _get_threshold_rules(self, df: pd.DataFrame, thresholds: dict[str, Sequence[float]]) -> tuple:
+        a_points = df[[f"Assignment: Assignment {i + 1} (Real)" for i in range(N_ASSIGNMENTS)] +
+                      ["Assignment: Assignment 7 (Project) (Real)"]].fillna(0)
+        e_points = util.latest_points(df, ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"])
+        bonus_points = df["Assignment: Assignment 8 (Bonus) (Real)"].fillna(0)
+        rules = [
+            ThresholdRule("individual_a", a_points, [MAX_POINTS_A] * N_ASSIGNMENTS + [MAX_POINTS_PROJECT],
+                          thresholds["THRESHOLD_INDIVIDUAL_A"], max_failed=MAX_N_ASSIGNMENTS_FAILED),
+            ThresholdRule("all_a", a_points.sum(axis=1), MAX_POINTS_ALL_A, thresholds["THRESHOLD_ALL_A"]),
+            ThresholdRule("exam", e_points, MAX_POINTS_EXAM, thresholds["THRESHOLD_EXAM"]),
+        ]
+        return e_points + a_points.sum(axis=1) + bonus_points, MAX_POINTS, rules
+    
     def _create_grade_row(self, row: pd.Series) -> pd.Series:
         # assignments processing (if students already failed the course via some assignment rule, there is no need to
         # even look at the exam, since it will not make a difference anymore, i.e., assignment fails are a "hard" fail
@@ -79,15 +130,18 @@ class Python2ExerciseGrader(Grader):
         return util.create_grade(e_points + a_points, MAX_POINTS)
 
 
-if __name__ == "__main__":
-    args = util.get_grading_args_parser().parse_args()
+def main(args: argparse.Namespace):
     util.args_sanity_check(args.moodle_file, args.kusss_participants_files, "python2")
     assert args.grading_file is None, "not supported since all KUSSS participants files are treated individually"
-    grader = Python2ExerciseGrader(args.moodle_file)
+    grader = Python2ExerciseGrader.cached(args.moodle_file, point_scale=args.point_scale, backend=args.backend)
     for kusss_participants_file in args.kusss_participants_files:
         try:
-            gdf, gf = grader.create_grading_file(kusss_participants_file)
+            gdf, gf = grader.create_grading_file(kusss_participants_file, **arguments.grading_kwargs(args))
             gdf.to_csv(gf.replace(".csv", "_FULL.csv"), index=False)
         except ValueError as e:
             print(f"### ignore file '{kusss_participants_file}' because of '{e}'")
         print()
+
+
+if __name__ == "__main__":
+    main(arguments.get_grading_args_parser().parse_args())
@@ -1,7 +1,9 @@
+import argparse
+
 import numpy as np
 import pandas as pd
 
-from graders import util
+from graders import arguments, schema, util
 from graders.grader import Grader
 
 MAX_POINTS = 100
@@ -9,6 +11,14 @@ MAX_POINTS = 100
 
 class Python2LectureGrader(Grader):
     
+    SUPPORTS_FIXED_POINT = True
+    
+    SCHEMA = [
+        schema.ColumnSpec("Quiz: Exam (Real)", MAX_POINTS),
+        schema.ColumnSpec("Quiz: Retry Exam (Real)", MAX_POINTS, required=False),
+        schema.ColumnSpec("Quiz: Retry Exam 2 (Real)", MAX_POINTS, required=False),
+    ]
+    
     def _create_grade_row(self, row: pd.Series) -> pd.Series:
         e1 = row["Quiz: Exam (Real)"]
         e2 = row["Quiz: Retry Exam (Real)"]
@@ -21,14 +31,17 @@ class Python2LectureGrader(Grader):
         else:
             assert not np.isnan(e1)
             points = e1
-        return util.create_grade(points, MAX_POINTS)
+        return util.create_grade(points, self._scale_points(MAX_POINTS))
 
 
-if __name__ == "__main__":
-    args = util.get_grading_args_parser().parse_args()
+def main(args: argparse.Namespace):
     util.args_sanity_check(args.moodle_file, args.kusss_participants_files, "python2")
-    grader = Python2LectureGrader(args.moodle_file)
+    grader = Python2LectureGrader.cached(args.moodle_file, point_scale=args.point_scale, backend=args.backend)
     gdf, gf = grader.create_grading_file(args.kusss_participants_files, grading_file=args.grading_file,
                                          row_filter=lambda row: (~row[grader.quiz_cols].isna()).any(),
-                                         warn_if_not_found_in_kusss_participants=True)
+                                         warn_if_not_found_in_kusss_participants=True, **arguments.grading_kwargs(args))
     gdf.to_csv(gf.replace(".csv", "_FULL.csv"), index=False)
+
+
+if __name__ == "__main__":
+    main(arguments.get_grading_args_parser().parse_args())
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+# the trace is stored as np.int64, so the sign bit is not used
+MAX_RULES = 63
+
+
+def rule_trace(failed: dict[str, pd.Series]) -> pd.Series:
+    """
+    Combines the failed-masks of all rules into a single integer bitmask per student,
+    where the rule at position i (its ID) of ``failed`` corresponds to the bit ``1 << i``,
+    e.g., a trace of 0b101 = 5 means that the rules 0 and 2 were failed. The rule IDs of
+    a grader must therefore always be in the same order (see ``Grader._evaluate_rules``).
+    
+    :param failed: An (ordered) dictionary mapping each rule reason to a boolean pd.Series
+        (True = rule failed). All pd.Series must have the same index.
+    :return: A pd.Series (np.int64) containing the bitmask of the failed rules.
+    """
+    if len(failed) > MAX_RULES:
+        raise ValueError(f"at most {MAX_RULES} rules are supported, but there are {len(failed)}")
+    masks = list(failed.values())
+    if len(masks) == 0:
+        return pd.Series(dtype=np.int64)
+    trace = np.zeros(len(masks[0]), dtype=np.int64)
+    for i, mask in enumerate(masks):
+        trace |= mask.to_numpy(dtype=np.int64) << i
+    return pd.Series(trace, index=masks[0].index)
+
+
+def first_failed(trace: pd.Series, reasons: list[str]) -> pd.Categorical:
+    """
+    Returns the reason of the first failed rule (lowest set bit) of each ``trace`` as
+    categorical, or NaN if no rule was failed.
+    
+    :param trace: The bitmasks (see ``rule_trace``).
+    :param reasons: The reasons of all rules, ordered by their IDs.
+    :return: A pd.Categorical with the categories ``reasons``.
+    """
+    trace = np.asarray(trace, dtype=np.int64)
+    codes = np.full(len(trace), -1, dtype=np.int64)
+    # from the last to the first rule, so that the lowest set bit is written last
+    for i in reversed(range(len(reasons))):
+        codes[(trace >> i) & 1 == 1] = i
+    return pd.Categorical.from_codes(codes, categories=reasons)
+
+
+def rule_mask(reasons: list[str], *selected: str) -> int:
+    """
+    Returns the bitmask of the ``selected`` rules, which can be used for queries over
+    traces with bit operations, e.g., with ``m = rule_mask(reasons, "exam threshold not
+    reached")``, ``trace == m`` selects the students who failed only this rule, and
+    ``trace & m != 0`` those who failed (at least) this rule.
+    
+    :param reasons: The reasons of all rules, ordered by their IDs.
+    :param selected: The reasons of the rules to select.
+    :return: The bitmask (int) of the selected rules.
+    """
+    unknown = [s for s in selected if s not in reasons]
+    if len(unknown) > 0:
+        raise ValueError(f"unknown rules: {unknown} (available: {reasons})")
+    return sum(1 << reasons.index(s) for s in set(selected))
@@ -1,10 +1,18 @@
-import argparse
+import hashlib
+import math
 import re
 import warnings
 from decimal import Decimal, ROUND_UP
+from fractions import Fraction
 
+import numpy as np
 import pandas as pd
 
+from graders import loader
+
+
+DEFAULT_GRADING = {1: 0.875, 2: 0.75, 3: 0.625, 4: 0.50}
+
 
 def create_grade(points, max_points, grading: dict = None, round_ndec: int = 2) -> pd.Series:
     """
@@ -18,7 +26,7 @@ def create_grade(points, max_points, grading: dict = None, round_ndec: int = 2)
     percentage, or if nothing matches, the grade 5 ("Nicht genügend"/"Not sufficient")
     is returned. The percentage is rounded to ``round_ndec`` decimal places (2 by default)
     before checking against the grading thresholds. Example:
-    
+        
         points = 17
         max_points = 24
         grading = {1: 0.875, 2: 0.75, 3: 0.625, 4: 0.50}
@@ -55,9 +63,13 @@ def create_grade(points, max_points, grading: dict = None, round_ndec: int = 2)
     #  this sequence is then simply checked sequentially (possibly with a parameterized
     #  default value if none of "grading" match, or, raising some exception)
     if grading is None:
-        grading = {1: 0.875, 2: 0.75, 3: 0.625, 4: 0.50}
-    total = Decimal(points) / max_points
-    total = total.quantize(Decimal(".01"), rounding=ROUND_UP)
+        grading = DEFAULT_GRADING
+    if float(points).is_integer() and float(max_points).is_integer():
+        # exact integer arithmetic (e.g., for fixed-point points, see "to_fixed_point")
+        total = Fraction(int(_div_round_up(int(points) * 100, int(max_points))), 100)
+    else:
+        total = Decimal(points) / max_points
+        total = total.quantize(Decimal(".01"), rounding=ROUND_UP)
     if total >= grading[1]:
         return pd.Series([1, ""])
     if total >= grading[2]:
@@ -69,6 +81,211 @@ def create_grade(points, max_points, grading: dict = None, round_ndec: int = 2)
     return pd.Series([5, "total threshold not reached"])
 
 
+def percentage_units(points, max_points, round_ndec: int = 2) -> np.ndarray:
+    """
+    Vectorized version of the percentage calculation of ``create_grade``, i.e., the
+    percentage ``points / max_points`` rounded up (away from zero) to ``round_ndec``
+    decimal places. To avoid any floating point imprecision, the rounded percentages
+    are returned as integers in units of ``10 ** -round_ndec``, e.g., 0.71 is returned
+    as 71 for the default of 2 decimal places. Values that are (almost) exactly at a
+    rounding boundary are calculated with the exact ``Decimal`` arithmetic of
+    ``create_grade``, so the result is always identical to ``create_grade``.
+    
+    :param points: An array-like object containing the absolute points.
+    :param max_points: The absolute maximum points that can be achieved.
+    :param round_ndec: The number of decimal places for rounding the percentage. Default: 2
+    :return: An np.ndarray (np.int64) containing the rounded percentage units.
+    """
+    points = np.asarray(points, dtype=float)
+    if np.isnan(points).any():
+        raise ValueError("points must not contain NaN values")
+    scale = 10 ** round_ndec
+    scaled = points / max_points * scale
+    units = np.where(scaled < 0, np.floor(scaled), np.ceil(scaled))
+    # float arithmetic can only be off if the exact value is (almost) an integer
+    near = np.abs(scaled - np.round(scaled)) < 1e-6
+    if float(max_points).is_integer():
+        # exact integer arithmetic for integral points (e.g., fixed-point points, see "to_fixed_point")
+        integral = near & (points == np.round(points)) & (np.abs(points) < 2 ** 53 / scale)
+        units[integral] = _div_round_up(points[integral].astype(np.int64) * scale, int(max_points))
+        near &= ~integral
+    # otherwise, use Decimal for those
+    quantum = Decimal(1).scaleb(-round_ndec)
+    for i in np.flatnonzero(near):
+        total = (Decimal(points[i]) / max_points).quantize(quantum, rounding=ROUND_UP)
+        units[i] = int(total.scaleb(round_ndec))
+    return units.astype(np.int64)
+
+
+def _div_round_up(numerator, denominator: int):
+    # integer division that rounds away from zero (like ROUND_UP), where denominator > 0
+    quotient, remainder = np.divmod(np.abs(numerator), denominator)
+    return np.sign(numerator) * (quotient + (remainder != 0))
+
+
+def to_fixed_point(points, scale: int):
+    """
+    Converts ``points`` to fixed-point points, i.e., to integers in units of ``1 / scale``,
+    e.g., 19.4 is converted to 19400 for a ``scale`` of 1000 (thousandths). Sums of and
+    comparisons between fixed-point points are exact (no floating point imprecision). The
+    integers are stored as np.float64 (exact up to 2 ** 53), so missing points remain NaN.
+    Raises a ValueError if any of the ``points`` cannot be represented exactly, e.g., 0.1234
+    for a ``scale`` of 1000.
+    
+    :param points: The points (scalar, array-like, pd.Series or pd.DataFrame).
+    :param scale: The number of units per point, e.g., 1000.
+    :return: The fixed-point points (the same type as ``points``).
+    """
+    scaled = points * scale
+    fixed = np.round(scaled)
+    error = np.abs(np.asarray(scaled, dtype=float) - np.asarray(fixed, dtype=float))
+    if np.nanmax(error, initial=0) > 1e-6:
+        raise ValueError(f"points cannot be represented as fixed-point points with scale {scale} (too many "
+                         f"decimal places)")
+    if np.nanmax(np.abs(np.asarray(fixed, dtype=float)), initial=0) >= 2 ** 53:
+        raise ValueError(f"points are too large for fixed-point points with scale {scale}")
+    return fixed
+
+
+def from_fixed_point(points, scale: int):
+    """
+    Converts fixed-point ``points`` (see ``to_fixed_point``) back to regular points.
+    
+    :param points: The fixed-point points (scalar, array-like, pd.Series or pd.DataFrame).
+    :param scale: The number of units per point, e.g., 1000.
+    :return: The points (the same type as ``points``).
+    """
+    return points / scale
+
+
+def fixed_point_threshold(max_points: float, threshold: float, scale: int) -> int:
+    """
+    Returns the smallest fixed-point points (see ``to_fixed_point``) that reach the points
+    threshold ``threshold * max_points``, i.e., ``fixed >= fixed_point_threshold(...)`` if
+    and only if the exact points are ``>= threshold * max_points``. Both ``max_points``
+    and ``threshold`` are interpreted as the decimal numbers they are written as, e.g.,
+    0.4 is exactly 2/5 (and not the closest binary floating point number).
+    
+    :param max_points: The maximum points, e.g., 10.
+    :param threshold: The lower percentage threshold, e.g., 0.4.
+    :param scale: The number of units per point, e.g., 1000.
+    :return: The fixed-point threshold (int).
+    """
+    return math.ceil(Fraction(str(max_points)) * Fraction(str(threshold)) * scale)
+
+
+def min_units(threshold: float, round_ndec: int = 2) -> int:
+    """
+    Returns the smallest percentage unit (see ``percentage_units``) that is greater or
+    equal than the percentage ``threshold``, using the exact comparison of ``create_grade``
+    (i.e., ``units >= min_units(threshold)`` if and only if the rounded percentage is
+    ``>= threshold``).
+    
+    :param threshold: The lower percentage threshold, e.g., 0.875.
+    :param round_ndec: The number of decimal places for rounding the percentage. Default: 2
+    :return: The smallest percentage unit (int) that reaches ``threshold``.
+    """
+    return math.ceil(Fraction(threshold) * 10 ** round_ndec)
+
+
+def create_grades(points, max_points, grading: dict = None, round_ndec: int = 2) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized version of ``create_grade``, i.e., creates the grades of all ``points``
+    at once, with exactly the same results as calling ``create_grade`` for each entry.
+    
+    :param points: An array-like object containing the absolute points (must not contain
+        NaN values).
+    :param max_points: The absolute maximum points that can be achieved.
+    :param grading: The grading scheme (see ``create_grade``). Default: None, i.e.,
+        ``DEFAULT_GRADING``
+    :param round_ndec: The number of decimal places for rounding the calculated percentage.
+        Default: 2
+    :return: A tuple containing (as first entry) the grades (np.ndarray of type np.int64), and
+        as second entry, the reasons for these grades (np.ndarray of type object/str).
+    """
+    if grading is None:
+        grading = DEFAULT_GRADING
+    units = percentage_units(points, max_points, round_ndec)
+    thresholds = np.array([min_units(grading[g], round_ndec) for g in range(1, 5)])
+    # the first (best) matching grade wins, or 5 if none matches
+    match = units[:, None] >= thresholds[None, :]
+    grades = np.where(match.any(axis=1), match.argmax(axis=1) + 1, 5).astype(np.int64)
+    reasons = np.where(grades == 5, "total threshold not reached", "").astype(object)
+    return grades, reasons
+
+
+def round_up_to_step(points, step: float = None) -> np.ndarray:
+    """
+    Rounds the (non-negative) ``points`` up to the next multiple of ``step`` (values that
+    are within float imprecision of a multiple are not rounded up any further).
+    
+    :param points: An array-like object containing the points.
+    :param step: The point resolution, e.g., 0.01 or 0.5. Default: None, i.e., no rounding
+    :return: An np.ndarray containing the rounded points.
+    """
+    points = np.asarray(points, dtype=float)
+    if step is None:
+        return points
+    return np.ceil(points / step - 1e-9) * step
+
+
+def points_to_next_grade(points, max_points, grading: dict = None, round_ndec: int = 2,
+                         step: float = 0.01) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized inverse of ``create_grade``: Calculates the minimum additional points that
+    are required to reach the next better grade. Since the percentage is rounded up (see
+    ``create_grade``), the boundary of the next grade is exclusive, i.e., the points must
+    be strictly greater than ``(min_units(grading[g - 1]) - 1) / 10 ** round_ndec * max_points``
+    to improve from grade ``g`` to grade ``g - 1``. The missing points are therefore given
+    as the smallest multiple of ``step`` that is enough (a smaller ``step`` yields values
+    closer to the exact boundary). The grading scheme must be monotonic, i.e., better
+    grades must have higher thresholds.
+    
+    :param points: An array-like object containing the absolute points (must not contain
+        NaN values).
+    :param max_points: The absolute maximum points that can be achieved.
+    :param grading: The grading scheme (see ``create_grade``). Default: None, i.e.,
+        ``DEFAULT_GRADING``
+    :param round_ndec: The number of decimal places for rounding the calculated percentage.
+        Default: 2
+    :param step: The resolution of the points, e.g., 0.5 if only half points are awarded.
+        Default: 0.01
+    :return: A tuple containing (as first entry) the grades (see ``create_grades``), and as
+        second entry, the missing points for the next better grade (np.ndarray of type float),
+        which is NaN for the grade 1.
+    """
+    if grading is None:
+        grading = DEFAULT_GRADING
+    points = np.asarray(points, dtype=float)
+    grades, _ = create_grades(points, max_points, grading, round_ndec)
+    # exclusive lower bound (in points) of each grade 1 to 4; index 0 = NaN (there is no grade better than 1)
+    bounds = np.array([np.nan] + [(min_units(grading[g], round_ndec) - 1) / 10 ** round_ndec * max_points
+                                  for g in range(1, 5)])
+    missing = bounds[grades - 1] - points
+    # the bound itself is not enough, so add a full step if the difference is already a multiple of "step"
+    missing = np.floor(missing / step + 1e-9) * step + step
+    # due to the exact Decimal conversion of float points in "create_grade", one step less might already
+    # be enough (e.g., 17.76 is slightly greater than 17.76 as float), so check this exactly
+    lower = np.round(points + np.nan_to_num(missing) - step, 9)
+    lower_grades, _ = create_grades(lower, max_points, grading, round_ndec)
+    missing = np.where((lower_grades < grades) & (missing > step), missing - step, missing)
+    return grades, missing
+
+
+def latest_points(df: pd.DataFrame, cols: list) -> pd.Series:
+    """
+    Returns the points of the most recent attempt of each row, i.e., the last non-NaN
+    value of the columns ``cols`` (in chronologically ascending order), or NaN if all
+    columns are NaN. This is the vectorized version of the "most recent exam takes
+    precedence" logic of the graders.
+    
+    :param df: The pd.DataFrame that contains the columns ``cols``.
+    :param cols: The columns in chronologically ascending order.
+    :return: A pd.Series with the latest points of each row.
+    """
+    return df[cols].ffill(axis=1).iloc[:, -1]
+
+
 def check_matr_id_format(s: pd.Series):
     """
     Checks if the specified pd.Series object contains matriculation IDs in the
@@ -82,15 +299,21 @@ def check_matr_id_format(s: pd.Series):
         raise ValueError(f"series does not contain valid ('k<8-digit-matr-id>') matriculation IDs: {s}")
 
 
-def get_grading_args_parser():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("-mf", "--moodle_file", type=str, required=True,
-                        help="Moodle CSV export file.")
-    parser.add_argument("-kpf", "--kusss_participants_files", type=str, nargs="+", required=True,
-                        help="KUSSS participants CSV export files.")
-    parser.add_argument("-gf", "--grading_file", type=str, default=None,
-                        help="The output CSV file where the grades will be stored.")
-    return parser
+def file_hash(file: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Returns the SHA-256 hex digest of the content of ``file``, which can be used to
+    identify the exact input files of a grading run. For ZIP archive members (see
+    ``loader.split_member``), the whole archive is hashed.
+    
+    :param file: The path of the file to hash.
+    :param chunk_size: The number of bytes to read at once. Default: 1 MiB
+    :return: The hex digest string.
+    """
+    h = hashlib.sha256()
+    with open(loader.split_member(file)[0], "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
 
 
 def args_sanity_check(moodle_file: str, kusss_participants_files: list, common_expectation: str = None,
@@ -101,9 +324,9 @@ def args_sanity_check(moodle_file: str, kusss_participants_files: list, common_e
     in ``xyz``, e.g., if ``moodle_file_expectation`` is contained in ``moodle_file``. This function
     is useful to quickly check if the script was potentially called with incorrect arguments.
     
-    :param moodle_file: The name of the Moodle file (see function ``get_grading_args_parser``).
-    :param kusss_participants_files: The names of the KUSSS participants files (see function
-        ``get_grading_args_parser``).
+    :param moodle_file: The name of the Moodle file (see ``arguments.get_grading_args_parser``).
+    :param kusss_participants_files: The names of the KUSSS participants files (see
+        ``arguments.get_grading_args_parser``).
     :param common_expectation: What to expect in ``moodle_file`` as well as in each name of the
         files in ``kusss_participants_files``. If None, no check is performed. Default: None
     :param moodle_file_expectation: What to expect in ``moodle_file``. If None, no check is
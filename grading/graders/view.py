@@ -0,0 +1,68 @@
+import os
+from datetime import datetime
+from typing import Callable, Collection, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from graders import loader
+
+
+class View(NamedTuple):
+    """
+    A subset of the graded entries that is exported to its own KUSSS grading file (see
+    ``views`` of ``Grader.create_grading_file``), e.g., only the participants of the retry
+    exam. An entry is part of the view if it satisfies all specified (not None) criteria.
+    The changed entries (``changed_since``) are those whose grade or reason differs from
+    the latest archived grade before this timestamp (see ``archive.read_latest_grades``),
+    including entries that have not been archived at all.
+    """
+    row_filter: Callable[[pd.Series], bool] = None  # True = keep the entry (row of the graded pd.DataFrame)
+    study_ids: Collection[int] = None  # the study IDs (SKZ) to keep
+    changed_since: datetime = None  # only keep the entries that changed since this timestamp
+
+
+def get_view_file(grading_file: str, name: str) -> str:
+    """
+    Returns the path of the grading file of the view ``name``, which is the same as
+    ``grading_file`` with "_<name>" appended to the file name (before the extensions),
+    e.g., "grading_retry.csv.gz" for "grading.csv.gz" and the view "retry".
+    
+    :param grading_file: The path of the (main) grading file.
+    :param name: The name of the view.
+    :return: The path of the grading file of the view.
+    """
+    path, compression_ext = loader.strip_compression(grading_file)
+    root, ext = os.path.splitext(path)
+    return f"{root}_{name}{ext}{compression_ext}"
+
+
+def select(df: pd.DataFrame, view: View, matr_id_col: str, study_id_col: str, grade_col: str,
+           grade_reason_col: str, previous_grades: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Returns the entries of the graded pd.DataFrame ``df`` that are part of ``view``.
+    
+    :param df: The graded pd.DataFrame (see ``Grader.create_grading_file``).
+    :param view: The view.
+    :param matr_id_col: The column name that contains the matriculation ID.
+    :param study_id_col: The column name that contains the study ID.
+    :param grade_col: The column name that contains the grade.
+    :param grade_reason_col: The column name that contains the reason for the grade.
+    :param previous_grades: The latest archived grades as of ``view.changed_since`` (see
+        ``archive.read_latest_grades``). Ignored if ``view.changed_since`` is None. Default:
+        None, i.e., there are no previous grades (every entry changed)
+    :return: The selected entries of ``df`` (in the same order).
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if view.row_filter is not None:
+        mask &= df.apply(view.row_filter, axis=1).astype(bool).to_numpy()
+    if view.study_ids is not None:
+        mask &= df[study_id_col].isin(view.study_ids).to_numpy()
+    if view.changed_since is not None and previous_grades is not None:
+        previous = previous_grades[["id", "skz", "grade", "reason"]].rename(
+            columns={"id": matr_id_col, "skz": study_id_col})
+        # "left" keeps the order (and length) of df; entries without previous grade have NaN, which never compares equal
+        merged = df[[matr_id_col, study_id_col]].merge(previous, how="left", on=[matr_id_col, study_id_col])
+        mask &= ((merged["grade"].to_numpy() != df[grade_col].to_numpy()) |
+                 (merged["reason"].to_numpy() != df[grade_reason_col].astype(object).to_numpy()))
+    return df[mask]
@@ -1,8 +1,12 @@
+import argparse
+from typing import Sequence
+
 import numpy as np
 import pandas as pd
 
-from graders import util
+from graders import arguments, schema, util, view
 from graders.grader import Grader
+from graders.simulation import ThresholdRule
 
 MAX_POINTS_Q1 = 100
 MAX_POINTS_Q2 = 100
@@ -13,13 +17,36 @@ THRESHOLD_INDIVIDUAL_Q = 0.4
 
 class HandsOn1LectureGrader(Grader):
     
+    SCHEMA = [
+        schema.ColumnSpec("Quiz: Exam 1 (Real)", MAX_POINTS_Q1),
+        schema.ColumnSpec("Quiz: Exam 2 (Real)", MAX_POINTS_Q2),
+        # the retry exams are not part of the earlier Moodle exports
+        schema.ColumnSpec("Quiz: Retry Exam (Real)", MAX_POINTS, required=False),
+        schema.ColumnSpec("Quiz: Retry Exam 2 (Real)", MAX_POINTS, required=False),
+    ]
+    
+    def _evaluate_rules(self, df: pd.DataFrame) -> dict[str, pd.Series]:
+        # the individual exam thresholds only apply if there is no retry exam (see _create_grade_row)
+        no_retry = df[["Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]].isna().all(axis=1)
+        passed = (df["Quiz: Exam 1 (Real)"] >= THRESHOLD_INDIVIDUAL_Q * MAX_POINTS_Q2) & \
+                 (df["Quiz: Exam 2 (Real)"] >= THRESHOLD_INDIVIDUAL_Q * MAX_POINTS_Q2)
+        return {"individual exam thresholds not reached": no_retry & ~passed}
+    
+    def _get_threshold_rules(self, df: pd.DataFrame, thresholds: dict[str, Sequence[float]]) -> tuple:
+        # the individual exam thresholds only apply if there is no retry exam, so retry exams always pass them
+        no_retry = df[["Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]].isna().all(axis=1)
+        e_points = df[["Quiz: Exam 1 (Real)", "Quiz: Exam 2 (Real)"]].where(no_retry, np.inf)
+        total = df["Quiz: Exam 1 (Real)"] + df["Quiz: Exam 2 (Real)"]
+        total = total.where(no_retry, util.latest_points(df, ["Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]))
+        rules = [ThresholdRule("individual_q", e_points, MAX_POINTS_Q2, thresholds["THRESHOLD_INDIVIDUAL_Q"])]
+        return total, MAX_POINTS, rules
+    
     def _create_grade_row(self, row: pd.Series) -> pd.Series:
         e11 = row["Quiz: Exam 1 (Real)"]
         e12 = row["Quiz: Exam 2 (Real)"]
         e2 = row["Quiz: Retry Exam (Real)"]
-        # since the second retry exam was added later, it is not part of the
-        # earlier Moodle CSV exports (which would then lead to a crash here)
-        e3 = row["Quiz: Retry Exam 2 (Real)"] if "Quiz: Retry Exam 2 (Real)" in row else np.nan
+        # the retry exams are added as columns without submissions if they are not part of the export (see SCHEMA)
+        e3 = row["Quiz: Retry Exam 2 (Real)"]
         
         # most recent exam takes precedence
         if not np.isnan(e3):
@@ -35,12 +62,15 @@ class HandsOn1LectureGrader(Grader):
         return util.create_grade(total, MAX_POINTS)
 
 
-if __name__ == "__main__":
-    args = util.get_grading_args_parser().parse_args()
+def main(args: argparse.Namespace):
     util.args_sanity_check(args.moodle_file, args.kusss_participants_files, "handson1")
-    grader = HandsOn1LectureGrader(args.moodle_file)
-    # gdf, gf = grader.create_grading_file(args.kusss_participants_files, grading_file=args.grading_file)
-    # only create grades for students who participated in the retry exam
+    grader = HandsOn1LectureGrader.cached(args.moodle_file, point_scale=args.point_scale, backend=args.backend)
+    # only create grades for students who participated in the retry exam, and additionally, all grades as view
     gdf, gf = grader.create_grading_file(args.kusss_participants_files, grading_file=args.grading_file,
-                                         row_filter=lambda row: not np.isnan(row["Quiz: Retry Exam 2 (Real)"]))
+                                         row_filter=lambda row: not np.isnan(row["Quiz: Retry Exam 2 (Real)"]),
+                                         views=dict(full=view.View()), **arguments.grading_kwargs(args))
     gdf.to_csv(gf.replace(".csv", "_FULL.csv"), index=False)
+
+
+if __name__ == "__main__":
+    main(arguments.get_grading_args_parser().parse_args())
@@ -1,8 +1,12 @@
+import argparse
+from typing import Sequence
+
 import numpy as np
 import pandas as pd
 
-from graders import util
+from graders import arguments, schema, util, view
 from graders.grader import Grader
+from graders.simulation import ThresholdRule
 
 MAX_POINTS_A1 = 15
 MAX_POINTS_A2 = 30  # 5 bonus points not counted
@@ -14,6 +18,9 @@ MAX_POINTS_ALL_Q = MAX_POINTS_Q1 + MAX_POINTS_Q2
 MAX_POINTS_QRETRY = MAX_POINTS_ALL_Q
 MAX_POINTS = MAX_POINTS_ALL_A + MAX_POINTS_ALL_Q
 
+# Moodle exports the exercise points scaled by this factor (see _process_entries)
+EXERCISE_SCALE = 10
+
 THRESHOLD_INDIVIDUAL_A = 0.25
 THRESHOLD_ALL_A = 0.5
 THRESHOLD_INDIVIDUAL_Q = 0.4
@@ -21,16 +28,31 @@ THRESHOLD_INDIVIDUAL_QRETRY = 0.5
 THRESHOLD_ALL_Q = 0.5
 # number of decimal places to round to (to remedy floating point arithmetic
 # imprecision, e.g., if the sum of all assignments happened to be something
-# like x=39.99999999, then x < 40 would return True, which we don't want)
+# like x=39.99999999, then x < 40 would return True, which we don't want; not
+# required with fixed-point points, see "point_scale" of "Grader.__init__")
 DECIMALS = 5
 
 
 class Python1Grader(Grader):
     
+    SUPPORTS_FIXED_POINT = True
+    
+    SCHEMA = [
+        # the assignment groups have different maximum points, so the maximum of all groups is used for each exercise
+        schema.ColumnSpec(r"Assignment: Exercise \d+ .*", max(MAX_POINTS_A1, MAX_POINTS_A2, MAX_POINTS_A3),
+                          scale=EXERCISE_SCALE, regex=True),
+        schema.ColumnSpec(r"Quiz: Exam 1 .*", MAX_POINTS_Q1, regex=True),
+        schema.ColumnSpec(r"Quiz: Exam 2 .*", MAX_POINTS_Q2, regex=True),
+        schema.ColumnSpec(r"Quiz: Retry Exam .*", MAX_POINTS_QRETRY, regex=True),
+    ]
+    
     def _process_entries(self, df: pd.DataFrame) -> pd.DataFrame:
         df = super()._process_entries(df)
-        # Moodle exercise points are scaled by a factor of 10
-        df[self.assignment_cols] /= 10
+        # Moodle exercise points are scaled by a factor of EXERCISE_SCALE
+        if self.point_scale is not None and (df[self.assignment_cols] % EXERCISE_SCALE != 0).any(axis=None):
+            raise ValueError(f"the exercise points cannot be represented as fixed-point points with scale "
+                             f"{self.point_scale} after dividing them by {EXERCISE_SCALE}")
+        df[self.assignment_cols] /= EXERCISE_SCALE
         # points are now properly and consistently scaled
         df = self._assignment_setup(df)
         df = self._quiz_setup(df)
@@ -49,7 +71,7 @@ class Python1Grader(Grader):
         
         # passed-flag for each assignment
         for cols, name, max_points, threshold in assignments:
-            df[f"{name}_passed"] = df[cols].sum(axis=1).round(DECIMALS) >= threshold * max_points
+            df[f"{name}_passed"] = df[cols].sum(axis=1).round(DECIMALS) >= self._threshold_points(max_points, threshold)
         
         # total points of all assignments (all exercises)
         df["a_total"] = df[self.assignment_cols].sum(axis=1).round(DECIMALS)
@@ -67,9 +89,9 @@ class Python1Grader(Grader):
         def create_quiz_passed_row(row):
             # exam check: q1 >= 40% and q2 >= 40% OR qretry >= 50% if qretry is not NaN
             if np.isnan(row[quizretry_col]):
-                return (row[quiz1_col] >= THRESHOLD_INDIVIDUAL_Q * MAX_POINTS_Q1) and \
-                       (row[quiz2_col] >= THRESHOLD_INDIVIDUAL_Q * MAX_POINTS_Q2)
-            return row[quizretry_col] >= THRESHOLD_INDIVIDUAL_QRETRY * MAX_POINTS_QRETRY
+                return (row[quiz1_col] >= self._threshold_points(MAX_POINTS_Q1, THRESHOLD_INDIVIDUAL_Q)) and \
+                       (row[quiz2_col] >= self._threshold_points(MAX_POINTS_Q2, THRESHOLD_INDIVIDUAL_Q))
+            return row[quizretry_col] >= self._threshold_points(MAX_POINTS_QRETRY, THRESHOLD_INDIVIDUAL_QRETRY)
         
         # passed-flag for the exams (includes proper handling of normal exams and retry exam)
         df["q_passed"] = df[self.quiz_cols].apply(create_quiz_passed_row, axis=1)
@@ -84,25 +106,70 @@ class Python1Grader(Grader):
         df["q_total"] = df[self.quiz_cols].apply(create_quiz_total_row, axis=1)
         return df
     
+    def _get_item_thresholds(self) -> dict[str, float]:
+        # the individual assignment thresholds apply to the assignment groups (see _assignment_setup), which are not
+        # stored as columns
+        return {
+            **{c: MAX_POINTS_Q1 * THRESHOLD_INDIVIDUAL_Q for c in self.quiz_cols if "Exam 1 " in c},
+            **{c: MAX_POINTS_Q2 * THRESHOLD_INDIVIDUAL_Q for c in self.quiz_cols if "Exam 2 " in c},
+            **{c: MAX_POINTS_QRETRY * THRESHOLD_INDIVIDUAL_QRETRY for c in self.quiz_cols if "Retry Exam " in c},
+        }
+    
+    def _evaluate_rules(self, df: pd.DataFrame) -> dict[str, pd.Series]:
+        return {
+            "individual assignment thresholds not reached": ~(df["a1_passed"] & df["a2_passed"] & df["a3_passed"]),
+            "individual exam thresholds not reached": ~df["q_passed"].astype(bool),
+            "total assignment threshold not reached":
+                df["a_total"] < self._threshold_points(MAX_POINTS_ALL_A, THRESHOLD_ALL_A),
+            "total exam threshold not reached":
+                df["q_total"] < self._threshold_points(MAX_POINTS_ALL_Q, THRESHOLD_ALL_Q),
+        }
+    
+    def _get_threshold_rules(self, df: pd.DataFrame, thresholds: dict[str, Sequence[float]]) -> tuple:
+        groups = [range(1, 4 + 1), range(5, 15 + 1), range(16, 21 + 1)]
+        a_points = pd.concat([df[[c for c in self.assignment_cols if any([f"Exercise {i} " in c for i in group])]]
+                              .sum(axis=1).round(DECIMALS) for group in groups], axis=1)
+        quiz_cols = [[c for c in self.quiz_cols if name in c][0] for name in ["Exam 1 ", "Exam 2 ", "Retry Exam "]]
+        # either the individual exam thresholds or the retry exam threshold applies (see _quiz_setup), so the other
+        # one always passes
+        no_retry = df[quiz_cols[2]].isna()
+        rules = [
+            ThresholdRule("individual_a", a_points, [MAX_POINTS_A1, MAX_POINTS_A2, MAX_POINTS_A3],
+                          thresholds["THRESHOLD_INDIVIDUAL_A"]),
+            ThresholdRule("individual_q", df[quiz_cols[:2]].where(no_retry, np.inf), [MAX_POINTS_Q1, MAX_POINTS_Q2],
+                          thresholds["THRESHOLD_INDIVIDUAL_Q"]),
+            ThresholdRule("individual_qretry", df[quiz_cols[2]].where(~no_retry, np.inf), MAX_POINTS_QRETRY,
+                          thresholds["THRESHOLD_INDIVIDUAL_QRETRY"]),
+            ThresholdRule("all_a", df["a_total"], MAX_POINTS_ALL_A, thresholds["THRESHOLD_ALL_A"]),
+            ThresholdRule("all_q", df["q_total"], MAX_POINTS_ALL_Q, thresholds["THRESHOLD_ALL_Q"]),
+        ]
+        return df["a_total"] + df["q_total"], MAX_POINTS, rules
+    
+    def _get_point_cols(self, df: pd.DataFrame) -> list[str]:
+        return super()._get_point_cols(df) + ["a_total", "q_total"]
+    
     def _create_grade_row(self, row) -> pd.Series:
         if not row["a1_passed"] or not row["a2_passed"] or not row["a3_passed"]:
             return pd.Series([5, "individual assignment thresholds not reached"])
         if not row["q_passed"]:
             return pd.Series([5, "individual exam thresholds not reached"])
-        if row["a_total"] < THRESHOLD_ALL_A * MAX_POINTS_ALL_A:
+        if row["a_total"] < self._threshold_points(MAX_POINTS_ALL_A, THRESHOLD_ALL_A):
             return pd.Series([5, "total assignment threshold not reached"])
-        if row["q_total"] < THRESHOLD_ALL_Q * MAX_POINTS_ALL_Q:
+        if row["q_total"] < self._threshold_points(MAX_POINTS_ALL_Q, THRESHOLD_ALL_Q):
             return pd.Series([5, "total exam threshold not reached"])
         total = row["a_total"] + row["q_total"]
-        return util.create_grade(total, MAX_POINTS)
+        return util.create_grade(total, self._scale_points(MAX_POINTS))
 
 
-if __name__ == "__main__":
-    args = util.get_grading_args_parser().parse_args()
-    grader = Python1Grader(args.moodle_file)
+def main(args: argparse.Namespace):
+    grader = Python1Grader.cached(args.moodle_file, point_scale=args.point_scale, backend=args.backend)
     util.args_sanity_check(args.moodle_file, args.kusss_participants_files, "python1")
-    gdf, gf = grader.create_grading_file(args.kusss_participants_files, grading_file=args.grading_file)
-    # only create grades for students who participated in the retry exam
-    # gdf, gf = grader.create_grading_file(args.kusss_participants_files, grading_file=args.grading_file,
-    #                                      row_filter=lambda row: not np.isnan(row["Quiz: Retry Exam (Real)"]))
+    # additionally, only the grades of students who participated in the retry exam
+    retry_view = view.View(row_filter=lambda row: not np.isnan(row["Quiz: Retry Exam (Real)"]))
+    gdf, gf = grader.create_grading_file(args.kusss_participants_files, grading_file=args.grading_file,
+                                         views=dict(retry=retry_view), **arguments.grading_kwargs(args))
     gdf.to_csv(gf.replace(".csv", "_FULL.csv"), index=False)
+
+
+if __name__ == "__main__":
+    main(arguments.get_grading_args_parser().parse_args())
@@ -1,9 +1,11 @@
-from functools import reduce
+import argparse
+import warnings
 from typing import Union, Iterable
 
+import numpy as np
 import pandas as pd
 
-from graders import util
+from graders import arguments, loader, util
 from graders.grader import Grader
 
 MAX_POINTS = 24
@@ -23,7 +25,8 @@ class SW1ExerciseGrader(Grader):
         :param exam_files: Either a single string that indicates the path of the exam CSV
             input file, or a list of strings that indicate multiple paths of exam CSV input
             files. If it is a list, then the order is in chronologically ascending order,
-            i.e., the most recent exam result is the file specified last.
+            i.e., the most recent exam result is the file specified last. The files can also
+            be compressed or archived (see ``loader.read_csv``).
         :param exam_sep: The separator character of the exam CSV input file(s). Default: "\t"
         :param exam_matr_id_col: The column name of the exam CSV input file(s) that
             contains the matriculation ID. Default: "Matrikelnummer"
@@ -48,17 +51,26 @@ class SW1ExerciseGrader(Grader):
             bonus_assignment_words = ["bonus"]
         bonus_assignment_words = [w.lower() for w in bonus_assignment_words]
         
-        # read separate exam CSVs (one for each exam) and merge with self.df
-        def read_exam_file(index: int, file: str):
-            df = pd.read_csv(file, sep=exam_sep, usecols=[exam_matr_id_col, exam_points_col],
-                             decimal=exam_decimal, encoding=exam_encoding)
-            return df.rename(columns={exam_points_col: f"Exam {index}"})
+        # read separate exam CSVs (one for each exam) concurrently and merge with self.df
+        def read_exam_file(file: str):
+            return loader.read_csv(file, sep=exam_sep, usecols=[exam_matr_id_col, exam_points_col],
+                                   decimal=exam_decimal, encoding=exam_encoding)
         
-        # use the same order as specified in the input exam list, i.e., the last exam file
-        # represents the most recent exam
-        edfs = [read_exam_file(i, f) for i, f in enumerate(exam_files)]
-        exam_df = reduce(lambda left, right: pd.merge(left, right, on=[exam_matr_id_col], how="outer"), edfs)
+        # concatenate all exams in one step, where the attempt index is the position in the input exam list,
+        # i.e., the last exam file (the highest attempt) represents the most recent exam
+        attempts = range(len(exam_files))
+        exam_df = pd.concat(loader.read_files(exam_files, read_exam_file), keys=attempts, names=["attempt", None])
+        exam_df = exam_df.reset_index(level="attempt")
         util.check_matr_id_format(exam_df[exam_matr_id_col])
+        duplicated = exam_df.duplicated(["attempt", exam_matr_id_col], keep="last")
+        if duplicated.any():
+            warnings.warn(f"the following {duplicated.sum()} duplicate exam entries were dropped (the entry specified "
+                          f"last within each exam file is kept):\n{exam_df[duplicated]}")
+            exam_df = exam_df[~duplicated]
+        # pivot once into one column per attempt (also keep the columns of attempts without any entries)
+        exam_df = exam_df.pivot(index=exam_matr_id_col, columns="attempt", values=exam_points_col)
+        exam_df = exam_df.reindex(columns=attempts).rename(columns=lambda i: f"Exam {i}")
+        exam_df = exam_df.rename_axis(columns=None).reset_index()
         
         self.df = self.df.merge(exam_df, left_on="ID number", right_on=exam_matr_id_col, how="left")
         self._print(f"size after merging with exam results {exam_df.shape}: {self.df.shape}")
@@ -84,29 +96,51 @@ class SW1ExerciseGrader(Grader):
         # replace NaN points with 0 to make things easier when calculating the grade
         self.df[self.assignment_cols] = self.df[self.assignment_cols].fillna(0)
     
+    def _process_entries(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = super()._process_entries(df)
+        # column-wise for all students: the most recent exam (if it exists) and the number of "successful"
+        # mandatory assignments, i.e., >= 8 points
+        df["exam_latest"] = util.latest_points(df, self.quiz_cols)
+        df["n_successful"] = (df[self.mandatory_assignment_cols] >= 8).sum(axis=1)
+        return df
+    
+    def _evaluate_rules(self, df: pd.DataFrame) -> dict[str, pd.Series]:
+        return {
+            "fewer than 8 successful assignments": df["n_successful"] < 8,
+            "exam missing": df["exam_latest"].isna(),
+            "exam negative": MAX_POINTS * df["exam_latest"] / MAX_EXAM_POINTS < MAX_POINTS * 0.5,
+        }
+    
     def _create_grade_row(self, row: pd.Series) -> pd.Series:
         # at least 8 mandatory assignments must be "successful", i.e., >= 8 points
-        if (row[self.mandatory_assignment_cols] >= 8).sum() < 8:
+        if row["n_successful"] < 8:
             return pd.Series([5, "fewer than 8 successful assignments"])
-        # get most recent exam (if it exists)
-        exams = row[self.quiz_cols].dropna()
-        if len(exams) == 0:
+        if np.isnan(row["exam_latest"]):
             return pd.Series([5, "exam missing"])
-        scaled_exam_points = MAX_POINTS * exams.iloc[-1] / MAX_EXAM_POINTS
+        scaled_exam_points = MAX_POINTS * row["exam_latest"] / MAX_EXAM_POINTS
         if scaled_exam_points < MAX_POINTS * 0.5:
             return pd.Series([5, "exam negative"])
         scaled_assignment_points = row[self.assignment_cols].sum() / len(self.mandatory_assignment_cols)
         return util.create_grade(scaled_assignment_points * 0.8 + scaled_exam_points * 0.2, MAX_POINTS)
 
 
-if __name__ == "__main__":
-    parser = util.get_grading_args_parser()
+def add_args(parser: argparse.ArgumentParser):
     parser.add_argument("-ef", "--exam_files", type=str, nargs="+", required=True,
                         help="CSV export files containing the exam results. If multiple files are specified, then "
                              "the order is in chronologically ascending order, i.e., the most recent exam result "
                              "is the file specified last.")
-    args = parser.parse_args()
+
+
+def main(args: argparse.Namespace):
     util.args_sanity_check(args.moodle_file, args.kusss_participants_files, "sw1")
-    grader = SW1ExerciseGrader(args.moodle_file, args.exam_files)
-    gdf, gf = grader.create_grading_file(args.kusss_participants_files, grading_file=args.grading_file)
+    grader = SW1ExerciseGrader.cached(args.moodle_file, args.exam_files, point_scale=args.point_scale,
+                                      backend=args.backend)
+    gdf, gf = grader.create_grading_file(args.kusss_participants_files, grading_file=args.grading_file,
+                                         **arguments.grading_kwargs(args))
     gdf.to_csv(gf.replace(".csv", "_FULL.csv"), index=False)
+
+
+if __name__ == "__main__":
+    parser = arguments.get_grading_args_parser()
+    add_args(parser)
+    main(parser.parse_args())
@@ -1,15 +1,22 @@
+import argparse
+
 import numpy as np
 import pandas as pd
 
-from graders import util
+from graders import arguments, schema, util
 from graders.grader import Grader
 
+MAX_POINTS_A = 100
 MAX_POINTS = 700  # 7 assignments with 100 points each
 
 
 # TODO: code duplication (ws2021)
 class HandsOn1ExerciseGrader(Grader):
     
+    SCHEMA = [
+        schema.ColumnSpec(r"Assignment: .*", MAX_POINTS_A, regex=True),
+    ]
+    
     # TODO: code duplication in python1exercisegrader (could move to common superclass, e.g., ExerciseGrader)
     def _process_entries(self, df: pd.DataFrame) -> pd.DataFrame:
         len_before = len(df)
@@ -19,6 +26,10 @@ class HandsOn1ExerciseGrader(Grader):
                         f"the assignments at all)")
         return df
     
+    def _evaluate_rules(self, df: pd.DataFrame) -> dict[str, pd.Series]:
+        n_skipped = df[self.assignment_cols].replace(0, np.nan).isna().sum(axis=1)
+        return {"more than 1 assignment skipped/graded with 0 points": n_skipped > 1}
+    
     def _create_grade_row(self, row: pd.Series) -> pd.Series:
         # only one assignment can be skipped or graded with 0 points
         # replace 0 points with NaN to make things easier with pd.Series.isna()
@@ -28,15 +39,18 @@ class HandsOn1ExerciseGrader(Grader):
         return util.create_grade(assignment_points.sum(), MAX_POINTS)
 
 
-if __name__ == "__main__":
-    args = util.get_grading_args_parser().parse_args()
+def main(args: argparse.Namespace):
     util.args_sanity_check(args.moodle_file, args.kusss_participants_files, "handson1")
     assert args.grading_file is None, "not supported since all KUSSS participants files are treated individually"
-    grader = HandsOn1ExerciseGrader(args.moodle_file)
+    grader = HandsOn1ExerciseGrader.cached(args.moodle_file, point_scale=args.point_scale, backend=args.backend)
     for kusss_participants_file in args.kusss_participants_files:
         try:
-            gdf, gf = grader.create_grading_file(kusss_participants_file)
+            gdf, gf = grader.create_grading_file(kusss_participants_file, **arguments.grading_kwargs(args))
             gdf.to_csv(gf.replace(".csv", "_FULL.csv"), index=False)
         except ValueError as e:
             print(f"### ignore file '{kusss_participants_file}' because of '{e}'")
         print()
+
+
+if __name__ == "__main__":
+    main(arguments.get_grading_args_parser().parse_args())
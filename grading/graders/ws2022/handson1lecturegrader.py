@@ -1,7 +1,9 @@
+import argparse
+
 import numpy as np
 import pandas as pd
 
-from graders import util
+from graders import arguments, schema, util
 from graders.grader import Grader
 
 MAX_POINTS = 100
@@ -9,6 +11,12 @@ MAX_POINTS = 100
 
 class HandsOn1LectureGrader(Grader):
     
+    SCHEMA = [
+        schema.ColumnSpec("Quiz: Exam (Real)", MAX_POINTS),
+        schema.ColumnSpec("Quiz: Retry Exam (Real)", MAX_POINTS, required=False),
+        schema.ColumnSpec("Quiz: Retry Exam 2 (Real)", MAX_POINTS, required=False),
+    ]
+    
     def _create_grade_row(self, row: pd.Series) -> pd.Series:
         e1 = row["Quiz: Exam (Real)"]
         e2 = row["Quiz: Retry Exam (Real)"]
@@ -25,10 +33,14 @@ class HandsOn1LectureGrader(Grader):
         return util.create_grade(points, MAX_POINTS)
 
 
-if __name__ == "__main__":
-    args = util.get_grading_args_parser().parse_args()
+def main(args: argparse.Namespace):
     util.args_sanity_check(args.moodle_file, args.kusss_participants_files, "handson1")
-    grader = HandsOn1LectureGrader(args.moodle_file)
+    grader = HandsOn1LectureGrader.cached(args.moodle_file, point_scale=args.point_scale, backend=args.backend)
     gdf, gf = grader.create_grading_file(args.kusss_participants_files, grading_file=args.grading_file,
-                                         row_filter=lambda row: (~row[grader.quiz_cols].isna()).any())
+                                         row_filter=lambda row: (~row[grader.quiz_cols].isna()).any(),
+                                         **arguments.grading_kwargs(args))
     gdf.to_csv(gf.replace(".csv", "_FULL.csv"), index=False)
+
+
+if __name__ == "__main__":
+    main(arguments.get_grading_args_parser().parse_args())
@@ -1,11 +1,18 @@
 import os
 import unittest
+import warnings
 
+import numpy as np
 import pandas as pd
 
+from graders import simulation
+
 MOODLE_FILE = "moodle_file.csv"
 KUSSS_PARTICIPANTS_FILE = "kusss_participants_file.csv"
 GRADING_FILE = "grading.csv"
+# the columns of the Moodle export of the Python2 grader of ss2022 (see "create_random_python2_files")
+PYTHON2_COLUMNS = [f"Assignment: Exercise {i} (Real)" for i in range(1, 7)] + \
+                  ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]
 
 
 class AbstractGraderTest(unittest.TestCase):
@@ -66,6 +73,84 @@ class AbstractGraderTest(unittest.TestCase):
                 zip(points.iloc[:, -1], gdf[grader_create_grading_file_kwargs["grade_col"]])):
             self.assertEqual(expected_grade, actual_grade, msg=f"\n{gdf.iloc[i]}")
     
+    def assert_consistent_rules(self, points: pd.DataFrame, moodle_file: str = MOODLE_FILE,
+                                kusss_participants_file: str = KUSSS_PARTICIPANTS_FILE,
+                                grading_file: str = GRADING_FILE, grader_init_kwargs: dict = None):
+        """
+        Checks whether the rules of the concrete grader (see method `get_grader_class` and
+        ``Grader._evaluate_rules``) agree with its grades (``Grader._create_grade_row``) for
+        the given ``points`` pd.DataFrame (e.g., random points, see ``create_random_points``),
+        i.e., every entry that fails a rule must have grade 5 and the reason of the first failed
+        rule, and no other entry may have the reason of a rule.
+        
+        :param points: The pd.DataFrame containing the points (without expected grades).
+        :param moodle_file: The temporary moodle CSV file (see ``assert_equal_grades``).
+        :param kusss_participants_file: The temporary KUSSS participants CSV file (see
+            ``assert_equal_grades``).
+        :param grading_file: The temporary output grading CSV file (see ``assert_equal_grades``).
+        :param grader_init_kwargs: Additional keyword arguments that are passed to the ``__init__``
+            method when instantiating the concrete grader class (as given by `get_grader_class`).
+        """
+        if grader_init_kwargs is None:
+            grader_init_kwargs = dict()
+        df = AbstractGraderTest.create_moodle_file_with_points(points, moodle_file)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, kusss_participants_file)
+        
+        grader = self.get_grader_class()(moodle_file, verbose=False, **grader_init_kwargs)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            gdf, _ = grader.create_grading_file(kusss_participants_file, grading_file=grading_file)
+        # the reasons of the failed rules are compared in "Grader._get_trace_reasons"
+        self.assertEqual([str(w.message) for w in caught if "rule trace" in str(w.message)], [])
+        reasons = list(grader._evaluate_rules(gdf))
+        failed = gdf["rule_trace"] != 0
+        # the random points must cover both cases
+        self.assertTrue(failed.any() and not failed.all(), msg=f"\n{gdf}")
+        self.assertTrue((gdf.loc[failed, "grade"] == 5).all(), msg=f"\n{gdf[failed]}")
+        self.assertFalse(gdf.loc[~failed, "grade_reason"].isin(reasons).any(), msg=f"\n{gdf[~failed]}")
+    
+    def assert_consistent_threshold_rules(self, points: pd.DataFrame, moodle_file: str = MOODLE_FILE,
+                                          kusss_participants_file: str = KUSSS_PARTICIPANTS_FILE,
+                                          grading_file: str = GRADING_FILE, grader_init_kwargs: dict = None):
+        """
+        Checks whether the threshold rules of the concrete grader (see method `get_grader_class`
+        and ``Grader._get_threshold_rules``) reproduce its grades for the given ``points``
+        pd.DataFrame (e.g., random points, see ``create_random_points``), i.e., the simulation
+        of the current thresholds (``simulation.simulate_grader``) must not change any grade,
+        and the rules built from the processed ``Grader.df`` must equal those of the graded
+        pd.DataFrame.
+        
+        :param points: The pd.DataFrame containing the points (without expected grades).
+        :param moodle_file: The temporary moodle CSV file (see ``assert_equal_grades``).
+        :param kusss_participants_file: The temporary KUSSS participants CSV file (see
+            ``assert_equal_grades``).
+        :param grading_file: The temporary output grading CSV file (see ``assert_equal_grades``).
+        :param grader_init_kwargs: Additional keyword arguments that are passed to the ``__init__``
+            method when instantiating the concrete grader class (as given by `get_grader_class`).
+        """
+        if grader_init_kwargs is None:
+            grader_init_kwargs = dict()
+        df = AbstractGraderTest.create_moodle_file_with_points(points, moodle_file)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, kusss_participants_file)
+        
+        grader = self.get_grader_class()(moodle_file, verbose=False, **grader_init_kwargs)
+        gdf, _ = grader.create_grading_file(kusss_participants_file, grading_file=grading_file)
+        table = simulation.simulate_grader(grader, gdf)
+        self.assertEqual(len(table), 1)
+        self.assertEqual(table.loc[0, "n_changed"], 0, msg=f"\n{table.iloc[0]}")
+        # the random points must cover both passed and failed entries
+        self.assertTrue(0 < table.loc[0, "n_5"] < len(gdf), msg=f"\n{table.iloc[0]}")
+        
+        points, max_points, rules = simulation.grader_rules(grader, gdf)
+        moodle_points, moodle_max_points, moodle_rules = simulation.grader_rules(grader)
+        pd.testing.assert_series_equal(moodle_points.sort_index(), points.sort_index())
+        self.assertEqual(moodle_max_points, max_points)
+        # the graded pd.DataFrame is sorted by ID, so the rules are compared in the same order
+        order, moodle_order = np.argsort(points.index), np.argsort(moodle_points.index)
+        for rule, moodle_rule in zip(rules, moodle_rules, strict=True):
+            np.testing.assert_array_equal(moodle_rule.fail_matrix()[moodle_order], rule.fail_matrix()[order],
+                                          err_msg=rule.name)
+    
     def get_grader_class(self) -> type:
         """
         Returns the class/type of the concrete grader which should be instantiated in
@@ -78,7 +163,7 @@ class AbstractGraderTest(unittest.TestCase):
     def create_moodle_file_with_points(points: pd.DataFrame, moodle_file: str) -> pd.DataFrame:
         df = points.copy()
         df["First name"] = "A"
-        df["Surname"] = "B"
+        df["Last name"] = "B"
         df["ID number"] = range(len(points))
         df.to_csv(moodle_file, index=False)
         return df
@@ -89,3 +174,46 @@ class AbstractGraderTest(unittest.TestCase):
         df["Matrikelnummer"] = moodle_df["ID number"].apply(lambda x: f"k{x:08d}")
         df["SKZ"] = 123
         df.to_csv(kusss_participants_file, sep=";", index=False)
+    
+    @staticmethod
+    def create_random_points(columns: list[str], max_points: list[float], n: int, seed: int,
+                             missing_rate: float = 0.2) -> pd.DataFrame:
+        """
+        Returns ``n`` entries with reproducible random points (multiples of 5% of ``max_points``,
+        so the thresholds are hit exactly), where each point is missing ("-", i.e., no
+        submission) with probability ``missing_rate``.
+        
+        :param columns: The columns of the points.
+        :param max_points: The maximum points of each column.
+        :param n: The number of entries.
+        :param seed: The seed of the random number generator.
+        :param missing_rate: The probability of missing points. Default: 0.2
+        :return: A pd.DataFrame containing the random points.
+        """
+        rng = np.random.default_rng(seed)
+        points = rng.integers(0, 20 + 1, size=(n, len(columns))) * np.asarray(max_points, dtype=float) / 20
+        df = pd.DataFrame(points, columns=columns).astype(object)
+        df[rng.random(size=df.shape) < missing_rate] = "-"
+        return df
+    
+    @staticmethod
+    def create_random_python2_files(seed: int, n: int, moodle_file: str = MOODLE_FILE,
+                                    kusss_participants_file: str = KUSSS_PARTICIPANTS_FILE):
+        """
+        Creates a Moodle file with ``n`` entries with reproducible random points for the
+        Python2 grader of ss2022 (see ``PYTHON2_COLUMNS``), where each exam is missing with
+        probability 0.4, and the matching KUSSS participants file.
+        
+        :param seed: The seed of the random number generator.
+        :param n: The number of entries.
+        :param moodle_file: The temporary moodle CSV file.
+        :param kusss_participants_file: The temporary KUSSS participants CSV file.
+        """
+        rng = np.random.default_rng(seed)
+        points = pd.DataFrame(rng.integers(0, 20, size=(n, len(PYTHON2_COLUMNS))).astype(float),
+                              columns=PYTHON2_COLUMNS)
+        # the exams have at most 10 points
+        exam_cols = PYTHON2_COLUMNS[-3:]
+        points[exam_cols] = (points[exam_cols] // 2).where(rng.random((n, len(exam_cols))) < 0.6, np.nan)
+        df = AbstractGraderTest.create_moodle_file_with_points(points.astype(object).fillna("-"), moodle_file)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, kusss_participants_file)
@@ -47,3 +47,7 @@ class HandsOn2ExerciseGraderTest(AbstractGraderTest):
             ["-", 90, 10, 100, 97, 78, 3],
             ["-", 90, 10, 100, 97, 77, 4],
         ], columns=COLUMNS))
+    
+    def test_rules_agree_with_grades(self):
+        points = AbstractGraderTest.create_random_points(COLUMNS[:-1], [100] * 6, n=500, seed=0)
+        self.assert_consistent_rules(points)
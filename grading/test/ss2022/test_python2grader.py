@@ -22,7 +22,7 @@ class Python2GraderTest(AbstractGraderTest):
     #
     # tests based on exams
     #
-
+    
     # noinspection PyTypeChecker
     def test_create_grading_file_no_exam(self):
         # assignments but no exam = 5
@@ -127,3 +127,11 @@ class Python2GraderTest(AbstractGraderTest):
             # full points
             FULL_POINTS_A + FULL_POINTS_E + [1],
         ], columns=COLUMNS))
+    
+    def test_rules_agree_with_grades(self):
+        points = AbstractGraderTest.create_random_points(COLUMNS[:-1], FULL_POINTS_A + FULL_POINTS_E, n=500, seed=0)
+        self.assert_consistent_rules(points)
+    
+    def test_threshold_rules_agree_with_grades(self):
+        points = AbstractGraderTest.create_random_points(COLUMNS[:-1], FULL_POINTS_A + FULL_POINTS_E, n=500, seed=0)
+        self.assert_consistent_threshold_rules(points)
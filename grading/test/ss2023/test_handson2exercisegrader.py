@@ -0,0 +1,14 @@
+from graders.ss2023.handson2exercisegrader import HandsOn2ExerciseGrader
+from test.abstractgradertest import AbstractGraderTest
+
+COLUMNS = [f"Assignment: Assignment {i + 1} (Real)" for i in range(6)]
+
+
+class HandsOn2ExerciseGraderTest(AbstractGraderTest):
+    
+    def get_grader_class(self) -> type:
+        return HandsOn2ExerciseGrader
+    
+    def test_rules_agree_with_grades(self):
+        points = AbstractGraderTest.create_random_points(COLUMNS, [100] * len(COLUMNS), n=500, seed=0)
+        self.assert_consistent_rules(points)
@@ -141,3 +141,13 @@ class Python2ExerciseGraderTest(AbstractGraderTest):
             no_project + FULL_POINTS_E + [3],
             no_project_with_bonus + FULL_POINTS_E + [3],
         ], columns=COLUMNS))
+    
+    def test_rules_agree_with_grades(self):
+        points = AbstractGraderTest.create_random_points(COLUMNS[:-1], FULL_POINTS_A_WITH_BONUS + [100] * 3, n=500,
+                                                         seed=0)
+        self.assert_consistent_rules(points)
+    
+    def test_threshold_rules_agree_with_grades(self):
+        points = AbstractGraderTest.create_random_points(COLUMNS[:-1], FULL_POINTS_A_WITH_BONUS + [100] * 3, n=500,
+                                                         seed=0)
+        self.assert_consistent_threshold_rules(points)
@@ -0,0 +1,74 @@
+import os
+import shutil
+import unittest
+from datetime import datetime
+
+import pandas as pd
+
+from graders import archive
+from graders.ss2023.python2exercisegrader import Python2ExerciseGrader
+from graders.ss2024.python2lecturegrader import Python2LectureGrader
+from test.abstractgradertest import AbstractGraderTest, MOODLE_FILE, KUSSS_PARTICIPANTS_FILE, GRADING_FILE
+
+ARCHIVE_DIR = "test_archive"
+COLUMNS = ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]
+
+
+def _grades(ids: list[str], grades: list[int], skz: int = 521) -> pd.DataFrame:
+    return pd.DataFrame(dict(id=ids, skz=skz, grade=grades, reason=""))
+
+
+class ArchiveTest(AbstractGraderTest):
+    
+    def tearDown(self):
+        super().tearDown()
+        shutil.rmtree(ARCHIVE_DIR, ignore_errors=True)
+    
+    def get_grader_class(self) -> type:
+        return Python2LectureGrader
+    
+    def test_get_partition(self):
+        self.assertEqual(archive.get_partition(Python2LectureGrader), ("ss2024", "python2lecture"))
+        self.assertEqual(archive.get_partition(Python2ExerciseGrader), ("ss2023", "python2exercise"))
+        with self.assertRaises(ValueError):
+            archive.get_partition(unittest.TestCase)
+    
+    def test_grader_runs(self):
+        for exam_points in [[100, 20], [100, 60]]:
+            points = pd.DataFrame([[p, "-", "-"] for p in exam_points], columns=COLUMNS)
+            df = AbstractGraderTest.create_moodle_file_with_points(points, MOODLE_FILE)
+            AbstractGraderTest.create_matching_kusss_participants_file(df, KUSSS_PARTICIPANTS_FILE)
+            grader = Python2LectureGrader(MOODLE_FILE, verbose=False)
+            grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE, archive_dir=ARCHIVE_DIR)
+        runs = os.listdir(os.path.join(ARCHIVE_DIR, "semester=ss2024", "course=python2lecture"))
+        self.assertEqual(len(runs), 2)
+        latest = archive.read_latest_grades(ARCHIVE_DIR)
+        self.assertEqual(latest["grade"].tolist(), [1, 4])
+        self.assertEqual(latest["reason"].tolist(), ["", ""])
+        self.assertTrue(latest["rule_trace"].isna().all())
+        self.assertEqual(latest["run"].nunique(), 1)
+    
+    def test_latest_across_semesters(self):
+        # a regrade of an older semester must not override a more recent semester
+        archive.write_run(_grades(["k00000001"], [5]), ARCHIVE_DIR, "ws2023", "python1", run=datetime(2024, 2, 1))
+        archive.write_run(_grades(["k00000001"], [3]), ARCHIVE_DIR, "ss2024", "python1", run=datetime(2024, 7, 1))
+        archive.write_run(_grades(["k00000001", "k00000002"], [4, 2]), ARCHIVE_DIR, "ws2023", "python1",
+                          run=datetime(2024, 9, 1))
+        archive.write_run(_grades(["k00000001"], [1], skz=999), ARCHIVE_DIR, "ss2024", "python2",
+                          run=datetime(2024, 7, 1))
+        latest = archive.read_latest_grades(ARCHIVE_DIR)
+        self.assertEqual(latest[["course", "id", "skz", "grade", "semester"]].values.tolist(), [
+            ["python1", "k00000001", 521, 3, "ss2024"],
+            ["python1", "k00000002", 521, 2, "ws2023"],
+            ["python2", "k00000001", 999, 1, "ss2024"],
+        ])
+        # partition pruning and predicate pushdown filters
+        self.assertEqual(archive.read_latest_grades(ARCHIVE_DIR, semesters=["ws2023"])["grade"].tolist(), [4, 2])
+        self.assertEqual(archive.read_latest_grades(ARCHIVE_DIR, courses=["python2"])["grade"].tolist(), [1])
+        self.assertEqual(archive.read_latest_grades(ARCHIVE_DIR, skz=[521], ids=["k00000002"])["grade"].tolist(), [2])
+    
+    def test_run_is_never_overwritten(self):
+        run = datetime(2024, 7, 1)
+        archive.write_run(_grades(["k00000001"], [1]), ARCHIVE_DIR, "ss2024", "python2", run=run)
+        with self.assertRaises(FileExistsError):
+            archive.write_run(_grades(["k00000001"], [2]), ARCHIVE_DIR, "ss2024", "python2", run=run)
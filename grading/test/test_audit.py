@@ -0,0 +1,60 @@
+import os
+
+import pandas as pd
+
+from eval.util import read_grading_file
+from graders import audit
+from graders.ss2024.python2lecturegrader import Python2LectureGrader
+from test.abstractgradertest import AbstractGraderTest, MOODLE_FILE, KUSSS_PARTICIPANTS_FILE, GRADING_FILE
+
+COLUMNS = ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]
+
+
+class AuditTest(AbstractGraderTest):
+    
+    def setUp(self):
+        points = pd.DataFrame([
+            [100, "-", "-"],
+            [20, 60, "-"],
+            [20, 40, "-"],
+        ], columns=COLUMNS)
+        df = AbstractGraderTest.create_moodle_file_with_points(points, MOODLE_FILE)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, KUSSS_PARTICIPANTS_FILE)
+        self.audit_files = []
+    
+    def tearDown(self):
+        super().tearDown()
+        for f in self.audit_files:
+            if os.path.exists(f):
+                os.remove(f)
+    
+    def get_grader_class(self) -> type:
+        return Python2LectureGrader
+    
+    def _create_grading_file(self, audit_format: str) -> tuple[pd.DataFrame, str]:
+        grader = Python2LectureGrader(MOODLE_FILE, verbose=False)
+        gdf, _ = grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE,
+                                            audit_format=audit_format)
+        audit_file = os.path.splitext(GRADING_FILE)[0] + "_FULL" + audit.AUDIT_FORMATS[audit_format]
+        self.audit_files.append(audit_file)
+        return gdf, audit_file
+    
+    def test_roundtrip(self):
+        for audit_format in audit.AUDIT_FORMATS:
+            gdf, audit_file = self._create_grading_file(audit_format)
+            adf, metadata = audit.read_audit_file(audit_file)
+            pd.testing.assert_frame_equal(gdf.reset_index(drop=True), adf)
+            self.assertEqual(metadata["grader"], "graders.ss2024.python2lecturegrader.Python2LectureGrader")
+            self.assertEqual(metadata["constants"]["MAX_POINTS"], 100)
+            self.assertEqual(set(metadata["input_hashes"]), {MOODLE_FILE, KUSSS_PARTICIPANTS_FILE})
+            self.assertEqual(metadata, audit.read_audit_metadata(audit_file))
+    
+    def test_read_grading_file(self):
+        for audit_format in audit.AUDIT_FORMATS:
+            _, audit_file = self._create_grading_file(audit_format)
+            pd.testing.assert_frame_equal(read_grading_file(GRADING_FILE), read_grading_file(audit_file))
+    
+    def test_unknown_format(self):
+        grader = Python2LectureGrader(MOODLE_FILE, verbose=False)
+        with self.assertRaises(ValueError):
+            grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE, audit_format="feather")
@@ -0,0 +1,96 @@
+import copy
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+from unittest import mock
+
+import pandas as pd
+
+from graders import backends
+from graders.grader import Grader
+
+# the existing grader test suites whose results are compared between both backends
+COMPARED_TEST_MODULES = sorted(os.path.splitext(f)[0].replace(os.sep, ".") for pattern in ["test/ss*/test_*.py",
+                                                                                          "test/ws*/test_*.py"]
+                               for f in glob.glob(pattern)) + ["test.test_corrections", "test.test_fixedpoint"]
+
+
+class BackendMismatch(Exception):
+    pass
+
+
+def _compare_with_polars(create_grading_file):
+    # runs every call again with the Polars backend and compares the results with the original (pandas) call
+    def compare(self, *args, **kwargs):
+        df, grading_file = create_grading_file(self, *args, **kwargs)
+        with open(grading_file, "rb") as f:
+            content = f.read()
+        polars_grader = copy.copy(self)
+        polars_grader.backend = backends.get_backend("polars")
+        polars_grader.clear_stages()
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                polars_df, polars_grading_file = create_grading_file(polars_grader, *args, **kwargs)
+            pd.testing.assert_frame_equal(polars_df, df, check_exact=True)
+            with open(polars_grading_file, "rb") as f:
+                assert f.read() == content, "different grading files"
+        except Exception as e:
+            raise BackendMismatch(f"{type(e).__name__}: {e}") from e
+        return df, grading_file
+    
+    return compare
+
+
+class PolarsBackendTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+    
+    def _write(self, name: str, lines: list[str], encoding: str = "utf8") -> str:
+        file = os.path.join(self.dir, name)
+        with open(file, "w", encoding=encoding) as f:
+            f.write("\n".join(lines) + "\n")
+        return file
+    
+    def test_read_participants(self):
+        files = [
+            self._write("a.csv", ["Name;Matrikelnummer;SKZ", "Müller;k00000002;521", "Bär;k00000001;521"], "cp1252"),
+            self._write("b.csv", ["Matrikelnummer;SKZ", "k00000001;521", "k00000003;199", "k00000001;521"]),
+            self._write("c.csv", ["Matrikelnummer;SKZ", "k00000004;521"]),
+        ]
+        # compressed files are read with pandas
+        pd.read_csv(files[2]).to_csv(files[2] + ".gz", index=False)
+        files[2] += ".gz"
+        pandas_backend, polars_backend = backends.get_backend("pandas"), backends.get_backend("polars")
+        kdf, duplicates = pandas_backend.read_participants(files, ";", "Matrikelnummer", "SKZ", "cp1252")
+        polars_kdf, polars_duplicates = polars_backend.read_participants(files, ";", "Matrikelnummer", "SKZ",
+                                                                         "cp1252")
+        self.assertEqual(kdf["Matrikelnummer"].tolist(), ["k00000002", "k00000001", "k00000003", "k00000004"])
+        pd.testing.assert_frame_equal(polars_kdf.to_pandas(), kdf.reset_index(drop=True))
+        pd.testing.assert_frame_equal(polars_duplicates, duplicates.reset_index(drop=True))
+        
+        invalid = [self._write("d.csv", ["Matrikelnummer;SKZ", "12345678;521"])]
+        for backend in [pandas_backend, polars_backend]:
+            with self.assertRaises(ValueError):
+                backend.read_participants(invalid, ";", "Matrikelnummer", "SKZ", "utf8")
+    
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            backends.get_backend("spark")
+    
+    def test_same_results_as_pandas(self):
+        suite = unittest.defaultTestLoader.loadTestsFromNames(COMPARED_TEST_MODULES)
+        result = unittest.TestResult()
+        with mock.patch.object(Grader, "create_grading_file", _compare_with_polars(Grader.create_grading_file)):
+            suite.run(result)
+        # only the comparison matters here (not whether the original tests pass)
+        mismatches = [f"{test}: {tb.splitlines()[-1]}" for test, tb in result.errors if BackendMismatch.__name__ in tb]
+        self.assertEqual(mismatches, [])
+        self.assertGreater(result.testsRun, 20)
@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from graders import audit, corrections
+from graders.ss2024.python2lecturegrader import Python2LectureGrader
+from test.abstractgradertest import AbstractGraderTest, MOODLE_FILE, KUSSS_PARTICIPANTS_FILE, GRADING_FILE
+
+COLUMNS = ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]
+LEDGER_FILE = "corrections.csv"
+AUDIT_FILE = "grading_FULL.parquet"
+
+
+class CorrectionsTest(AbstractGraderTest):
+    
+    def setUp(self):
+        points = pd.DataFrame([
+            [87, "-", "-"],
+            [49.5, "-", "-"],
+            [20, 49, "-"],
+            [20, 49, "-"],
+        ], columns=COLUMNS)
+        df = AbstractGraderTest.create_moodle_file_with_points(points, MOODLE_FILE)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, KUSSS_PARTICIPANTS_FILE)
+    
+    def tearDown(self):
+        super().tearDown()
+        for f in [LEDGER_FILE, AUDIT_FILE]:
+            if os.path.exists(f):
+                os.remove(f)
+    
+    def get_grader_class(self) -> type:
+        return Python2LectureGrader
+    
+    @staticmethod
+    def _write_ledger(lines: list[str]):
+        with open(LEDGER_FILE, "w", encoding="utf8") as f:
+            f.write("\n".join(["column;adjustment;scope;reason"] + lines) + "\n")
+    
+    def test_apply_corrections(self):
+        self._write_ledger([
+            "Quiz: Exam (Real);0.5;all;question 3",
+            "Quiz: Retry Exam (Real);1;k00000002, k00000003;wrong answer key",
+            "Quiz: Retry Exam (Real);-1;k00000003;",
+        ])
+        grader = Python2LectureGrader(MOODLE_FILE, verbose=False)
+        gdf, _ = grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE,
+                                            corrections_file=LEDGER_FILE, audit_format="parquet")
+        np.testing.assert_array_equal(gdf["Quiz: Exam (Real)"], [87.5, 50, 20.5, 20.5])
+        # missing points remain missing
+        np.testing.assert_array_equal(gdf["Quiz: Retry Exam (Real)"], [np.nan, np.nan, 50, 49])
+        self.assertEqual(gdf["grade"].tolist(), [1, 4, 4, 5])
+        
+        metadata = audit.read_audit_metadata(AUDIT_FILE)
+        entries = metadata["corrections"]["entries"]
+        self.assertEqual([e["n_affected"] for e in entries], [4, 2, 1])
+        self.assertEqual(entries[1]["scope"], "k00000002 k00000003")
+        self.assertEqual(entries[2]["reason"], "")
+    
+    def test_unknown_column(self):
+        self._write_ledger(["Quiz: Exam 2 (Real);0.5;all;typo"])
+        grader = Python2LectureGrader(MOODLE_FILE, verbose=False)
+        with self.assertRaises(ValueError):
+            grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE,
+                                       corrections_file=LEDGER_FILE)
+    
+    def test_invalid_ledger(self):
+        for line in ["Quiz: Exam (Real);0.5;everyone;invalid scope", "Quiz: Exam (Real);half;all;not numeric",
+                     "Quiz: Exam (Real);;all;missing adjustment"]:
+            self._write_ledger([line])
+            with self.assertRaises(ValueError, msg=line):
+                corrections.read_ledger(LEDGER_FILE)
+    
+    def test_unknown_ids(self):
+        self._write_ledger(["Quiz: Exam (Real);0.5;k00000001 k12345678;unknown ID"])
+        grader = Python2LectureGrader(MOODLE_FILE, verbose=False)
+        with self.assertWarns(UserWarning):
+            gdf, _ = grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE,
+                                                corrections_file=LEDGER_FILE)
+        self.assertEqual(gdf["Quiz: Exam (Real)"].tolist(), [87, 50, 20, 20])
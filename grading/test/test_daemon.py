@@ -0,0 +1,136 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from urllib import error, request
+
+import pandas as pd
+
+from graders import daemon, grader, registry
+from test.abstractgradertest import AbstractGraderTest
+
+KEY = "ss2024/python2lecture"
+COLUMNS = ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]
+
+
+class DaemonTest(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.token_dir = tempfile.mkdtemp()
+        cls.server = daemon.create_server(port=0, preload=False, verbose=False, token_dir=cls.token_dir)
+        cls.port = cls.server.server_address[1]
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        shutil.rmtree(cls.token_dir)
+        grader.set_instance_cache(False)
+    
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.dir)
+        points = pd.DataFrame([[87, "-", "-"], [20, 60, "-"], [20, 30, 95]], columns=COLUMNS)
+        df = AbstractGraderTest.create_moodle_file_with_points(points, "python2_moodle.csv")
+        AbstractGraderTest.create_matching_kusss_participants_file(df, "python2_kusss.csv")
+    
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.dir)
+    
+    def _submit(self, *grader_args: str) -> dict:
+        return daemon.submit(KEY, ["-mf", "python2_moodle.csv", "-kpf", "python2_kusss.csv", *grader_args],
+                             port=self.port, token_dir=self.token_dir)
+    
+    def test_grade(self):
+        first = self._submit()
+        self.assertTrue(first["ok"])
+        gdf = pd.read_csv(os.path.join(self.dir, "python2_kusss_grading.csv"), sep=";", header=None)
+        self.assertEqual(gdf[2].tolist(), [2, 4, 1])
+        # the prepared grader and its stages are reused
+        second = self._submit()
+        self.assertIn("reusing prepared Python2LectureGrader", second["output"])
+        self.assertIn("reusing memoized stage 'participants'", second["output"])
+        self.assertNotIn("reusing prepared", first["output"])
+        # but not if the Moodle file changed
+        pd.read_csv("python2_moodle.csv").iloc[:2].to_csv("python2_moodle.csv", index=False)
+        third = self._submit()
+        self.assertNotIn("reusing prepared", third["output"])
+    
+    def _post(self, headers: dict) -> int:
+        data = json.dumps({"grader": KEY, "args": [], "cwd": self.dir}).encode("utf8")
+        req = request.Request(f"http://127.0.0.1:{self.port}/grade", data=data, headers=headers)
+        try:
+            with request.urlopen(req) as response:
+                return response.status
+        except error.HTTPError as e:
+            return e.code
+    
+    def test_invalid_requests(self):
+        with self.assertRaises(ValueError):
+            daemon.submit("ss2024/unknown", [], port=self.port, token_dir=self.token_dir)
+        with self.assertRaises(ValueError):
+            daemon.submit(KEY, ["-mf", "python2_moodle.csv"], port=self.port, token_dir=self.token_dir)
+        with self.assertRaises(ValueError):
+            self._submit("--backend", "spark")
+        # no token file of a daemon on this port
+        with self.assertRaises(ValueError):
+            daemon.submit(KEY, [], port=self.port, token_dir=self.dir)
+    
+    def test_unauthorized_requests(self):
+        self.assertEqual(os.stat(self.server.token_file).st_mode & 0o777, 0o600)
+        json_type = {"Content-Type": "application/json"}
+        token = {daemon.TOKEN_HEADER: self.server.token}
+        self.assertEqual(self._post(json_type), 401)
+        self.assertEqual(self._post({**json_type, daemon.TOKEN_HEADER: "guess"}), 401)
+        # a "simple" cross-origin request of a web page
+        self.assertEqual(self._post({"Content-Type": "text/plain", "Origin": "http://example.com", **token}), 403)
+        self.assertEqual(self._post({"Content-Type": "text/plain", **token}), 415)
+        # the request itself is valid, only the grader arguments are missing
+        self.assertEqual(self._post({**json_type, **token}), 400)
+    
+    def test_grader_errors_are_internal(self):
+        # an error within the grader script is not an invalid request
+        pd.read_csv("python2_moodle.csv").drop(columns="Quiz: Exam (Real)").to_csv("python2_moodle.csv", index=False)
+        with self.assertRaises(ValueError) as context:
+            self._submit()
+        self.assertNotIn("invalid arguments", str(context.exception))
+        service = daemon.GradingService(preload=False)
+        with self.assertRaises(daemon.RequestError):
+            service.grade("ss2024/unknown", [])
+    
+    def test_reload_changed_module(self):
+        service = daemon.GradingService(preload=False)
+        service.grade(KEY, ["-mf", "python2_moodle.csv", "-kpf", "python2_kusss.csv"])
+        file = registry.get_entry(KEY).file
+        stat = os.stat(file)
+        try:
+            os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            result = service.grade(KEY, ["-mf", "python2_moodle.csv", "-kpf", "python2_kusss.csv"])
+        finally:
+            os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(service.n_reloads, 1)
+        # the Grader object of the previous class is not reused
+        self.assertNotIn("reusing prepared", result["output"])
+        self.assertEqual(result["warnings"], [])
+    
+    def test_changed_shared_module(self):
+        service = daemon.GradingService(preload=False)
+        service.grade(KEY, ["-mf", "python2_moodle.csv", "-kpf", "python2_kusss.csv"])
+        file = grader.__file__
+        stat = os.stat(file)
+        try:
+            os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            result = service.grade(KEY, ["-mf", "python2_moodle.csv", "-kpf", "python2_kusss.csv"])
+        finally:
+            os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        # shared modules are never reloaded, but the run reports that a restart is required
+        self.assertEqual(service.n_reloads, 0)
+        self.assertEqual(len(result["warnings"]), 1)
+        self.assertIn(file, result["warnings"][0])
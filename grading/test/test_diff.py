@@ -0,0 +1,60 @@
+import os
+import unittest
+
+import pandas as pd
+
+from eval.diff import diff_grading_files
+
+GRADING_FILES = ["grading_1.csv", "grading_2.csv", "grading_3.csv"]
+
+
+def _write(grading_file: str, rows: list[tuple]):
+    # the same format as "Grader.create_grading_file" (header-less, same external and internal info)
+    pd.DataFrame([(i, skz, g, r, r) for i, skz, g, r in rows]).to_csv(grading_file, sep=";", header=False,
+                                                                      index=False)
+
+
+class DiffTest(unittest.TestCase):
+    
+    def tearDown(self):
+        for f in GRADING_FILES:
+            if os.path.exists(f):
+                os.remove(f)
+    
+    def test_diff(self):
+        _write(GRADING_FILES[0], [("k00000001", 521, 5, "exam negative"), ("k00000002", 521, 4, ""),
+                                  ("k00000003", 521, 1, ""), ("k00000004", 521, 5, "exam missing"),
+                                  ("k00000001", 999, 5, "exam negative")])
+        _write(GRADING_FILES[1], [("k00000004", 521, 3, ""), ("k00000003", 521, 1, ""),
+                                  ("k00000001", 521, 4, ""), ("k00000002", 521, 5, "exam negative"),
+                                  ("k00000005", 521, 2, ""), ("k00000001", 999, 5, "exam missing")])
+        # the chunk size must not change the result
+        for chunksize in [1, 2, 100]:
+            df, transitions = diff_grading_files(GRADING_FILES[:2], chunksize=chunksize)
+            self.assertEqual(df[["change", "id", "skz"]].values.tolist(), [
+                ["added", "k00000005", 521],
+                ["changed", "k00000001", 521],
+                ["changed", "k00000001", 999],
+                ["changed", "k00000002", 521],
+                ["changed", "k00000004", 521],
+            ])
+            self.assertEqual(df["old_reason"].tolist()[1:3], ["exam negative", "exam negative"])
+            self.assertEqual(df["new_reason"].tolist()[1:3], ["", "exam missing"])
+            self.assertEqual(transitions.astype(object).where(transitions.notna(), None).values.tolist(), [
+                ["added", None, 2, 1],
+                ["changed", 4, 5, 1],
+                ["changed", 5, 3, 1],
+                ["changed", 5, 4, 1],
+                ["changed", 5, 5, 1],
+            ])
+    
+    def test_previous_files_last_wins(self):
+        _write(GRADING_FILES[0], [("k00000001", 521, 5, "exam negative"), ("k00000002", 521, 4, "")])
+        _write(GRADING_FILES[1], [("k00000001", 521, 3, "")])
+        _write(GRADING_FILES[2], [("k00000001", 521, 3, "")])
+        df, transitions = diff_grading_files(GRADING_FILES, chunksize=1)
+        self.assertEqual(df[["change", "id", "old_grade"]].values.tolist(), [["removed", "k00000002", 4]])
+        self.assertTrue(df["new_grade"].isna().all())
+        self.assertEqual(transitions["count"].tolist(), [1])
+        with self.assertRaises(ValueError):
+            diff_grading_files(GRADING_FILES[:1])
@@ -0,0 +1,108 @@
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from graders import util
+from graders.ss2024.python2lecturegrader import Python2LectureGrader
+from graders.ws2021.python1grader import Python1Grader
+from graders.ws2021.sw1exercisegrader import SW1ExerciseGrader
+from test.abstractgradertest import AbstractGraderTest, MOODLE_FILE, KUSSS_PARTICIPANTS_FILE, GRADING_FILE
+
+A_COLS = [f"Assignment: Exercise {i + 1} (Real)" for i in range(21)]
+Q_COLS = ["Quiz: Exam 1 (Real)", "Quiz: Exam 2 (Real)", "Quiz: Retry Exam (Real)"]
+E_COLS = ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]
+LEDGER_FILE = "corrections.csv"
+
+
+class UtilFixedPointTest(unittest.TestCase):
+    
+    def test_to_fixed_point(self):
+        s = pd.Series([19.4, 0.1, np.nan, -2.5])
+        fixed = util.to_fixed_point(s, 1000)
+        np.testing.assert_array_equal(fixed, [19400, 100, np.nan, -2500])
+        self.assertEqual(fixed.sum(), 17000)
+        pd.testing.assert_series_equal(util.from_fixed_point(fixed, 1000), s)
+        self.assertEqual(util.to_fixed_point(0.625, 1000), 625)
+        with self.assertRaises(ValueError):
+            util.to_fixed_point(pd.Series([0.1234]), 1000)
+        with self.assertRaises(ValueError):
+            util.to_fixed_point(2.0 ** 60, 1)
+    
+    def test_fixed_point_threshold(self):
+        # 0.4 * 10 = 4.000000000000001 with floats
+        self.assertEqual(util.fixed_point_threshold(10, 0.4, 1000), 4000)
+        self.assertEqual(util.fixed_point_threshold(35, 0.25, 1000), 8750)
+        self.assertEqual(util.fixed_point_threshold(35, 0.25, 10), 88)
+    
+    def test_integer_create_grade(self):
+        # the exact integer arithmetic of fixed-point points must result in the same grades as the regular points
+        rng = np.random.default_rng(0)
+        for max_points in [7, 24, 100]:
+            points = np.concatenate([rng.uniform(0, max_points, 300).round(3),
+                                     max_points * np.array([0.875, 0.75, 0.625, 0.5, 0.57, 0.29])])
+            fixed = util.to_fixed_point(points, 1000)
+            grades, _ = util.create_grades(points, max_points)
+            fixed_grades, _ = util.create_grades(fixed, max_points * 1000)
+            np.testing.assert_array_equal(grades, fixed_grades)
+            for p, f in zip(points[:50], fixed[:50]):
+                self.assertEqual(util.create_grade(p, max_points).tolist(),
+                                 util.create_grade(f, max_points * 1000).tolist())
+
+
+class GraderFixedPointTest(AbstractGraderTest):
+    
+    def tearDown(self):
+        super().tearDown()
+        if os.path.exists(LEDGER_FILE):
+            os.remove(LEDGER_FILE)
+    
+    def get_grader_class(self) -> type:
+        return Python1Grader
+    
+    def _grade(self, point_scale: int = None) -> pd.DataFrame:
+        grader = Python1Grader(MOODLE_FILE, point_scale=point_scale, verbose=False)
+        gdf, _ = grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE)
+        return gdf
+    
+    def test_python1_grades_unchanged(self):
+        rng = np.random.default_rng(1)
+        n = 300
+        # Moodle exercise points are scaled by a factor of 10 (see FULL_POINTS_A of test_python1grader.py)
+        full_points = np.array([25, 25, 50, 50] + [20] * 6 + [55, 25, 50, 50, 0] + [110, 110, 80, 50, 0, 0])
+        points = pd.DataFrame((full_points * rng.uniform(0.3, 1, (n, 1))).round(), columns=A_COLS)
+        points[Q_COLS] = rng.integers(6, 21, (n, 3)) / 2
+        points.loc[rng.random(n) < 0.7, Q_COLS[2]] = np.nan
+        df = AbstractGraderTest.create_moodle_file_with_points(points, MOODLE_FILE)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, KUSSS_PARTICIPANTS_FILE)
+        gdf = self._grade()
+        fixed_gdf = self._grade(point_scale=1000)
+        self.assertGreater(gdf["grade"].nunique(), 2)
+        pd.testing.assert_frame_equal(gdf, fixed_gdf)
+    
+    def test_not_representable(self):
+        points = pd.DataFrame([[25] * len(A_COLS) + [10, 10, np.nan]], columns=A_COLS + Q_COLS)
+        df = AbstractGraderTest.create_moodle_file_with_points(points, MOODLE_FILE)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, KUSSS_PARTICIPANTS_FILE)
+        # exercise points are divided by 10, so 25 cannot be represented in whole points
+        with self.assertRaises(ValueError):
+            self._grade(point_scale=1)
+        self.assertEqual(self._grade(point_scale=10)["grade"].tolist(), self._grade()["grade"].tolist())
+    
+    def test_corrections(self):
+        points = pd.DataFrame([[49.9, "-", "-"], [87.4, "-", "-"]], columns=E_COLS)
+        df = AbstractGraderTest.create_moodle_file_with_points(points, MOODLE_FILE)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, KUSSS_PARTICIPANTS_FILE)
+        with open(LEDGER_FILE, "w", encoding="utf8") as f:
+            f.write("column;adjustment;scope;reason\nQuiz: Exam (Real);0.1;all;question 3\n")
+        grader = Python2LectureGrader(MOODLE_FILE, point_scale=1000, verbose=False)
+        gdf, _ = grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE,
+                                            corrections_file=LEDGER_FILE)
+        # the points are converted back at export
+        self.assertEqual(gdf["Quiz: Exam (Real)"].tolist(), [50, 87.5])
+        self.assertEqual(gdf["grade"].tolist(), [4, 1])
+    
+    def test_unsupported_grader(self):
+        with self.assertRaises(ValueError):
+            SW1ExerciseGrader(MOODLE_FILE, [], point_scale=1000)
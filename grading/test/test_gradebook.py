@@ -0,0 +1,88 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from graders import gradebook, util
+from graders.ss2024.python2lecturegrader import Python2LectureGrader
+from test.abstractgradertest import AbstractGraderTest, MOODLE_FILE, KUSSS_PARTICIPANTS_FILE, GRADING_FILE
+
+GRADEBOOK_FILE = "test_gradebook.sqlite"
+COLUMNS = ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]
+
+
+def _grades(ids: list[str], grades: list[int], skz: int = 521) -> pd.DataFrame:
+    return pd.DataFrame(dict(id=ids, skz=skz, grade=grades, reason=""))
+
+
+class GradebookTest(AbstractGraderTest):
+    
+    def tearDown(self):
+        super().tearDown()
+        if os.path.exists(GRADEBOOK_FILE):
+            os.remove(GRADEBOOK_FILE)
+    
+    def get_grader_class(self) -> type:
+        return Python2LectureGrader
+    
+    def test_grader_runs(self):
+        for exam_points in [[100, 20], [100, 60]]:
+            points = pd.DataFrame([[p, "-", "-"] for p in exam_points], columns=COLUMNS)
+            df = AbstractGraderTest.create_moodle_file_with_points(points, MOODLE_FILE)
+            AbstractGraderTest.create_matching_kusss_participants_file(df, KUSSS_PARTICIPANTS_FILE)
+            grader = Python2LectureGrader(MOODLE_FILE, verbose=False)
+            grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE,
+                                       gradebook_file=GRADEBOOK_FILE)
+        runs = gradebook.read_runs(GRADEBOOK_FILE)
+        self.assertEqual(runs[["semester", "course", "n_grades"]].values.tolist(),
+                         [["ss2024", "python2lecture", 2]] * 2)
+        self.assertEqual(gradebook.read_inputs(GRADEBOOK_FILE, runs["run"].iloc[-1]),
+                         {f: util.file_hash(f) for f in [MOODLE_FILE, KUSSS_PARTICIPANTS_FILE]})
+        history = gradebook.student_history(GRADEBOOK_FILE, "k00000001")
+        self.assertEqual(history[["run", "grade", "Quiz: Exam (Real)"]].values.tolist(), [[2, 4, 60]])
+        # missing points (no submission) are not stored
+        self.assertNotIn("Quiz: Retry Exam (Real)", history.columns)
+        history = gradebook.student_history(GRADEBOOK_FILE, "k00000001", all_runs=True)
+        self.assertEqual(history["grade"].tolist(), [5, 4])
+        self.assertEqual(history["reason"].tolist(), ["total threshold not reached", ""])
+    
+    def test_history_across_courses(self):
+        # a regrade of an older semester must neither override a more recent semester nor count twice
+        gradebook.write_run(GRADEBOOK_FILE, _grades(["k00000001"], [5]), "ws2023", "python1",
+                            run=datetime(2024, 2, 1))
+        gradebook.write_run(GRADEBOOK_FILE, _grades(["k00000001", "k00000002"], [5, 5]), "ss2024", "python1",
+                            run=datetime(2024, 7, 1), points=pd.DataFrame(
+                                dict(id=["k00000001", "k00000002"], skz=521, exam=[10.5, None])))
+        gradebook.write_run(GRADEBOOK_FILE, _grades(["k00000001", "k00000002"], [5, 2]), "ws2023", "python1",
+                            run=datetime(2024, 9, 1))
+        gradebook.write_run(GRADEBOOK_FILE, _grades(["k00000001"], [1], skz=999), "ws2024", "python2",
+                            run=datetime(2025, 2, 1))
+        history = gradebook.student_history(GRADEBOOK_FILE, "k00000001")
+        self.assertEqual(history[["semester", "course", "skz", "grade"]].values.tolist(), [
+            ["ws2023", "python1", 521, 5],
+            ["ss2024", "python1", 521, 5],
+            ["ws2024", "python2", 999, 1],
+        ])
+        self.assertEqual(history["exam"].tolist()[1], 10.5)
+        self.assertEqual(gradebook.student_history(GRADEBOOK_FILE, "k00000001", courses=["python2"])["grade"].tolist(),
+                         [1])
+        self.assertEqual(len(gradebook.student_history(GRADEBOOK_FILE, "k99999999")), 0)
+        self.assertEqual(gradebook.count_negative_grades(GRADEBOOK_FILE).to_dict(), {"k00000001": 2, "k00000002": 1})
+        counts = gradebook.count_negative_grades(GRADEBOOK_FILE, ids=["k00000002", "k00000003"], courses=["python1"],
+                                                 before_semester="ws2024")
+        self.assertEqual(counts.to_dict(), {"k00000002": 1, "k00000003": 0})
+        self.assertEqual(gradebook.count_negative_grades(GRADEBOOK_FILE, before_semester="ss2024").to_dict(),
+                         {"k00000001": 1})
+    
+    def test_partial_runs(self):
+        # a later run that only grades some students (e.g., only the retry exam participants) keeps the previous
+        # grades of all other students
+        gradebook.write_run(GRADEBOOK_FILE, _grades(["k00000001", "k00000002"], [5, 5]), "ss2024", "python2",
+                            run=datetime(2024, 7, 1))
+        gradebook.write_run(GRADEBOOK_FILE, _grades(["k00000002"], [3]), "ss2024", "python2",
+                            run=datetime(2024, 9, 1))
+        self.assertEqual(gradebook.student_history(GRADEBOOK_FILE, "k00000001")[["run", "grade"]].values.tolist(),
+                         [[1, 5]])
+        self.assertEqual(gradebook.student_history(GRADEBOOK_FILE, "k00000002")[["run", "grade"]].values.tolist(),
+                         [[2, 3]])
+        self.assertEqual(gradebook.count_negative_grades(GRADEBOOK_FILE).to_dict(), {"k00000001": 1})
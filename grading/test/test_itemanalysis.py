@@ -0,0 +1,57 @@
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from graders import itemanalysis
+from graders.ss2022 import python2grader
+from graders.ss2022.python2grader import Python2Grader
+from test.abstractgradertest import (AbstractGraderTest, MOODLE_FILE, KUSSS_PARTICIPANTS_FILE, GRADING_FILE,
+                                     PYTHON2_COLUMNS)
+
+ITEM_ANALYSIS_FILE = "grading_items.csv"
+
+
+class AnalyzeTest(unittest.TestCase):
+    
+    def test_same_as_per_column(self):
+        df = pd.DataFrame({"a": [1, 2, np.nan, 4, 8], "b": [np.nan] * 5, "c": [3, 3, 3, np.nan, 0],
+                           "grade": [1, 2, 5, 3, 4]})
+        result = itemanalysis.analyze(df, ["a", "b", "c"], "grade", thresholds=dict(a=2, c=3))
+        self.assertEqual(result.index.tolist(), ["a", "b", "c"])
+        for c in ["a", "c"]:
+            self.assertEqual(result.loc[c, "mean"], df[c].mean())
+            self.assertEqual(result.loc[c, "q50"], df[c].median())
+            self.assertAlmostEqual(result.loc[c, "grade_corr"], df[c].corr(df["grade"]))
+        self.assertEqual(result["n"].tolist(), [4, 0, 4])
+        self.assertEqual(result["nan_rate"].tolist(), [0.2, 1, 0.2])
+        # NaN points are below the threshold
+        self.assertEqual(result.loc["a", "below_threshold_rate"], 0.4)
+        self.assertEqual(result.loc["c", "below_threshold_rate"], 0.4)
+        self.assertTrue(result.loc["b"].drop(["n", "nan_rate"]).isna().all())
+
+
+class ItemAnalysisGraderTest(AbstractGraderTest):
+    
+    def setUp(self):
+        AbstractGraderTest.create_random_python2_files(seed=1, n=40)
+    
+    def tearDown(self):
+        super().tearDown()
+        if os.path.exists(ITEM_ANALYSIS_FILE):
+            os.remove(ITEM_ANALYSIS_FILE)
+    
+    def get_grader_class(self) -> type:
+        return Python2Grader
+    
+    def test_item_analysis(self):
+        grader = Python2Grader(MOODLE_FILE, verbose=False)
+        gdf, _ = grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE, item_analysis=True)
+        result = pd.read_csv(ITEM_ANALYSIS_FILE, index_col="item")
+        # the assignment and quiz columns plus the assignment totals (which have individual thresholds)
+        self.assertEqual(result.index.tolist(), PYTHON2_COLUMNS + ["a1_total", "a2_total"])
+        pd.testing.assert_frame_equal(result, grader.item_analysis, check_index_type=False)
+        threshold = python2grader.MAX_POINTS_A1 * python2grader.THRESHOLD_INDIVIDUAL_A
+        self.assertAlmostEqual(result.loc["a1_total", "below_threshold_rate"], (gdf["a1_total"] < threshold).mean())
+        self.assertTrue(np.isnan(result.loc["Assignment: Exercise 1 (Real)", "below_threshold_rate"]))
@@ -0,0 +1,141 @@
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import zipfile
+
+import pandas as pd
+
+from eval.util import read_grading_file
+from graders import loader
+from graders.ss2024.python2lecturegrader import Python2LectureGrader
+from test.abstractgradertest import AbstractGraderTest
+
+COLUMNS = ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]
+
+
+class LoaderTest(unittest.TestCase):
+    
+    def test_order_is_preserved(self):
+        # earlier files take longer, so they finish last
+        files = [0.2, 0.1, 0.0]
+        
+        def read_file(delay: float) -> pd.DataFrame:
+            time.sleep(delay)
+            return pd.DataFrame(dict(id=["k00000001"], delay=[delay]))
+        
+        df = loader.read_concat(files, read_file, ignore_index=True)
+        self.assertEqual(df["delay"].tolist(), files)
+        # "later files win" semantics
+        self.assertEqual(df.drop_duplicates("id", keep="last")["delay"].tolist(), [0.0])
+    
+    def test_bounded_pool(self):
+        lock = threading.Lock()
+        running, max_running = 0, 0
+        
+        def read_file(i: int) -> int:
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return i
+        
+        self.assertEqual(loader.read_files(range(10), read_file, max_workers=3), list(range(10)))
+        self.assertLessEqual(max_running, 3)
+        self.assertGreater(max_running, 1)
+    
+    def test_exception(self):
+        def read_file(f: str) -> pd.DataFrame:
+            if f == "missing.csv":
+                raise FileNotFoundError(f)
+            return pd.DataFrame()
+        
+        with self.assertRaises(FileNotFoundError):
+            loader.read_files(["a.csv", "missing.csv", "b.csv"], read_file)
+
+
+class CompressedInputTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.df = pd.DataFrame(dict(id=["k00000001", "k00000002"], points=[1.5, 2.0]))
+        self.csv = self.df.to_csv(index=False)
+    
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.dir, name)
+    
+    def test_read_csv(self):
+        for ext in [".gz", ".xz", ".zip"]:
+            file = self._path("points.csv" + ext)
+            self.df.to_csv(file, index=False)
+            pd.testing.assert_frame_equal(loader.read_csv(file), self.df, obj=ext)
+    
+    def test_zip_members(self):
+        file = self._path("exports.zip")
+        with zipfile.ZipFile(file, "w") as zf:
+            zf.writestr("a.csv", self.csv)
+            zf.writestr("sub/b.csv", self.csv.replace("1.5", "3.5"))
+        with self.assertRaises(ValueError):
+            loader.read_csv(file)
+        self.assertEqual(loader.read_csv(file + "::a.csv")["points"].tolist(), [1.5, 2.0])
+        self.assertEqual(loader.read_csv(file + "::sub/b.csv")["points"].tolist(), [3.5, 2.0])
+        with self.assertRaises(ValueError):
+            loader.read_csv(self._path("points.csv::a.csv"))
+    
+    def test_strip_compression(self):
+        self.assertEqual(loader.strip_compression("grading.csv.gz"), ("grading.csv", ".gz"))
+        self.assertEqual(loader.strip_compression("grading.csv"), ("grading.csv", ""))
+        self.assertEqual(loader.split_member("a.zip::b/c.csv"), ("a.zip", "b/c.csv"))
+        self.assertEqual(loader.split_member("a.csv"), ("a.csv", None))
+
+
+class CompressedGraderTest(AbstractGraderTest):
+    
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        points = pd.DataFrame([[90, "-", "-"], [20, 70, "-"]], columns=COLUMNS)
+        moodle_file = self._path("moodle.csv")
+        kusss_file = self._path("kusss.csv")
+        df = AbstractGraderTest.create_moodle_file_with_points(points, moodle_file)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, kusss_file)
+        with zipfile.ZipFile(self._path("moodle.zip"), "w") as zf:
+            zf.write(moodle_file, "export/moodle.csv")
+            zf.writestr("export/readme.txt", "not a CSV file")
+        with open(kusss_file, "rb") as f_in, gzip.open(kusss_file + ".gz", "wb") as f_out:
+            f_out.write(f_in.read())
+        os.remove(moodle_file)
+        os.remove(kusss_file)
+    
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+    
+    def get_grader_class(self) -> type:
+        return Python2LectureGrader
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.dir, name)
+    
+    def test_create_grading_file(self):
+        grader = Python2LectureGrader(self._path("moodle.zip::export/moodle.csv"), verbose=False)
+        gdf, grading_file = grader.create_grading_file(self._path("kusss.csv.gz"))
+        # the output has the same compression as the participants file
+        self.assertEqual(grading_file, self._path("kusss_grading.csv.gz"))
+        self.assertEqual(gdf["grade"].tolist(), [1, 3])
+        with gzip.open(grading_file, "rt", encoding="utf8") as f:
+            self.assertEqual(f.read().splitlines(), ["k00000000;123;1;;", "k00000001;123;3;;"])
+        self.assertEqual(read_grading_file(grading_file)["grade"].tolist(), [1, 3])
+    
+    def test_zip_output(self):
+        grader = Python2LectureGrader(self._path("moodle.zip::export/moodle.csv"), verbose=False)
+        _, grading_file = grader.create_grading_file(self._path("kusss.csv.gz"),
+                                                     grading_file=self._path("grading.csv.xz"))
+        self.assertEqual(read_grading_file(grading_file)["grade"].tolist(), [1, 3])
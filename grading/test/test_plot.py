@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from eval.plot import line_breaking, save_grade_hists_batch
+
+TEXT = "exam threshold not reached and more than 1 assignment skipped/graded with 0 points"
+
+
+class LineBreakingTest(unittest.TestCase):
+    
+    def test_line_breaking(self):
+        self.assertEqual(line_breaking("hello world foo bar", 11), "hello world\nfoo bar")
+        # words longer than a line are split with a dash
+        self.assertEqual(line_breaking("abcdefghij", 4), "abc-\ndef-\nghi-\nj")
+        self.assertEqual(line_breaking("hello world foo bar", 5, max_line_breaks=2), "hello\nworld\nfo...")
+        self.assertEqual(line_breaking("a b c", 1), "a\nb\nc")
+        for line_len, max_len, max_line_breaks in [(0, None, None), (5, 0, None), (5, None, 0)]:
+            with self.assertRaises(ValueError):
+                line_breaking("a b", line_len, max_len, max_line_breaks)
+    
+    def test_max_len(self):
+        self.assertEqual(line_breaking("hello world foo bar", 5, max_len=12), "hello\nwor...")
+        # the early stop (as soon as the finished lines exceed max_len) yields the same as slicing the full result
+        for line_len in [3, 5, 20]:
+            full = line_breaking(TEXT, line_len)
+            for max_len in range(3, len(full)):
+                self.assertEqual(line_breaking(TEXT, line_len, max_len=max_len), full[:max_len - 3] + "...",
+                                 msg=(line_len, max_len))
+            self.assertEqual(line_breaking(TEXT, line_len, max_len=len(full)), full)
+    
+    def test_line_len_1(self):
+        # there is no room for the splitting dash, independent of whether the long word is reached at all
+        for max_len in [None, 3, 100]:
+            with self.assertRaises(ValueError):
+                line_breaking("a b cdef", 1, max_len=max_len)
+
+
+class BatchTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+    
+    def _write(self, course: str, name: str, lines: list[str]) -> str:
+        os.makedirs(os.path.join(self.dir, course), exist_ok=True)
+        file = os.path.join(self.dir, course, name)
+        with open(file, "w", encoding="utf8") as f:
+            f.write("\n".join(lines) + "\n")
+        return file
+    
+    def test_save_grade_hists_batch(self):
+        courses = [
+            [self._write("python1", "grading.csv", ["k00000001;521;5;exam negative;exam negative",
+                                                     "k00000002;999;2;;"]),
+             self._write("python1", "retry_grading.csv", ["k00000001;521;3;;"])],
+            [self._write("python2", "grading.csv", ["k00000001;521;1;;", "k00000003;521;5;exam missing;"])],
+        ]
+        output_dir = os.path.join(self.dir, "plots")
+        files = save_grade_hists_batch(courses, output_dir, formats=["png", "svg"], max_workers=2)
+        # one histogram per course and per SKZ, in each format (named after the last grading file of each course)
+        expected = [f"{name}.{fmt}" for name in ["python1_retry_grading", "python1_retry_grading_skz521",
+                                                  "python1_retry_grading_skz999", "python2_grading",
+                                                  "python2_grading_skz521"] for fmt in ["png", "svg"]]
+        self.assertEqual([os.path.relpath(f, output_dir) for f in files], expected)
+        self.assertEqual(sorted(os.listdir(output_dir)), sorted(expected))
+        for file in files:
+            with open(file, "rb") as f:
+                content = f.read()
+            if file.endswith(".png"):
+                self.assertTrue(content.startswith(b"\x89PNG"), msg=file)
+            else:
+                self.assertIn(b"<svg", content, msg=file)
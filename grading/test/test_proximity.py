@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from graders import util
+from graders.proximity import proximity_report, near_boundary_cases, grader_proximity_report
+from graders.simulation import ThresholdRule
+from graders.ss2022.python2grader import Python2Grader
+from test.abstractgradertest import AbstractGraderTest, MOODLE_FILE, KUSSS_PARTICIPANTS_FILE, GRADING_FILE
+
+
+class ProximityTest(unittest.TestCase):
+    
+    def test_points_to_next_grade(self):
+        rng = np.random.default_rng(0)
+        for max_points in [7, 24, 40, 100, 1100]:
+            for step in [0.01, 0.5, 1]:
+                points = np.round(rng.uniform(0, max_points, 300) / step) * step
+                grades, missing = util.points_to_next_grade(points, max_points, step=step)
+                for p, grade, m in zip(points, grades, missing):
+                    if grade == 1:
+                        self.assertTrue(np.isnan(m))
+                        continue
+                    # "missing" points are enough, but one step less is not
+                    self.assertLess(util.create_grade(round(p + m, 9), max_points)[0], grade, msg=(p, m))
+                    self.assertEqual(util.create_grade(round(p + m - step, 9), max_points)[0], grade, msg=(p, m))
+    
+    def test_missing_points(self):
+        points = np.array([[10, 30, 0], [100, 100, np.nan], [24, 24, 100]])
+        rule = ThresholdRule("a", points, 100, [0.25, 0.5], max_failed=1)
+        np.testing.assert_array_equal(rule.missing_points(), [[15, 60], [0, 0], [1, 26]])
+        # passing the rule must be consistent with "fail_matrix"
+        np.testing.assert_array_equal(rule.missing_points() > 0, rule.fail_matrix())
+        rule = ThresholdRule("e", [49.3, 50, np.nan], 100, [0.5])
+        np.testing.assert_allclose(rule.missing_points()[:, 0], [0.7, 0, 50])
+        np.testing.assert_allclose(rule.missing_points(step=0.5)[:, 0], [1, 0, 50])
+    
+    def test_report(self):
+        e = pd.Series([87, 49, 30, 62.5], index=["k1", "k2", "k3", "k4"])
+        a = pd.Series([100, 100, 49.5, 100], index=e.index)
+        rules = [ThresholdRule("exam", e, 100, [0.5]), ThresholdRule("all_a", a, 100, [0.5])]
+        report = proximity_report(e, 100, rules)
+        self.assertEqual(list(report.index), list(e.index))
+        self.assertEqual(report["points_grade"].tolist(), [2, 5, 5, 3])
+        np.testing.assert_allclose(report["to_next_grade"], [0.01, 0.01, 19.01, 11.51])
+        np.testing.assert_allclose(report["to_exam"], [0, 1, 20, 0])
+        self.assertEqual(report["n_failed_rules"].tolist(), [0, 1, 2, 0])
+        
+        cases = near_boundary_cases(report, max_missing=1)
+        self.assertEqual(list(cases.index), ["k1", "k2"])
+        self.assertEqual(cases["boundary"].tolist(), ["grade 1", "exam"])
+    
+    def test_report_invalid_rule(self):
+        with self.assertRaises(ValueError):
+            proximity_report([1], 1, [ThresholdRule("r", [1], 1, [0.5, 0.6])])
+
+
+class GraderProximityTest(AbstractGraderTest):
+    
+    def get_grader_class(self) -> type:
+        return Python2Grader
+    
+    def test_grader_proximity_report(self):
+        AbstractGraderTest.create_random_python2_files(seed=0, n=200)
+        grader = Python2Grader(MOODLE_FILE, verbose=False)
+        df, _ = grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE)
+        report = grader_proximity_report(grader, df)
+        self.assertEqual(list(report.index), df["ID number"].tolist())
+        self.assertEqual(list(report.columns), ["points", "points_grade", "to_next_grade", "to_individual_a",
+                                                "to_all_a", "to_exam", "n_failed_rules"])
+        # entries that pass all rules are graded by their points, all others fail
+        passed = (report["n_failed_rules"] == 0).values
+        self.assertTrue(0 < passed.sum() < len(df))
+        np.testing.assert_array_equal(report["points_grade"].values[passed], df["grade"].values[passed])
+        self.assertTrue((df["grade"].values[~passed] == 5).all())
+        # the same report without the final pd.DataFrame (all entries of grader.df)
+        pd.testing.assert_frame_equal(grader_proximity_report(grader).sort_index(), report.sort_index())
@@ -0,0 +1,71 @@
+import os
+import warnings
+
+import pandas as pd
+
+from graders import reconciliation
+from graders.ss2024.python2lecturegrader import Python2LectureGrader
+from test.abstractgradertest import AbstractGraderTest, MOODLE_FILE, KUSSS_PARTICIPANTS_FILE, GRADING_FILE
+
+RECONCILIATION_FILE = "grading_reconciliation.csv"
+COLUMNS = ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]
+
+
+class ReconciliationTest(AbstractGraderTest):
+    
+    def setUp(self):
+        points = pd.DataFrame([[87, "-", "-"], [20, 60, "-"], [20, 30, "-"], [50, "-", "-"], [90, "-", "-"]],
+                              columns=COLUMNS)
+        df = AbstractGraderTest.create_moodle_file_with_points(points, MOODLE_FILE)
+        # the last student was manually added to Moodle (no matriculation ID)
+        df["ID number"] = df["ID number"].astype(object)
+        df.loc[4, ["First name", "ID number"]] = ["C", "guest"]
+        df.to_csv(MOODLE_FILE, index=False)
+        # the third and fourth student are not registered in KUSSS, but another one is
+        pd.DataFrame({"Matrikelnummer": ["k00000001", "k00000000", "k00000009"], "SKZ": [521, 123, 123]}).to_csv(
+            KUSSS_PARTICIPANTS_FILE, sep=";", index=False)
+    
+    def tearDown(self):
+        super().tearDown()
+        if os.path.exists(RECONCILIATION_FILE):
+            os.remove(RECONCILIATION_FILE)
+    
+    def get_grader_class(self) -> type:
+        return Python2LectureGrader
+    
+    def _reconcile(self, backend: str = None) -> tuple[pd.DataFrame, reconciliation.Reconciliation]:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            grader = Python2LectureGrader(MOODLE_FILE, verbose=False, backend=backend)
+            gdf, _ = grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE, reconcile=True)
+        return gdf, grader.reconciliation
+    
+    def test_reconciliation(self):
+        gdf, rec = self._reconcile()
+        self.assertEqual(gdf["Matrikelnummer"].tolist(), ["k00000000", "k00000001"])
+        self.assertEqual(rec.counts(), dict(both=2, moodle_only=2, kusss_only=1, invalid_id=1))
+        self.assertEqual(rec.entries["id"].tolist(), ["k00000000", "k00000001", "k00000002", "k00000003",
+                                                      "k00000009", "guest"])
+        self.assertEqual(rec.entries["skz"].fillna(-1).tolist(), [123, 521, -1, -1, 123, -1])
+        self.assertEqual(rec.get("invalid_id")["First name"].tolist(), ["C"])
+        with self.assertRaises(ValueError):
+            rec.get("unknown")
+        # the file contains the same entries
+        pd.testing.assert_frame_equal(reconciliation.read(RECONCILIATION_FILE).entries, rec.entries)
+    
+    def test_warnings(self):
+        grader = Python2LectureGrader(MOODLE_FILE, verbose=False)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE,
+                                       warn_if_not_found_in_kusss_participants=True)
+        messages = [str(w.message) for w in caught]
+        self.assertTrue(any(m.startswith("the following 1 KUSSS participants") for m in messages))
+        self.assertTrue(any(m.startswith("the following 2 entries were not part") for m in messages))
+        self.assertFalse(os.path.exists(RECONCILIATION_FILE))
+    
+    def test_same_with_polars(self):
+        gdf, rec = self._reconcile()
+        polars_gdf, polars_rec = self._reconcile("polars")
+        pd.testing.assert_frame_equal(polars_gdf, gdf)
+        pd.testing.assert_frame_equal(polars_rec.entries, rec.entries)
@@ -0,0 +1,59 @@
+import inspect
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+from graders import arguments, audit, backends, cli, registry
+from graders.grader import Grader
+
+
+class RegistryTest(unittest.TestCase):
+    
+    def test_discover(self):
+        entries = registry.discover()
+        self.assertIn("ss2024/python2lecture", entries)
+        self.assertEqual(entries["ws2021/python1"].class_name, "Python1Grader")
+        self.assertTrue(entries["ws2021/sw1exercise"].has_add_args)
+        for entry in entries.values():
+            self.assertTrue(issubclass(entry.load_class(), Grader), msg=entry)
+            self.assertTrue(callable(entry.load_module().main), msg=entry)
+    
+    def test_unknown_key(self):
+        with self.assertRaises(KeyError):
+            registry.get_entry("ss2024/unknown")
+    
+    def test_cli_without_heavy_imports(self):
+        code = ("import sys; from graders.cli import main; main(['list']); "
+                "assert 'pandas' not in sys.modules and 'numpy' not in sys.modules")
+        subprocess.run([sys.executable, "-c", code], check=True, stdout=subprocess.DEVNULL)
+    
+    def test_argument_choices(self):
+        # the choices are parsed from the source files, which must not get out of sync with the actual constants
+        self.assertEqual(arguments.get_audit_format_choices(), list(audit.AUDIT_FORMATS))
+        self.assertEqual(arguments.get_backend_choices(), backends.BACKENDS)
+        with self.assertRaises(KeyError):
+            registry.get_module_constant("audit", "UNKNOWN")
+    
+    def test_grading_kwargs(self):
+        args = arguments.get_grading_args_parser().parse_args(["-mf", "m.csv", "-kpf", "k.csv", "-cf", "c.csv",
+                                                               "-rc", "-gw", "2"])
+        kwargs = arguments.grading_kwargs(args)
+        self.assertEqual(kwargs["corrections_file"], "c.csv")
+        self.assertTrue(kwargs["reconcile"])
+        self.assertEqual(kwargs["grading_workers"], 2)
+        self.assertTrue(set(kwargs) <= set(inspect.signature(Grader.create_grading_file).parameters))
+        # every common argument must be passed on, either here or explicitly by the grader scripts
+        self.assertEqual(set(vars(args)) - set(kwargs), {"moodle_file", "kusss_participants_files", "grading_file",
+                                                         "point_scale", "backend"})
+    
+    def test_cli_errors(self):
+        # an unknown grader key is a usage error
+        with self.assertRaises(SystemExit) as context:
+            cli.main(["run", "ss2024/unknown"])
+        self.assertEqual(context.exception.code, 1)
+        # but errors of the grader script itself are not caught
+        module = registry.get_entry("ss2024/python2lecture").load_module()
+        with mock.patch.object(module, "main", side_effect=KeyError("Quiz: Exam (Real)")):
+            with self.assertRaises(KeyError):
+                cli.main(["run", "ss2024/python2lecture", "-mf", "moodle.csv", "-kpf", "kusss.csv"])
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from graders import schema
+from graders.ss2024.python2lecturegrader import Python2LectureGrader
+from graders.ws2021.handson1lecturegrader import HandsOn1LectureGrader
+from test.abstractgradertest import AbstractGraderTest, MOODLE_FILE, KUSSS_PARTICIPANTS_FILE, GRADING_FILE
+
+SCHEMA = [
+    schema.ColumnSpec("Quiz: Exam (Real)", 100),
+    schema.ColumnSpec(r"Assignment: .*", 10, scale=10, regex=True),
+    schema.ColumnSpec("Quiz: Retry Exam (Real)", 100, required=False),
+    schema.ColumnSpec("Quiz: Final (Real)", 100),
+]
+
+
+class SchemaTest(AbstractGraderTest):
+    
+    def get_grader_class(self) -> type:
+        return Python2LectureGrader
+    
+    def test_validate(self):
+        df = pd.DataFrame({
+            "ID number": ["k00000001", "k00000002", "k00000003"],
+            "Quiz: Exam (Real)": [50, 101, np.nan],
+            "Assignment: A1 (Real)": [100, -5, 101],
+            "Assignment: A2 (Real)": ["10", "x", np.nan],
+        })
+        violations = schema.validate(df, SCHEMA)
+        self.assertEqual([(v.column, v.check, v.n_entries, v.examples) for v in violations], [
+            ("Assignment: A2 (Real)", "not numeric", 1, ["k00000002"]),
+            ("Quiz: Final (Real)", "missing", 0, []),
+            ("Assignment: A1 (Real)", "below minimum 0", 1, ["k00000002"]),
+            ("Quiz: Exam (Real)", "above maximum 100", 1, ["k00000002"]),
+            ("Assignment: A1 (Real)", "above maximum 100", 1, ["k00000003"]),
+        ])
+        self.assertEqual(schema.validate(df.iloc[:1].drop(columns="Assignment: A2 (Real)"), SCHEMA[:3]), [])
+        self.assertEqual(schema.add_missing_columns(df, SCHEMA), ["Quiz: Retry Exam (Real)"])
+        self.assertTrue(df["Quiz: Retry Exam (Real)"].isna().all())
+    
+    def test_grader_reports_all_violations(self):
+        df = AbstractGraderTest.create_moodle_file_with_points(pd.DataFrame({
+            "Quiz: Exam (Real)": [50, 870, -1], "Quiz: Retry Exam (Real)": ["-", 600, "-"]}), MOODLE_FILE)
+        with self.assertRaises(schema.SchemaError) as context:
+            Python2LectureGrader(MOODLE_FILE, verbose=False)
+        self.assertEqual(len(context.exception.violations), 3)
+        # the missing retry exam is optional
+        df[["First name", "Last name", "ID number", "Quiz: Exam (Real)"]].iloc[:1].to_csv(MOODLE_FILE, index=False)
+        grader = Python2LectureGrader(MOODLE_FILE, verbose=False)
+        self.assertEqual(grader.quiz_cols,
+                         ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"])
+    
+    def test_missing_retry_exams_are_added(self):
+        df = AbstractGraderTest.create_moodle_file_with_points(pd.DataFrame({
+            "Quiz: Exam 1 (Real)": [50, 30], "Quiz: Exam 2 (Real)": [50, 50]}), MOODLE_FILE)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, KUSSS_PARTICIPANTS_FILE)
+        gdf, _ = HandsOn1LectureGrader(MOODLE_FILE, verbose=False).create_grading_file(
+            KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE)
+        self.assertEqual(gdf["grade"].tolist(), [4, 5])
@@ -0,0 +1,36 @@
+from unittest import mock
+
+import pandas as pd
+
+from graders import grader
+from graders.ss2022.python2grader import Python2Grader
+from test.abstractgradertest import AbstractGraderTest, MOODLE_FILE, KUSSS_PARTICIPANTS_FILE, GRADING_FILE
+
+
+class ShardingTest(AbstractGraderTest):
+    
+    def setUp(self):
+        AbstractGraderTest.create_random_python2_files(seed=0, n=50)
+    
+    def get_grader_class(self) -> type:
+        return Python2Grader
+    
+    def _create_grading_file(self, grading_workers: int = None) -> pd.DataFrame:
+        gdf, _ = Python2Grader(MOODLE_FILE, verbose=False).create_grading_file(
+            KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE, grading_workers=grading_workers)
+        return gdf
+    
+    def test_same_as_in_process(self):
+        expected = self._create_grading_file()
+        self.assertGreater(expected["grade"].nunique(), 2)
+        with mock.patch.object(grader, "MIN_SHARD_SIZE", 10):
+            with mock.patch.object(grader, "ProcessPoolExecutor", wraps=grader.ProcessPoolExecutor) as pool:
+                gdf = self._create_grading_file(grading_workers=3)
+        self.assertEqual(pool.call_args.kwargs["max_workers"], 3)
+        pd.testing.assert_frame_equal(gdf, expected)
+    
+    def test_small_frames_are_not_sharded(self):
+        expected = self._create_grading_file()
+        with mock.patch.object(grader, "ProcessPoolExecutor", side_effect=AssertionError("sharded")):
+            gdf = self._create_grading_file(grading_workers=4)
+        pd.testing.assert_frame_equal(gdf, expected)
@@ -0,0 +1,130 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from graders import simulation, util
+from graders.grader import Grader
+from graders.simulation import ThresholdRule, simulate_thresholds
+from graders.ss2023 import python2exercisegrader
+from graders.ss2023.python2exercisegrader import Python2ExerciseGrader
+from test.abstractgradertest import AbstractGraderTest, MOODLE_FILE, KUSSS_PARTICIPANTS_FILE, GRADING_FILE
+
+A_COLS = [f"Assignment: Assignment {i + 1} (Real)" for i in range(6)] + ["Assignment: Assignment 7 (Project) (Real)"]
+E_COLS = ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]
+BONUS_COL = "Assignment: Assignment 8 (Bonus) (Real)"
+
+
+class UtilCreateGradesTest(unittest.TestCase):
+    
+    def test_create_grades_equals_create_grade(self):
+        rng = np.random.default_rng(0)
+        for max_points in [1, 7, 24, 100, 1100]:
+            # include exact boundaries and float values that are slightly off (e.g., 0.1 or 0.57)
+            points = np.concatenate([rng.uniform(0, max_points, 500).round(rng.integers(0, 3)),
+                                     max_points * np.array([0.875, 0.75, 0.625, 0.5, 0.1, 0.57, 0.29, 0, 1])])
+            for grading in [None, {1: 0.9, 2: 0.8, 3: 0.7, 4: 0.1}, {1: 0.875, 2: 0.75, 3: 0.625, 4: 0.57}]:
+                grades, reasons = util.create_grades(points, max_points, grading)
+                for p, grade, reason in zip(points, grades, reasons):
+                    self.assertEqual(util.create_grade(p, max_points, grading).tolist(), [grade, reason], msg=p)
+    
+    def test_latest_points(self):
+        df = pd.DataFrame([[1, np.nan, 3], [1, 2, np.nan], [np.nan, np.nan, np.nan]], columns=E_COLS)
+        np.testing.assert_array_equal(util.latest_points(df, E_COLS), [3, 2, np.nan])
+
+
+class SimulationTest(AbstractGraderTest):
+    
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        n = 200
+        points = pd.DataFrame(rng.integers(0, 101, (n, 6)), columns=A_COLS[:6])
+        points[A_COLS[6]] = rng.integers(0, 401, n)
+        points[BONUS_COL] = np.where(rng.random(n) < 0.5, rng.integers(0, 51, n), np.nan)
+        for c in E_COLS:
+            points[c] = np.where(rng.random(n) < 0.6, rng.integers(0, 101, n), np.nan)
+        df = AbstractGraderTest.create_moodle_file_with_points(points, MOODLE_FILE)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, KUSSS_PARTICIPANTS_FILE)
+    
+    def get_grader_class(self) -> type:
+        return Python2ExerciseGrader
+    
+    @staticmethod
+    def _grade(threshold_all_a: float = 0.5, threshold_exam: float = 0.5) -> pd.DataFrame:
+        with mock.patch.multiple(python2exercisegrader, THRESHOLD_ALL_A=threshold_all_a,
+                                 THRESHOLD_EXAM=threshold_exam):
+            grader = Python2ExerciseGrader(MOODLE_FILE, verbose=False)
+            gdf, _ = grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE)
+        return gdf
+    
+    def test_simulate_thresholds_equals_grader(self):
+        df = self._grade()
+        a = df[A_COLS].fillna(0)
+        e = util.latest_points(df, E_COLS)
+        exam_thresholds = [0.5, 0.3, 0.7]
+        all_a_thresholds = [0.5, 0.4]
+        gradings = [util.DEFAULT_GRADING, {1: 0.9, 2: 0.8, 3: 0.7, 4: 0.6}]
+        rules = [
+            ThresholdRule("individual_a", a, [100] * 6 + [400], [0.25], max_failed=2),
+            ThresholdRule("all_a", a.sum(axis=1), 1000, all_a_thresholds),
+            ThresholdRule("exam", e, 100, exam_thresholds),
+        ]
+        table = simulate_thresholds(e + a.sum(axis=1) + df[BONUS_COL].fillna(0), 1100, rules, gradings,
+                                    baseline=df["grade"])
+        self.assertEqual(len(table), 1 * 2 * 3 * 2)
+        self.assertEqual(table.loc[0, "n_changed"], 0)
+        
+        for _, row in table.iterrows():
+            grading = gradings[int(row["grading"])]
+            with mock.patch.object(util, "DEFAULT_GRADING", grading):
+                gdf = self._grade(row["all_a"], row["exam"])
+            counts = gdf["grade"].value_counts()
+            for g in range(1, 6):
+                self.assertEqual(counts.get(g, 0), row[f"n_{g}"], msg=f"grade {g}:\n{row}")
+            self.assertEqual((gdf["grade"] != df["grade"]).sum(), row["n_changed"])
+            self.assertEqual((gdf["grade"] < df["grade"]).sum(), row["n_better"])
+    
+    def test_chunks(self):
+        rng = np.random.default_rng(2)
+        points = rng.uniform(0, 100, 50)
+        rules = [ThresholdRule("r", points, 100, np.linspace(0, 1, 21))]
+        table = simulate_thresholds(points, 100, rules)
+        with mock.patch.object(simulation, "MAX_CHUNK_ELEMENTS", 60):
+            pd.testing.assert_frame_equal(table, simulate_thresholds(points, 100, rules))
+    
+    def test_invalid_rule_names(self):
+        with self.assertRaises(ValueError):
+            simulate_thresholds([1], 1, [ThresholdRule("r", [1], 1, [0.5]), ThresholdRule("r", [1], 1, [0.5])])
+    
+    def test_simulate_grader(self):
+        df = self._grade()
+        grader = Python2ExerciseGrader(MOODLE_FILE, verbose=False)
+        thresholds = dict(THRESHOLD_ALL_A=[0.5, 0.4], THRESHOLD_EXAM=[0.5, 0.3, 0.7])
+        gradings = [util.DEFAULT_GRADING, {1: 0.9, 2: 0.8, 3: 0.7, 4: 0.6}]
+        table = simulation.simulate_grader(grader, df, thresholds, gradings)
+        # the same as the hand-encoded rules (see "test_simulate_thresholds_equals_grader")
+        a = df[A_COLS].fillna(0)
+        e = util.latest_points(df, E_COLS)
+        rules = [
+            ThresholdRule("individual_a", a, [100] * 6 + [400], [0.25], max_failed=2),
+            ThresholdRule("all_a", a.sum(axis=1), 1000, thresholds["THRESHOLD_ALL_A"]),
+            ThresholdRule("exam", e, 100, thresholds["THRESHOLD_EXAM"]),
+        ]
+        expected = simulate_thresholds(e + a.sum(axis=1) + df[BONUS_COL].fillna(0), 1100, rules, gradings,
+                                       baseline=df["grade"])
+        pd.testing.assert_frame_equal(table, expected)
+        
+        # the current thresholds are the constants of the grader module
+        with mock.patch.object(python2exercisegrader, "THRESHOLD_INDIVIDUAL_A", 0.3):
+            _, _, rules = simulation.grader_rules(grader, df)
+        self.assertEqual([(r.name, list(r.thresholds)) for r in rules],
+                         [("individual_a", [0.3]), ("all_a", [0.5]), ("exam", [0.5])])
+        with self.assertRaises(ValueError):
+            simulation.grader_rules(grader, df, dict(THRESHOLD_PROJECT=[0.5]))
+    
+    def test_grader_rules_not_supported(self):
+        with mock.patch.object(Python2ExerciseGrader, "_get_threshold_rules", Grader._get_threshold_rules):
+            grader = Python2ExerciseGrader(MOODLE_FILE, verbose=False)
+            with self.assertRaises(NotImplementedError):
+                simulation.grader_rules(grader)
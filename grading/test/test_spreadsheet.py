@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from graders import spreadsheet
+from graders.ss2024.python2lecturegrader import Python2LectureGrader
+
+# German Moodle export (with the non-breaking spaces that Moodle inserts)
+GERMAN_COLUMNS = ["Vorname", "Nachname", "ID-Nummer", "E-Mail-Adresse", "Test:\xa0Exam (Punkte)",
+                  "Test:\xa0Retry Exam (Punkte)", "Test:\xa0Retry Exam 2 (Punkte)", "Kurs gesamt (Punkte)"]
+ROWS = [
+    ["A", "B", 1, "a@b.c", 90, "-", "-", 90],
+    ["C", "D", 2, "c@d.e", 20.5, 70, "-", 70],
+    ["E", "F", "x3", "e@f.g", "-", "-", "-", "-"],
+]
+
+
+class SpreadsheetTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.df = pd.DataFrame(ROWS, columns=GERMAN_COLUMNS)
+        self.csv_file = self._path("moodle.csv")
+        self.df.to_csv(self.csv_file, index=False)
+    
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.dir, name)
+    
+    def _write(self, ext: str) -> str:
+        file = self._path("moodle" + ext)
+        self.df.to_excel(file, index=False, engine=spreadsheet.SPREADSHEET_ENGINES[ext])
+        return file
+    
+    def test_same_as_csv(self):
+        csv_grader = Python2LectureGrader(self.csv_file, verbose=False)
+        for ext in spreadsheet.SPREADSHEET_ENGINES:
+            with self.assertWarns(UserWarning):  # invalid matriculation ID "x3"
+                grader = Python2LectureGrader(self._write(ext), verbose=False)
+            pd.testing.assert_frame_equal(grader.df, csv_grader.df, obj=ext)
+            self.assertEqual(grader.quiz_cols, csv_grader.quiz_cols)
+            # only the kept columns are read
+            self.assertNotIn("E-Mail-Adresse", grader.original_df.columns)
+    
+    def test_header_is_translated_once(self):
+        file = self._write(".xlsx")
+        with mock.patch.object(Python2LectureGrader, "_to_en", autospec=True,
+                               side_effect=Python2LectureGrader._to_en) as to_en:
+            with self.assertWarns(UserWarning):  # invalid matriculation ID "x3"
+                Python2LectureGrader(file, verbose=False)
+        self.assertEqual(to_en.call_count, 1)
+    
+    def test_cache(self):
+        file = self._write(".xlsx")
+        select_cols = lambda header: header[:3]
+        df = spreadsheet.read_spreadsheet(file, select_cols)
+        self.assertTrue(os.path.exists(file + spreadsheet.CACHE_SUFFIX))
+        self.assertEqual(df["ID-Nummer"].tolist(), ["1", "2", "x3"])
+        # cached: the spreadsheet is not parsed again
+        with mock.patch.object(spreadsheet, "_read_xlsx", side_effect=AssertionError("parsed again")):
+            pd.testing.assert_frame_equal(spreadsheet.read_spreadsheet(file, select_cols), df)
+            pd.testing.assert_frame_equal(spreadsheet.read_spreadsheet(file, lambda header: header[:2]), df.iloc[:, :2])
+        # columns that are not cached must be parsed
+        df = spreadsheet.read_spreadsheet(file)
+        self.assertEqual(list(df.columns), GERMAN_COLUMNS)
+        self.assertEqual(df["Test:\xa0Exam (Punkte)"].dtype, float)
+        # a modified file is parsed again
+        self.df.iloc[0, 0] = "Z"
+        self.df.to_excel(file, index=False)
+        os.utime(file, ns=(0, 0))
+        self.assertEqual(spreadsheet.read_spreadsheet(file)["Vorname"].tolist(), ["Z", "C", "E"])
+    
+    def test_cache_not_writable(self):
+        file = self._write(".xlsx")
+        with mock.patch("pyarrow.OSFile", side_effect=PermissionError("read-only directory")):
+            with self.assertWarns(UserWarning):
+                df = spreadsheet.read_spreadsheet(file)
+        self.assertEqual(list(df.columns), GERMAN_COLUMNS)
+        self.assertFalse(os.path.exists(file + spreadsheet.CACHE_SUFFIX))
+    
+    def test_corrupt_cache(self):
+        file = self._write(".xlsx")
+        df = spreadsheet.read_spreadsheet(file)
+        cache_file = file + spreadsheet.CACHE_SUFFIX
+        with open(cache_file, "r+b") as f:
+            f.truncate(os.path.getsize(cache_file) // 2)
+        with self.assertWarns(UserWarning):
+            pd.testing.assert_frame_equal(spreadsheet.read_spreadsheet(file), df)
+        # the cache is replaced
+        with mock.patch.object(spreadsheet, "_read_xlsx", side_effect=AssertionError("parsed again")):
+            pd.testing.assert_frame_equal(spreadsheet.read_spreadsheet(file), df)
+    
+    def test_unknown_extension(self):
+        with self.assertRaises(ValueError):
+            spreadsheet.read_spreadsheet(self.csv_file)
@@ -0,0 +1,124 @@
+import os
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from graders.ss2024.python2lecturegrader import Python2LectureGrader
+from test.abstractgradertest import AbstractGraderTest, MOODLE_FILE, KUSSS_PARTICIPANTS_FILE, GRADING_FILE
+
+COLUMNS = ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]
+LEDGER_FILE = "corrections.csv"
+
+
+def has_retry_exam(row: pd.Series) -> bool:
+    return not np.isnan(row["Quiz: Retry Exam (Real)"])
+
+
+def exam_at_least(points: float):
+    return lambda row: row["Quiz: Exam (Real)"] >= points
+
+
+class CountingGrader(Python2LectureGrader):
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.n_graded = 0
+    
+    def _create_grade_row(self, row: pd.Series) -> pd.Series:
+        self.n_graded += 1
+        return super()._create_grade_row(row)
+
+
+class StagesTest(AbstractGraderTest):
+    
+    def setUp(self):
+        points = pd.DataFrame([
+            [87, "-", "-"],
+            [20, 49.5, "-"],
+            [20, 10, 60],
+            ["-", "-", "-"],
+        ], columns=COLUMNS)
+        df = AbstractGraderTest.create_moodle_file_with_points(points, MOODLE_FILE)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, KUSSS_PARTICIPANTS_FILE)
+        self.grader = CountingGrader(MOODLE_FILE, verbose=False)
+    
+    def tearDown(self):
+        super().tearDown()
+        if os.path.exists(LEDGER_FILE):
+            os.remove(LEDGER_FILE)
+    
+    def get_grader_class(self) -> type:
+        return Python2LectureGrader
+    
+    def _create_grading_file(self, **kwargs) -> pd.DataFrame:
+        self.grader.n_graded = 0
+        gdf, _ = self.grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE, **kwargs)
+        return gdf
+    
+    def test_row_filter(self):
+        gdf = self._create_grading_file()
+        self.assertEqual(self.grader.n_graded, 3)
+        self.assertEqual(gdf["grade"].tolist(), [2, 4, 4])
+        with mock.patch.object(self.grader, "_merge_participants", side_effect=AssertionError("merged again")):
+            gdf = self._create_grading_file(row_filter=has_retry_exam, grade_col="g", grade_reason_col="r")
+        # all grades are memoized
+        self.assertEqual(self.grader.n_graded, 0)
+        self.assertEqual(gdf["ID number"].tolist(), ["k00000001", "k00000002"])
+        self.assertEqual(gdf["g"].tolist(), [4, 4])
+        self.assertEqual(gdf["r"].tolist(), ["", ""])
+        # same result as without memoized stages
+        fresh_grader = Python2LectureGrader(MOODLE_FILE, verbose=False)
+        fresh_gdf, _ = fresh_grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE,
+                                                        row_filter=has_retry_exam, grade_col="g", grade_reason_col="r")
+        pd.testing.assert_frame_equal(gdf, fresh_gdf)
+    
+    def test_only_new_entries_are_graded(self):
+        self._create_grading_file(row_filter=has_retry_exam)
+        self.assertEqual(self.grader.n_graded, 2)
+        self._create_grading_file()
+        self.assertEqual(self.grader.n_graded, 1)
+    
+    def test_row_filter_key(self):
+        gdf = self._create_grading_file(row_filter=exam_at_least(20))
+        self.assertEqual(len(gdf), 3)
+        # a new function with the same code and closure values is the same row filter
+        with mock.patch.object(self.grader, "_filter", side_effect=AssertionError("filtered again")):
+            self._create_grading_file(row_filter=exam_at_least(20))
+        gdf = self._create_grading_file(row_filter=exam_at_least(50))
+        self.assertEqual(gdf["ID number"].tolist(), ["k00000000"])
+    
+    def test_changed_inputs(self):
+        self._create_grading_file()
+        # a modified participants file is read again (and everything downstream is recomputed)
+        kdf = pd.read_csv(KUSSS_PARTICIPANTS_FILE, sep=";")
+        kdf.iloc[:1].to_csv(KUSSS_PARTICIPANTS_FILE, sep=";", index=False)
+        os.utime(KUSSS_PARTICIPANTS_FILE, ns=(0, 0))
+        gdf = self._create_grading_file()
+        self.assertEqual(self.grader.n_graded, 1)
+        self.assertEqual(gdf["grade"].tolist(), [2])
+        # a replaced self.df invalidates all stages
+        self.grader.df = self.grader.df.assign(**{"Quiz: Exam (Real)": 10.0})
+        gdf = self._create_grading_file()
+        self.assertEqual(self.grader.n_graded, 1)
+        self.assertEqual(gdf["grade"].tolist(), [5])
+    
+    def test_changed_corrections(self):
+        self._create_grading_file()
+        with open(LEDGER_FILE, "w", encoding="utf8") as f:
+            f.write("column;adjustment;scope;reason\nQuiz: Retry Exam (Real);0.5;k00000001;wrong answer key\n")
+        # only the corrected entry is processed and graded again
+        with mock.patch.object(self.grader, "_merge_participants", side_effect=AssertionError("merged again")):
+            gdf = self._create_grading_file(corrections_file=LEDGER_FILE)
+        self.assertEqual(self.grader.n_graded, 1)
+        self.assertEqual(gdf["grade"].tolist(), [2, 4, 4])
+        self.assertEqual(gdf["Quiz: Retry Exam (Real)"].tolist()[1], 50)
+        # same result as without memoized stages
+        fresh_grader = Python2LectureGrader(MOODLE_FILE, verbose=False)
+        fresh_gdf, _ = fresh_grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE,
+                                                        corrections_file=LEDGER_FILE)
+        pd.testing.assert_frame_equal(gdf, fresh_gdf)
+        # removing the ledger again reverts the corrected entry only
+        gdf = self._create_grading_file()
+        self.assertEqual(self.grader.n_graded, 1)
+        self.assertEqual(gdf["Quiz: Retry Exam (Real)"].tolist()[1], 49.5)
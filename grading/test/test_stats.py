@@ -0,0 +1,78 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from eval import stats
+
+
+class StatsTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.dir, "stats_cache.json")
+        self.courses = dict(
+            a=dict(participant_files=[self._write("a_participants.csv", ["Matrikelnummer;SKZ", "k00000001;521",
+                                                                         "k00000002;521", "k00000003;999"])],
+                   grading_files=[self._write("a_grading_1.csv", ["k00000001;521;5;exam negative;exam negative",
+                                                                  "k00000002;521;2;;"]),
+                                  self._write("a_grading_2.csv", ["k00000001;521;3;;"])]),
+            b=dict(participant_files=[self._write("b_participants.csv", ["Matrikelnummer;SKZ", "k00000001;521"])],
+                   grading_files=[self._write("b_grading.csv", ["k00000001;521;5;exam missing;exam missing"])]),
+        )
+    
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+    
+    def _write(self, name: str, lines: list[str]) -> str:
+        file = os.path.join(self.dir, name)
+        with open(file, "w", encoding="utf8") as f:
+            f.write("\n".join(lines) + "\n")
+        return file
+    
+    def _compute_stats(self) -> tuple[dict[str, pd.DataFrame], list[list[str]]]:
+        # the courses that are actually loaded (i.e., not taken from the cache)
+        with mock.patch.object(stats, "load_courses", wraps=stats.load_courses) as load_courses:
+            tables = stats.compute_stats(self.courses, self.cache_file, verbose=False)
+        return tables, [sorted(c.args[0]) for c in load_courses.call_args_list]
+    
+    def test_compute_stats(self):
+        tables, loaded = self._compute_stats()
+        self.assertEqual(loaded, [["a", "b"]])
+        # the grading file specified last takes precedence
+        self.assertEqual(tables["grades"].values.tolist(), [["a", 521, 2, 1], ["a", 521, 3, 1], ["b", 521, 5, 1]])
+        self.assertEqual(tables["pass_rates"].values.tolist(), [["a", 2, 2, 1.0], ["b", 1, 0, 0.0]])
+        self.assertEqual(tables["reasons"].values.tolist(), [["a", "", 2, 1.0], ["b", "exam missing", 1, 1.0]])
+        self.assertEqual(tables["participation"].values.tolist(),
+                         [["a", 521, 2, 2, 1.0], ["a", 999, 1, 0, 0.0], ["b", 521, 1, 1, 1.0]])
+        for name, df in tables.items():
+            self.assertEqual(df.dtypes.astype(str).tolist(),
+                             [pd.Series(dtype=t).dtype.name for t in stats.TABLE_DTYPES[name].values()], msg=name)
+        
+        files = stats.write_stats(tables, os.path.join(self.dir, "stats"))
+        self.assertEqual([os.path.basename(f) for f in files], [f"{name}.csv" for name in stats.TABLE_DTYPES] +
+                         ["stats.json"])
+        with open(files[-1], encoding="utf8") as f:
+            self.assertEqual(json.load(f)["pass_rates"][1], dict(course="b", n_graded=1, n_passed=0, pass_rate=0.0))
+    
+    def test_cache(self):
+        tables, _ = self._compute_stats()
+        # nothing changed, so all aggregates are taken from the cache
+        cached_tables, loaded = self._compute_stats()
+        self.assertEqual(loaded, [])
+        for name in tables:
+            pd.testing.assert_frame_equal(cached_tables[name], tables[name])
+        
+        # only the course with the changed file is recomputed
+        self._write("b_grading.csv", ["k00000001;521;4;;"])
+        os.utime(self.courses["b"]["grading_files"][0], ns=(0, 0))
+        tables, loaded = self._compute_stats()
+        self.assertEqual(loaded, [["b"]])
+        self.assertEqual(tables["pass_rates"].values.tolist(), [["a", 2, 2, 1.0], ["b", 1, 1, 1.0]])
+        # same result as without cache
+        for name, df in stats.compute_stats(self.courses, verbose=False).items():
+            pd.testing.assert_frame_equal(tables[name], df)
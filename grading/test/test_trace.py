@@ -0,0 +1,103 @@
+import os
+import unittest
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from graders import audit, trace
+from graders.ss2023.python2exercisegrader import Python2ExerciseGrader
+from graders.ss2024.python2lecturegrader import Python2LectureGrader
+from test.abstractgradertest import AbstractGraderTest, MOODLE_FILE, KUSSS_PARTICIPANTS_FILE, GRADING_FILE
+
+A_COLS = [f"Assignment: Assignment {i + 1} (Real)" for i in range(6)] + ["Assignment: Assignment 7 (Project) (Real)"]
+E_COLS = ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]
+BONUS_COL = "Assignment: Assignment 8 (Bonus) (Real)"
+AUDIT_FILE = "grading_FULL.arrow"
+
+
+class TraceFunctionsTest(unittest.TestCase):
+    
+    def test_rule_trace(self):
+        failed = {
+            "a": pd.Series([True, False, True, False]),
+            "b": pd.Series([False, False, True, True]),
+            "c": pd.Series([True, False, True, False]),
+        }
+        t = trace.rule_trace(failed)
+        self.assertEqual(t.tolist(), [0b101, 0, 0b111, 0b010])
+        first = trace.first_failed(t, list(failed))
+        self.assertEqual(list(first.categories), ["a", "b", "c"])
+        self.assertEqual(first.astype(object).tolist()[:2], ["a", np.nan])
+        self.assertEqual(first.astype(object).tolist()[2:], ["a", "b"])
+    
+    def test_rule_mask(self):
+        reasons = ["a", "b", "c"]
+        self.assertEqual(trace.rule_mask(reasons, "c"), 0b100)
+        self.assertEqual(trace.rule_mask(reasons, "a", "c", "a"), 0b101)
+        with self.assertRaises(ValueError):
+            trace.rule_mask(reasons, "d")
+
+
+class GraderTraceTest(AbstractGraderTest):
+    
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        n = 300
+        points = pd.DataFrame(rng.integers(0, 101, (n, 6)), columns=A_COLS[:6])
+        points[A_COLS[6]] = rng.integers(0, 401, n)
+        points[BONUS_COL] = np.nan
+        for c in E_COLS:
+            points[c] = np.where(rng.random(n) < 0.5, rng.integers(0, 101, n), np.nan)
+        df = AbstractGraderTest.create_moodle_file_with_points(points, MOODLE_FILE)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, KUSSS_PARTICIPANTS_FILE)
+    
+    def tearDown(self):
+        super().tearDown()
+        if os.path.exists(AUDIT_FILE):
+            os.remove(AUDIT_FILE)
+    
+    def get_grader_class(self) -> type:
+        return Python2ExerciseGrader
+    
+    def test_trace_matches_reasons(self):
+        grader = Python2ExerciseGrader(MOODLE_FILE, verbose=False)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            gdf, _ = grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE,
+                                                audit_format="arrow")
+        self.assertFalse(any("rule trace" in str(x.message) for x in w))
+        self.assertIsInstance(gdf["grade_reason"].dtype, pd.CategoricalDtype)
+        reasons = audit.read_audit_metadata(AUDIT_FILE)["rules"]["reasons"]
+        self.assertEqual(len(reasons), 4)
+        
+        # a student fails if and only if any rule is failed (or the total threshold is not reached)
+        failed_rules = gdf["rule_trace"] != 0
+        self.assertTrue((gdf.loc[failed_rules, "grade"] == 5).all())
+        self.assertTrue((gdf.loc[~failed_rules & (gdf["grade"] == 5), "grade_reason"] ==
+                         "total threshold not reached").all())
+        
+        # "failed only the exam" is a bit operation
+        exam = trace.rule_mask(reasons, "exam threshold not reached")
+        only_exam = gdf["rule_trace"] == exam
+        self.assertTrue((gdf.loc[only_exam, "grade_reason"] == "exam threshold not reached").all())
+        e_points = gdf[E_COLS].ffill(axis=1).iloc[:, -1]
+        self.assertTrue((gdf.loc[(gdf["rule_trace"] & exam) != 0, E_COLS].notna().any(axis=1)).all())
+        self.assertTrue((e_points[(gdf["rule_trace"] & exam) != 0] < 50).all())
+    
+    def test_inconsistent_rules(self):
+        class InconsistentGrader(Python2ExerciseGrader):
+            def _evaluate_rules(self, df: pd.DataFrame) -> dict[str, pd.Series]:
+                return {"always failed": pd.Series(True, index=df.index)}
+        
+        grader = InconsistentGrader(MOODLE_FILE, verbose=False)
+        with self.assertWarns(UserWarning):
+            grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE)
+    
+    def test_no_rules(self):
+        points = pd.DataFrame([[100, "-", "-"]], columns=E_COLS)
+        df = AbstractGraderTest.create_moodle_file_with_points(points, MOODLE_FILE)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, KUSSS_PARTICIPANTS_FILE)
+        grader = Python2LectureGrader(MOODLE_FILE, verbose=False)
+        gdf, _ = grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE)
+        self.assertNotIn("rule_trace", gdf.columns)
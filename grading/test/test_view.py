@@ -0,0 +1,84 @@
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from eval.util import read_grading_file
+from graders import view
+from graders.ss2024.python2lecturegrader import Python2LectureGrader
+from test.abstractgradertest import AbstractGraderTest, MOODLE_FILE, KUSSS_PARTICIPANTS_FILE, GRADING_FILE
+
+ARCHIVE_DIR = "test_view_archive"
+COLUMNS = ["Quiz: Exam (Real)", "Quiz: Retry Exam (Real)", "Quiz: Retry Exam 2 (Real)"]
+RETRY_VIEW = view.View(row_filter=lambda row: not np.isnan(row["Quiz: Retry Exam (Real)"]))
+
+
+class ViewTest(AbstractGraderTest):
+    
+    def setUp(self):
+        self._write_points([[87, "-", "-"], [20, 60, "-"], [20, 30, "-"]])
+    
+    def tearDown(self):
+        super().tearDown()
+        for name in ["retry", "skz", "changed", "full"]:
+            if os.path.exists(view.get_view_file(GRADING_FILE, name)):
+                os.remove(view.get_view_file(GRADING_FILE, name))
+        shutil.rmtree(ARCHIVE_DIR, ignore_errors=True)
+    
+    def get_grader_class(self) -> type:
+        return Python2LectureGrader
+    
+    @staticmethod
+    def _write_points(rows: list[list]):
+        df = AbstractGraderTest.create_moodle_file_with_points(pd.DataFrame(rows, columns=COLUMNS), MOODLE_FILE)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, KUSSS_PARTICIPANTS_FILE)
+        # the third student is registered with a different study ID
+        kdf = pd.read_csv(KUSSS_PARTICIPANTS_FILE, sep=";")
+        kdf.loc[2, "SKZ"] = 521
+        kdf.to_csv(KUSSS_PARTICIPANTS_FILE, sep=";", index=False)
+    
+    @staticmethod
+    def _read_view_grades(name: str) -> dict:
+        df = read_grading_file(view.get_view_file(GRADING_FILE, name))
+        return dict(zip(df["id"], df["grade"]))
+    
+    def test_get_view_file(self):
+        self.assertEqual(view.get_view_file("a/grading.csv", "retry"), "a/grading_retry.csv")
+        self.assertEqual(view.get_view_file("grading.csv.gz", "retry"), "grading_retry.csv.gz")
+    
+    def test_views(self):
+        grader = Python2LectureGrader(MOODLE_FILE, verbose=False)
+        gdf, _ = grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE, views=dict(
+            retry=RETRY_VIEW, skz=view.View(study_ids=[521])))
+        self.assertEqual(gdf["grade"].tolist(), [2, 4, 5])
+        self.assertEqual(self._read_view_grades("retry"), dict(k00000001=4, k00000002=5))
+        self.assertEqual(self._read_view_grades("skz"), dict(k00000002=5))
+    
+    def test_views_are_independent_of_row_filter(self):
+        grader = Python2LectureGrader(MOODLE_FILE, verbose=False)
+        gdf, _ = grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE,
+                                            row_filter=RETRY_VIEW.row_filter, views=dict(full=view.View()))
+        self.assertEqual(gdf["grade"].tolist(), [4, 5])
+        self.assertEqual(len(read_grading_file(GRADING_FILE)), 2)
+        self.assertEqual(self._read_view_grades("full"), dict(k00000000=2, k00000001=4, k00000002=5))
+    
+    def test_changed_since(self):
+        with self.assertRaises(ValueError):
+            Python2LectureGrader(MOODLE_FILE, verbose=False).create_grading_file(
+                KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE, views=dict(changed=view.View(
+                    changed_since=datetime.now())))
+        grader = Python2LectureGrader(MOODLE_FILE, verbose=False)
+        views = dict(changed=view.View(changed_since=datetime.now()))
+        # nothing archived yet, so every entry changed
+        grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE, archive_dir=ARCHIVE_DIR,
+                                   views=views)
+        self.assertEqual(len(self._read_view_grades("changed")), 3)
+        uploaded = datetime.now()
+        # the second student improved, and a new student registered
+        self._write_points([[87, "-", "-"], [20, 60, 95], [20, 30, "-"], [50, "-", "-"]])
+        grader = Python2LectureGrader(MOODLE_FILE, verbose=False)
+        grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE, archive_dir=ARCHIVE_DIR,
+                                   views=dict(changed=view.View(changed_since=uploaded)))
+        self.assertEqual(self._read_view_grades("changed"), dict(k00000001=1, k00000003=4))
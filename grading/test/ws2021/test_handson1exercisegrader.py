@@ -49,3 +49,7 @@ class HandsOn1ExerciseGraderTest(AbstractGraderTest):
             [100, 100, 100, 100, 100, 100, 0, 2],
             ["-", 90, 10, 2, 100, 97, 78, 4],
         ], columns=COLUMNS))
+    
+    def test_rules_agree_with_grades(self):
+        points = AbstractGraderTest.create_random_points(COLUMNS[:-1], [100] * 7, n=500, seed=0)
+        self.assert_consistent_rules(points)
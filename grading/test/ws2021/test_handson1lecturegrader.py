@@ -86,3 +86,11 @@ class HandsOn1LectureGraderTest(AbstractGraderTest):
             [100, 0, 200, 200, 1],
             [100, 100, 200, 200, 1],
         ], columns=COLUMNS))
+    
+    def test_rules_agree_with_grades(self):
+        points = AbstractGraderTest.create_random_points(COLUMNS[:-1], [100, 100, 200, 200], n=500, seed=0)
+        self.assert_consistent_rules(points)
+    
+    def test_threshold_rules_agree_with_grades(self):
+        points = AbstractGraderTest.create_random_points(COLUMNS[:-1], [100, 100, 200, 200], n=500, seed=0)
+        self.assert_consistent_threshold_rules(points)
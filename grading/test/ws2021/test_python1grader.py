@@ -150,3 +150,11 @@ class Python1GraderTest(AbstractGraderTest):
             # full points
             FULL_POINTS_A + FULL_POINTS_Q + [1],
         ], columns=COLUMNS))
+    
+    def test_rules_agree_with_grades(self):
+        points = AbstractGraderTest.create_random_points(COLUMNS[:-1], FULL_POINTS_A + [10, 10, 20], n=500, seed=0)
+        self.assert_consistent_rules(points)
+    
+    def test_threshold_rules_agree_with_grades(self):
+        points = AbstractGraderTest.create_random_points(COLUMNS[:-1], FULL_POINTS_A + [10, 10, 20], n=500, seed=0)
+        self.assert_consistent_threshold_rules(points)
@@ -0,0 +1,73 @@
+import os
+
+import pandas as pd
+
+from graders.ws2021.sw1exercisegrader import SW1ExerciseGrader
+from test.abstractgradertest import AbstractGraderTest, MOODLE_FILE, KUSSS_PARTICIPANTS_FILE, GRADING_FILE
+
+COLUMNS = [f"Assignment: Assignment {i + 1} (Real)" for i in range(10)] + ["Assignment: Bonus 1 (Real)"]
+EXAM_FILES = [f"exam_{i}.csv" for i in range(3)]
+
+
+class SW1ExerciseGraderTest(AbstractGraderTest):
+    
+    def tearDown(self):
+        super().tearDown()
+        for f in EXAM_FILES:
+            if os.path.exists(f):
+                os.remove(f)
+    
+    def get_grader_class(self) -> type:
+        return SW1ExerciseGrader
+    
+    @staticmethod
+    def _write_exam_files(exams: list[dict[int, float]]):
+        for exam, f in zip(exams, EXAM_FILES):
+            df = pd.DataFrame(dict(id=[f"k{i:08d}" for i in exam], points=list(exam.values())))
+            df.columns = ["Matr.Nr.", "Summe"]
+            df.to_csv(f, sep="\t", decimal=",", index=False)
+    
+    def test_create_grading_file_exam_attempts(self):
+        points = pd.DataFrame([
+            [24] * 10 + [0],
+            [24] * 10 + [0],
+            [24] * 10 + [0],
+            [24] * 10 + [0],
+            [12] * 7 + [7, 7, 7] + [24],
+        ], columns=COLUMNS)
+        self._write_exam_files([
+            {0: 90, 1: 90, 2: 10, 4: 90},
+            {1: 10, 2: 45},
+            # the third attempt has no entries at all
+            dict(),
+        ])
+        df = AbstractGraderTest.create_moodle_file_with_points(points, MOODLE_FILE)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, KUSSS_PARTICIPANTS_FILE)
+        grader = SW1ExerciseGrader(MOODLE_FILE, EXAM_FILES, verbose=False)
+        self.assertEqual(grader.quiz_cols, ["Exam 0", "Exam 1", "Exam 2"])
+        gdf, _ = grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE)
+        # the most recent exam attempt takes precedence
+        self.assertEqual(gdf["exam_latest"].tolist()[:3], [90, 10, 45])
+        self.assertEqual(gdf["n_successful"].tolist(), [10, 10, 10, 10, 7])
+        self.assertEqual(gdf["grade"].tolist(), [1, 5, 1, 5, 5])
+        self.assertEqual(gdf["grade_reason"].tolist(),
+                         ["", "exam negative", "", "exam missing", "fewer than 8 successful assignments"])
+    
+    def test_duplicate_exam_entries(self):
+        points = pd.DataFrame([[24] * 10 + [0]], columns=COLUMNS)
+        self._write_exam_files([{0: 10}])
+        with open(EXAM_FILES[0], "a", encoding="utf8") as f:
+            f.write("k00000000\t90\n")
+        df = AbstractGraderTest.create_moodle_file_with_points(points, MOODLE_FILE)
+        AbstractGraderTest.create_matching_kusss_participants_file(df, KUSSS_PARTICIPANTS_FILE)
+        with self.assertWarns(UserWarning):
+            grader = SW1ExerciseGrader(MOODLE_FILE, EXAM_FILES[0], verbose=False)
+        gdf, _ = grader.create_grading_file(KUSSS_PARTICIPANTS_FILE, grading_file=GRADING_FILE)
+        self.assertEqual(gdf["grade"].tolist(), [1])
+    
+    def test_rules_agree_with_grades(self):
+        points = AbstractGraderTest.create_random_points(COLUMNS, [24] * len(COLUMNS), n=500, seed=0)
+        exam_points = AbstractGraderTest.create_random_points(EXAM_FILES, [90] * len(EXAM_FILES), n=500, seed=1,
+                                                              missing_rate=0.5)
+        self._write_exam_files([{i: p for i, p in exam_points[f].items() if p != "-"} for f in EXAM_FILES])
+        self.assert_consistent_rules(points, grader_init_kwargs=dict(exam_files=EXAM_FILES))
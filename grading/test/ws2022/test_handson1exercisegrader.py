@@ -0,0 +1,14 @@
+from graders.ws2022.handson1exercisegrader import HandsOn1ExerciseGrader
+from test.abstractgradertest import AbstractGraderTest
+
+COLUMNS = [f"Assignment: Assignment {i + 1} (Real)" for i in range(7)]
+
+
+class HandsOn1ExerciseGraderTest(AbstractGraderTest):
+    
+    def get_grader_class(self) -> type:
+        return HandsOn1ExerciseGrader
+    
+    def test_rules_agree_with_grades(self):
+        points = AbstractGraderTest.create_random_points(COLUMNS, [100] * len(COLUMNS), n=500, seed=0)
+        self.assert_consistent_rules(points)
@@ -121,3 +121,11 @@ class Python1ExerciseGraderTest(AbstractGraderTest):
             [sum(FULL_POINTS_A_WITHOUT_BONUS) * 0.58 / len(FULL_POINTS_A_WITHOUT_BONUS)] * len(FULL_POINTS_A_WITHOUT_BONUS) + [50] + FULL_POINTS_E + [3],  # 10 * 58 (assignments) + 100(.5) (exam (1)) + 50 (bonus) = 730(.5) -> /1100 ~ 66% -> "3"
             [sum(FULL_POINTS_A_WITHOUT_BONUS) * 0.58 / len(FULL_POINTS_A_WITHOUT_BONUS)] * len(FULL_POINTS_A_WITHOUT_BONUS) + [0] + FULL_POINTS_E + [4],  # 10 * 58 (assignments) + 100(.5) (exam (1)) + 0 (bonus) = 680(.5) -> /1100 ~ 62% -> "4"
         ], columns=COLUMNS))
+    
+    def test_rules_agree_with_grades(self):
+        points = AbstractGraderTest.create_random_points(COLUMNS[:-1], FULL_POINTS_A + [100] * 3, n=500, seed=0)
+        self.assert_consistent_rules(points)
+    
+    def test_threshold_rules_agree_with_grades(self):
+        points = AbstractGraderTest.create_random_points(COLUMNS[:-1], FULL_POINTS_A + [100] * 3, n=500, seed=0)
+        self.assert_consistent_threshold_rules(points)